@@ -0,0 +1,217 @@
+import json
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from comum.sketches import DistintosPorPeriodo, SpaceSaving
+
+Contador = Union[Counter, SpaceSaving]
+
+# Colunas com contagem de valores distintos (sketch por dia)
+COLUNAS_DISTINTAS = ["ip", "usuario"]
+
+
+@dataclass
+class Agregados:
+    """
+    Estatísticas acumuladas da análise de logs.
+
+    Podem ser atualizadas lote a lote, somadas entre workers/execuções
+    (`merge`) e serializadas em JSON (`para_dict` / `de_dict`).
+
+    Com `capacidade_topk`, os rankings de IPs e usuários usam Space-Saving
+    (memória fixa, contagens aproximadas com erro limitado) em vez de um
+    Counter exato, cujo tamanho cresce com o número de IPs distintos.
+
+    IPs e usuários distintos são contados com sketches HyperLogLog por dia
+    (`distintos`), que também podem ser somados entre workers e execuções.
+    `eventos_por_parser` só é preenchido no modo multiformato (parsers.py).
+    """
+    status: Counter = field(default_factory=Counter)
+    falhas_por_ip: Contador = field(default_factory=Counter)
+    falhas_por_usuario: Contador = field(default_factory=Counter)
+    eventos_por_hora: Counter = field(default_factory=Counter)
+    capacidade_topk: Optional[int] = None
+    distintos: DistintosPorPeriodo = field(default_factory=lambda: DistintosPorPeriodo(COLUNAS_DISTINTAS))
+    eventos_por_parser: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        if self.capacidade_topk and isinstance(self.falhas_por_ip, Counter):
+            ips, usuarios = self.falhas_por_ip, self.falhas_por_usuario
+            self.falhas_por_ip = SpaceSaving(self.capacidade_topk)
+            self.falhas_por_usuario = SpaceSaving(self.capacidade_topk)
+            self.falhas_por_ip.update(ips)
+            self.falhas_por_usuario.update(usuarios)
+
+    @property
+    def aproximado(self) -> bool:
+        return isinstance(self.falhas_por_ip, SpaceSaving)
+
+    @property
+    def total_eventos(self) -> int:
+        return sum(self.status.values())
+
+    def atualizar(self, df: pd.DataFrame) -> "Agregados":
+        """
+        Soma um lote de registros (DataFrame no formato do parser).
+
+        O lote é percorrido uma única vez: um groupby por (status, ip,
+        usuário, hora) e, a partir das combinações (muito menos numerosas
+        que as linhas), todos os contadores são atualizados.
+        """
+        if len(df) == 0:
+            return self
+        # Hora do dia a partir do timestamp (inteiro), não do texto "HH:MM:SS"
+        timestamps = df["timestamp"].to_numpy()
+        horas = pd.Series(np.where(timestamps >= 0, (timestamps // 3600) % 24, -1), index=df.index)
+        grupos = df.groupby(
+            [df["status"], df["ip"], df["usuario"], horas], sort=False, dropna=False
+        ).size()
+        falhas_ip, falhas_usuario = Counter(), Counter()
+        for (status, ip, usuario, hora), quantidade in grupos.items():
+            quantidade = int(quantidade)
+            self.status[status] += quantidade
+            if hora >= 0:
+                self.eventos_por_hora[f"{hora:02d}"] += quantidade
+            if status == "FALHA":
+                falhas_ip[ip] += quantidade
+                falhas_usuario[usuario] += quantidade
+        self.falhas_por_ip.update(falhas_ip)
+        self.falhas_por_usuario.update(falhas_usuario)
+
+        # Linhas sem evento de autenticação não têm IP/usuário ("N/A"); datas
+        # inválidas (timestamp -1) ficam fora, como nos contadores por hora
+        autenticacao = df[(df["status"] != "OUTRO") & (df["timestamp"] >= 0)]
+        dias = pd.Series(autenticacao["timestamp"].to_numpy() // 86400, index=autenticacao.index)
+        rotulos = {dia: pd.Timestamp(dia * 86400, unit="s").strftime("%Y-%m-%d") for dia in dias.unique()}
+        self.distintos.atualizar(autenticacao, dias.map(rotulos))
+        return self
+
+    def merge(self, outro: "Agregados") -> "Agregados":
+        """
+        Soma os contadores de outro objeto Agregados neste.
+        """
+        self.status.update(outro.status)
+        self.eventos_por_hora.update(outro.eventos_por_hora)
+        for proprio, alheio in ((self.falhas_por_ip, outro.falhas_por_ip),
+                                (self.falhas_por_usuario, outro.falhas_por_usuario)):
+            if isinstance(proprio, SpaceSaving) and isinstance(alheio, SpaceSaving):
+                proprio.merge(alheio)
+            else:
+                proprio.update(alheio.contagens if isinstance(alheio, SpaceSaving) else alheio)
+        self.distintos.merge(outro.distintos)
+        self.eventos_por_parser.update(outro.eventos_por_parser)
+        return self
+
+    def top_ips(self, n: int):
+        """IPs com mais falhas de login: lista de (ip, tentativas)."""
+        return self.falhas_por_ip.most_common(n)
+
+    def top_usuarios(self, n: int):
+        """Usuários mais atacados: lista de (usuário, tentativas)."""
+        return self.falhas_por_usuario.most_common(n)
+
+    def erro_maximo_topk(self) -> int:
+        """
+        Excesso máximo de qualquer contagem dos rankings (0 quando exatos).
+        """
+        if not self.aproximado:
+            return 0
+        return max(self.falhas_por_ip.erro_maximo, self.falhas_por_usuario.erro_maximo)
+
+    def ips_unicos(self) -> int:
+        """IPs distintos com eventos de autenticação (estimativa HyperLogLog)."""
+        return self.distintos.estimar("ip")
+
+    def usuarios_unicos(self) -> int:
+        """Usuários distintos com eventos de autenticação (estimativa HyperLogLog)."""
+        return self.distintos.estimar("usuario")
+
+    def horas_ordenadas(self):
+        """Eventos por hora do dia, em ordem cronológica: lista de (hora, eventos)."""
+        return sorted(self.eventos_por_hora.items())
+
+    def para_dict(self) -> dict:
+        return {
+            "status": dict(self.status),
+            "falhas_por_ip": _contador_para_dict(self.falhas_por_ip),
+            "falhas_por_usuario": _contador_para_dict(self.falhas_por_usuario),
+            "eventos_por_hora": dict(self.eventos_por_hora),
+            "capacidade_topk": self.capacidade_topk,
+            "distintos": self.distintos.para_dict(),
+            "eventos_por_parser": dict(self.eventos_por_parser),
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "Agregados":
+        return cls(
+            status=Counter(dados.get("status", {})),
+            falhas_por_ip=_contador_de_dict(dados.get("falhas_por_ip", {})),
+            falhas_por_usuario=_contador_de_dict(dados.get("falhas_por_usuario", {})),
+            eventos_por_hora=Counter(dados.get("eventos_por_hora", {})),
+            capacidade_topk=dados.get("capacidade_topk"),
+            distintos=DistintosPorPeriodo.de_dict(dados["distintos"]) if "distintos" in dados
+            else DistintosPorPeriodo(COLUNAS_DISTINTAS),
+            eventos_por_parser=Counter(dados.get("eventos_por_parser", {})),
+        )
+
+
+def _contador_para_dict(contador: Contador) -> dict:
+    return contador.para_dict() if isinstance(contador, SpaceSaving) else dict(contador)
+
+
+def _contador_de_dict(dados: dict) -> Contador:
+    if dados.get("tipo") == "space_saving":
+        return SpaceSaving.de_dict(dados)
+    return Counter(dados)
+
+
+# ========== CACHE EM DISCO ==========
+
+def assinatura_entrada(caminhos: List[str]) -> List[list]:
+    """
+    Identifica o conteúdo de entrada por (caminho, tamanho, mtime) de cada arquivo.
+    """
+    assinatura = []
+    for caminho in caminhos:
+        info = os.stat(caminho)
+        assinatura.append([os.path.abspath(caminho), info.st_size, info.st_mtime_ns])
+    return assinatura
+
+
+def carregar_cache(caminhos: List[str], caminho_cache: str,
+                   capacidade_topk: Optional[int] = None) -> Optional[Agregados]:
+    """
+    Retorna os Agregados salvos se a entrada (e a configuração dos rankings)
+    não mudou desde que foram calculados.
+    """
+    if not os.path.exists(caminho_cache):
+        return None
+    try:
+        with open(caminho_cache, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if dados.get("assinatura") != assinatura_entrada(caminhos):
+        return None
+    if dados["agregados"].get("capacidade_topk") != capacidade_topk:
+        return None
+    # Caches de versões anteriores não têm os sketches de distintos
+    if "distintos" not in dados["agregados"]:
+        return None
+    return Agregados.de_dict(dados["agregados"])
+
+
+def salvar_cache(agregados: Agregados, caminhos: List[str], caminho_cache: str) -> None:
+    """
+    Salva os Agregados junto com a assinatura da entrada que os originou.
+    """
+    dados = {"assinatura": assinatura_entrada(caminhos), "agregados": agregados.para_dict()}
+    with open(caminho_cache, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False)
@@ -1,181 +1,190 @@
-import re
+import argparse
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
-from collections import Counter
-
-print("=" * 60)
-print("ANÁLISE DE LOGS DE SERVIDOR LINUX")
-print("=" * 60)
-
-# 1. LER O ARQUIVO DE LOGS
-print("\n[1] Lendo arquivo de logs...")
-try:
-    with open("logs_exemplo.txt", "r") as file:
-        linhas = file.readlines()
-    print(f"✓ {len(linhas)} linhas de log lidas com sucesso!")
-except FileNotFoundError:
-    print("✗ Erro: arquivo 'logs_exemplo.txt' não encontrado!")
-    exit()
-
-# 2. EXTRAIR DADOS DOS LOGS
-print("\n[2] Extraindo dados dos logs...")
-
-datas = []
-horas = []
-ips = []
-usuarios = []
-eventos = []
-status = []
-
-# Padrão regex para capturar informações
-# Exemplo: Jan 15 08:23:45 servidor-web sshd[12453]: Failed password for invalid user admin from 203.0.113.45 port 54321 ssh2
-
-for linha in linhas:
-    # Extrair data e hora
-    match_data = re.search(r"(\w{3}\s+\d+)\s+(\d+:\d+:\d+)", linha)
-    if match_data:
-        datas.append(match_data.group(1))
-        horas.append(match_data.group(2))
-
-    # Extrair IP
-    match_ip = re.search(r"from\s+(\d+\.\d+\.\d+\.\d+)", linha)
-    if match_ip:
-        ips.append(match_ip.group(1))
-    else:
-        ips.append("N/A")
 
-    # Extrair usuário
-    match_user = re.search(r"(?:for|user)\s+(\w+)\s+", linha)
-    if match_user:
-        usuarios.append(match_user.group(1))
+from agregacao import Agregados, carregar_cache, salvar_cache
+from ingestao import eh_comprimido, expandir_entrada, processar_conjunto
+from modo_incremental import carregar_checkpoint, processar_incremental, salvar_checkpoint
+from parser_logs import COLUNAS, ler_dataframes, parse_paralelo
+from parsers import ProcessadorMultiformato, ler_multiformato, resumo_desempenho
+
+CAMINHO_CSV = "resultados/relatorio_completo.csv"
+CAMINHO_CACHE = "resultados/.cache_agregados.json"
+
+
+def extrair(caminhos, conjunto, processos, capacidade_topk=None):
+    """
+    Faz o parse da entrada, grava o CSV completo e retorna os Agregados.
+
+    Todas as estatísticas do relatório são calculadas nesta única passada
+    sobre os dados; as etapas seguintes leem apenas o objeto Agregados.
+    """
+    if conjunto:
+        # Conjunto rotacionado/comprimido: um arquivo por worker (padrão: todos
+        # os núcleos), descomprimido em streaming e juntado em ordem cronológica
+        df, agregados = processar_conjunto(caminhos, processos=processos,
+                                           capacidade_topk=capacidade_topk)
+        df.to_csv(CAMINHO_CSV, index=False)
+        print(f"   ✓ {len(df):,} registros extraídos de {len(caminhos)} arquivo(s)")
+    elif processos and processos > 1:
+        # Modo multiprocesso: o arquivo é mapeado em memória e dividido em
+        # faixas de bytes alinhadas a quebras de linha, uma por tarefa
+        df, agregados = parse_paralelo(caminhos[0], processos=processos,
+                                       capacidade_topk=capacidade_topk)
+        df.to_csv(CAMINHO_CSV, index=False)
+        print(f"   ✓ {len(df):,} registros extraídos com {processos} processos")
     else:
-        usuarios.append("N/A")
-
-    # Classificar evento (sucesso ou falha)
-    if "Accepted password" in linha:
-        eventos.append("Login Bem-sucedido")
-        status.append("SUCESSO")
-    elif "Failed password" in linha:
-        eventos.append("Falha de Login")
-        status.append("FALHA")
+        # Processo único: cada lote vai direto para o CSV e para os Agregados,
+        # sem montar o DataFrame completo em memória
+        agregados = Agregados(capacidade_topk=capacidade_topk)
+        primeiro = True
+        for lote in ler_dataframes(caminhos[0]):
+            lote.to_csv(CAMINHO_CSV, mode="w" if primeiro else "a", header=primeiro, index=False)
+            primeiro = False
+            agregados.atualizar(lote)
+            print(f"   ✓ {agregados.total_eventos:,} registros extraídos...")
+        if primeiro:
+            pd.DataFrame(columns=COLUNAS).to_csv(CAMINHO_CSV, index=False)
+    return agregados
+
+
+def extrair_multiformato(caminhos, capacidade_topk=None):
+    """
+    Modo multiformato: passa cada linha pelo registro de parsers (sshd, sudo,
+    su, PAM, journald JSON, nginx), grava uma tabela por parser em
+    resultados/eventos_<parser>.csv e retorna os Agregados do relatório.
+    """
+    agregados = Agregados(capacidade_topk=capacidade_topk)
+    processador = ProcessadorMultiformato()
+    gravados = set()
+    for caminho in caminhos:
+        for tabelas in ler_multiformato(caminho, processador=processador):
+            for nome, df in tabelas.items():
+                destino = CAMINHO_CSV if nome == "registros" else f"resultados/eventos_{nome}.csv"
+                df.to_csv(destino, mode="a" if nome in gravados else "w", header=nome not in gravados, index=False)
+                gravados.add(nome)
+                if nome == "registros":
+                    agregados.atualizar(df)
+                else:
+                    agregados.eventos_por_parser[nome] += len(df)
+    if "registros" not in gravados:
+        pd.DataFrame(columns=COLUNAS).to_csv(CAMINHO_CSV, index=False)
+
+    print(f"   ✓ {agregados.total_eventos:,} registros extraídos "
+          f"({processador.ignoradas:,} linhas sem formato reconhecido)")
+    print("   Desempenho por parser:")
+    for linha in resumo_desempenho(processador):
+        print(f"   - {linha}")
+    return agregados
+
+
+def executar_incremental(caminho_log, caminho_checkpoint, capacidade_topk=None):
+    """
+    Modo follow: processa apenas os bytes novos desde a última execução,
+    acrescenta os registros ao CSV e retorna as estatísticas acumuladas.
+    """
+    checkpoint = carregar_checkpoint(caminho_checkpoint, capacidade_topk)
+    if checkpoint.atualizado_em:
+        print(f"✓ Última execução: {checkpoint.atualizado_em} (offset {checkpoint.offset:,})")
     else:
-        eventos.append("Outro")
-        status.append("OUTRO")
-
-print(f"✓ Dados extraídos com sucesso!")
-
-# 3. CRIAR DATAFRAME
-print("\n[3] Organizando dados em tabela...")
-df = pd.DataFrame({
-    "data": datas,
-    "hora": horas,
-    "ip": ips,
-    "usuario": usuarios,
-    "evento": eventos,
-    "status": status
-})
-
-print(f"✓ Tabela criada com {len(df)} registros!")
-
-# 4. ANÁLISES E ESTATÍSTICAS
-print("\n[4] Realizando análises...")
-
-# Contar sucessos e falhas
-total_sucessos = len(df[df["status"] == "SUCESSO"])
-total_falhas = len(df[df["status"] == "FALHA"])
-total_eventos = len(df)
-
-print(f"\n   Total de eventos: {total_eventos}")
-print(f"   ✓ Logins bem-sucedidos: {total_sucessos}")
-print(f"   ✗ Falhas de login: {total_falhas}")
-
-# IPs com mais tentativas falhadas
-print("\n   Top 5 IPs com falhas de login:")
-ips_falhas = df[df["status"] == "FALHA"]["ip"].value_counts().head(5)
-for i, (ip, count) in enumerate(ips_falhas.items(), 1):
-    print(f"   {i}. {ip}: {count} tentativas")
-
-# Usuários mais atacados
-print("\n   Top 5 usuários mais atacados:")
-usuarios_atacados = df[df["status"] == "FALHA"]["usuario"].value_counts().head(5)
-for i, (user, count) in enumerate(usuarios_atacados.items(), 1):
-    print(f"   {i}. {user}: {count} tentativas")
-
-# 5. SALVAR RELATÓRIO EM CSV
-print("\n[5] Salvando relatório em CSV...")
-df.to_csv("resultados/relatorio_completo.csv", index=False)
-print("✓ Arquivo salvo: resultados/relatorio_completo.csv")
-
-# 6. CRIAR GRÁFICOS
-print("\n[6] Gerando gráficos...")
-
-# Gráfico 1: Sucessos vs Falhas
-plt.figure(figsize=(10, 6))
-status_counts = df["status"].value_counts()
-cores = ["#2ecc71", "#e74c3c", "#95a5a6"]
-plt.bar(status_counts.index, status_counts.values, color=cores[:len(status_counts)])
-plt.title("Distribuição de Eventos: Sucessos vs Falhas", fontsize=14, fontweight="bold")
-plt.xlabel("Status", fontsize=12)
-plt.ylabel("Quantidade", fontsize=12)
-plt.grid(axis="y", alpha=0.3)
-for i, v in enumerate(status_counts.values):
-    plt.text(i, v + 0.5, str(v), ha="center", fontweight="bold")
-plt.tight_layout()
-plt.savefig("resultados/01_sucessos_vs_falhas.png", dpi=300, bbox_inches="tight")
-plt.close()
-print("✓ Gráfico salvo: resultados/01_sucessos_vs_falhas.png")
-
-# Gráfico 2: Top 10 IPs com falhas
-plt.figure(figsize=(12, 6))
-ips_falhas_top10 = df[df["status"] == "FALHA"]["ip"].value_counts().head(10)
-plt.barh(range(len(ips_falhas_top10)), ips_falhas_top10.values, color="#e74c3c")
-plt.yticks(range(len(ips_falhas_top10)), ips_falhas_top10.index)
-plt.title("Top 10 IPs com Tentativas de Login Falhadas", fontsize=14, fontweight="bold")
-plt.xlabel("Quantidade de Tentativas", fontsize=12)
-plt.ylabel("Endereço IP", fontsize=12)
-plt.grid(axis="x", alpha=0.3)
-for i, v in enumerate(ips_falhas_top10.values):
-    plt.text(v + 0.1, i, str(v), va="center", fontweight="bold")
-plt.tight_layout()
-plt.savefig("resultados/02_top_ips_falhas.png", dpi=300, bbox_inches="tight")
-plt.close()
-print("✓ Gráfico salvo: resultados/02_top_ips_falhas.png")
-
-# Gráfico 3: Usuários mais atacados
-plt.figure(figsize=(12, 6))
-usuarios_top10 = df[df["status"] == "FALHA"]["usuario"].value_counts().head(10)
-plt.barh(range(len(usuarios_top10)), usuarios_top10.values, color="#f39c12")
-plt.yticks(range(len(usuarios_top10)), usuarios_top10.index)
-plt.title("Top 10 Usuários Mais Atacados", fontsize=14, fontweight="bold")
-plt.xlabel("Quantidade de Tentativas", fontsize=12)
-plt.ylabel("Nome do Usuário", fontsize=12)
-plt.grid(axis="x", alpha=0.3)
-for i, v in enumerate(usuarios_top10.values):
-    plt.text(v + 0.1, i, str(v), va="center", fontweight="bold")
-plt.tight_layout()
-plt.savefig("resultados/03_top_usuarios_atacados.png", dpi=300, bbox_inches="tight")
-plt.close()
-print("✓ Gráfico salvo: resultados/03_top_usuarios_atacados.png")
-
-# Gráfico 4: Distribuição por hora do dia
-plt.figure(figsize=(14, 6))
-horas_count = df["hora"].value_counts().sort_index()
-plt.plot(horas_count.index, horas_count.values, marker="o", linewidth=2, markersize=8, color="#3498db")
-plt.fill_between(range(len(horas_count)), horas_count.values, alpha=0.3, color="#3498db")
-plt.title("Atividade de Login por Hora do Dia", fontsize=14, fontweight="bold")
-plt.xlabel("Hora", fontsize=12)
-plt.ylabel("Quantidade de Eventos", fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig("resultados/04_atividade_por_hora.png", dpi=300, bbox_inches="tight")
-plt.close()
-print("✓ Gráfico salvo: resultados/04_atividade_por_hora.png")
-
-# 7. CRIAR RELATÓRIO EM TEXTO
-print("\n[7] Gerando relatório em texto...")
-
-relatorio = f"""
+        print("✓ Nenhum checkpoint encontrado, lendo o arquivo desde o início")
+
+    novos = 0
+    # Sem checkpoint, o CSV de uma execução anterior é recriado do zero
+    recriar_csv = not checkpoint.atualizado_em or not os.path.exists(CAMINHO_CSV)
+    for df_novo in processar_incremental(caminho_log, checkpoint):
+        df_novo.to_csv(CAMINHO_CSV, mode="w" if recriar_csv else "a", header=recriar_csv, index=False)
+        recriar_csv = False
+        novos += len(df_novo)
+    print(f"   ✓ {novos:,} eventos novos acrescentados em {CAMINHO_CSV}")
+
+    salvar_checkpoint(checkpoint, caminho_checkpoint)
+    print(f"✓ Checkpoint salvo: {caminho_checkpoint}")
+    return checkpoint.agregados
+
+
+def gerar_graficos(agregados):
+    """
+    Gera os quatro gráficos a partir dos Agregados.
+    """
+    # Gráfico 1: Sucessos vs Falhas
+    plt.figure(figsize=(10, 6))
+    status_counts = agregados.status.most_common()
+    status_nomes = [nome for nome, _ in status_counts]
+    status_valores = [valor for _, valor in status_counts]
+    cores = ["#2ecc71", "#e74c3c", "#95a5a6"]
+    plt.bar(status_nomes, status_valores, color=cores[:len(status_counts)])
+    plt.title("Distribuição de Eventos: Sucessos vs Falhas", fontsize=14, fontweight="bold")
+    plt.xlabel("Status", fontsize=12)
+    plt.ylabel("Quantidade", fontsize=12)
+    plt.grid(axis="y", alpha=0.3)
+    for i, v in enumerate(status_valores):
+        plt.text(i, v + 0.5, str(v), ha="center", fontweight="bold")
+    plt.tight_layout()
+    plt.savefig("resultados/01_sucessos_vs_falhas.png", dpi=300, bbox_inches="tight")
+    plt.close()
+    print("✓ Gráfico salvo: resultados/01_sucessos_vs_falhas.png")
+
+    # Gráfico 2: Top 10 IPs com falhas
+    plt.figure(figsize=(12, 6))
+    ips_falhas_top10 = agregados.top_ips(10)
+    plt.barh(range(len(ips_falhas_top10)), [v for _, v in ips_falhas_top10], color="#e74c3c")
+    plt.yticks(range(len(ips_falhas_top10)), [ip for ip, _ in ips_falhas_top10])
+    plt.title("Top 10 IPs com Tentativas de Login Falhadas", fontsize=14, fontweight="bold")
+    plt.xlabel("Quantidade de Tentativas", fontsize=12)
+    plt.ylabel("Endereço IP", fontsize=12)
+    plt.grid(axis="x", alpha=0.3)
+    for i, (_, v) in enumerate(ips_falhas_top10):
+        plt.text(v + 0.1, i, str(v), va="center", fontweight="bold")
+    plt.tight_layout()
+    plt.savefig("resultados/02_top_ips_falhas.png", dpi=300, bbox_inches="tight")
+    plt.close()
+    print("✓ Gráfico salvo: resultados/02_top_ips_falhas.png")
+
+    # Gráfico 3: Usuários mais atacados
+    plt.figure(figsize=(12, 6))
+    usuarios_top10 = agregados.top_usuarios(10)
+    plt.barh(range(len(usuarios_top10)), [v for _, v in usuarios_top10], color="#f39c12")
+    plt.yticks(range(len(usuarios_top10)), [user for user, _ in usuarios_top10])
+    plt.title("Top 10 Usuários Mais Atacados", fontsize=14, fontweight="bold")
+    plt.xlabel("Quantidade de Tentativas", fontsize=12)
+    plt.ylabel("Nome do Usuário", fontsize=12)
+    plt.grid(axis="x", alpha=0.3)
+    for i, (_, v) in enumerate(usuarios_top10):
+        plt.text(v + 0.1, i, str(v), va="center", fontweight="bold")
+    plt.tight_layout()
+    plt.savefig("resultados/03_top_usuarios_atacados.png", dpi=300, bbox_inches="tight")
+    plt.close()
+    print("✓ Gráfico salvo: resultados/03_top_usuarios_atacados.png")
+
+    # Gráfico 4: Distribuição por hora do dia
+    plt.figure(figsize=(14, 6))
+    horas_count = agregados.horas_ordenadas()
+    horas_rotulos = [f"{hora}h" for hora, _ in horas_count]
+    horas_valores = [valor for _, valor in horas_count]
+    plt.plot(horas_rotulos, horas_valores, marker="o", linewidth=2, markersize=8, color="#3498db")
+    plt.fill_between(range(len(horas_count)), horas_valores, alpha=0.3, color="#3498db")
+    plt.title("Atividade de Login por Hora do Dia", fontsize=14, fontweight="bold")
+    plt.xlabel("Hora", fontsize=12)
+    plt.ylabel("Quantidade de Eventos", fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig("resultados/04_atividade_por_hora.png", dpi=300, bbox_inches="tight")
+    plt.close()
+    print("✓ Gráfico salvo: resultados/04_atividade_por_hora.png")
+
+
+def gerar_relatorio(agregados):
+    """
+    Monta o relatório executivo em texto a partir dos Agregados.
+    """
+    total_eventos = agregados.total_eventos
+    total_sucessos = agregados.status["SUCESSO"]
+    total_falhas = agregados.status["FALHA"]
+
+    relatorio = f"""
 {'='*70}
 RELATÓRIO DE ANÁLISE DE LOGS DE SEGURANÇA
 {'='*70}
@@ -189,6 +198,8 @@ RESUMO EXECUTIVO
 Total de eventos analisados: {total_eventos}
 Logins bem-sucedidos: {total_sucessos} ({total_sucessos/total_eventos*100:.1f}%)
 Falhas de login: {total_falhas} ({total_falhas/total_eventos*100:.1f}%)
+IPs únicos (estimativa): {agregados.ips_unicos()}
+Usuários únicos (estimativa): {agregados.usuarios_unicos()}
 
 {'='*70}
 TOP 10 IPs COM FALHAS DE LOGIN (SUSPEITOS)
@@ -196,20 +207,35 @@ TOP 10 IPs COM FALHAS DE LOGIN (SUSPEITOS)
 
 """
 
-for i, (ip, count) in enumerate(df[df["status"] == "FALHA"]["ip"].value_counts().head(10).items(), 1):
-    relatorio += f"{i:2d}. {ip:20s} - {count:3d} tentativas\n"
+    if agregados.aproximado:
+        relatorio += (f"(contagens aproximadas — Space-Saving com "
+                      f"{agregados.capacidade_topk} contadores, erro máximo de "
+                      f"±{agregados.erro_maximo_topk()} tentativas por item)\n\n")
+
+    for i, (ip, count) in enumerate(agregados.top_ips(10), 1):
+        relatorio += f"{i:2d}. {ip:20s} - {count:3d} tentativas\n"
 
-relatorio += f"""
+    relatorio += f"""
 {'='*70}
 TOP 10 USUÁRIOS MAIS ATACADOS
 {'='*70}
 
 """
 
-for i, (user, count) in enumerate(df[df["status"] == "FALHA"]["usuario"].value_counts().head(10).items(), 1):
-    relatorio += f"{i:2d}. {user:20s} - {count:3d} tentativas\n"
+    for i, (user, count) in enumerate(agregados.top_usuarios(10), 1):
+        relatorio += f"{i:2d}. {user:20s} - {count:3d} tentativas\n"
+
+    if agregados.eventos_por_parser:
+        relatorio += f"""
+{'='*70}
+EVENTOS POR PARSER (MODO MULTIFORMATO)
+{'='*70}
+
+"""
+        for nome, quantidade in agregados.eventos_por_parser.most_common():
+            relatorio += f"    {nome:20s} - {quantidade} eventos\n"
 
-relatorio += f"""
+    relatorio += f"""
 {'='*70}
 RECOMENDAÇÕES DE SEGURANÇA
 {'='*70}
@@ -219,18 +245,18 @@ RECOMENDAÇÕES DE SEGURANÇA
    investigados e potencialmente bloqueados:
 """
 
-for ip, count in df[df["status"] == "FALHA"]["ip"].value_counts().head(5).items():
-    relatorio += f"   - {ip} ({count} tentativas)\n"
+    for ip, count in agregados.top_ips(5):
+        relatorio += f"   - {ip} ({count} tentativas)\n"
 
-relatorio += f"""
+    relatorio += f"""
 2. PROTEÇÃO DE CONTAS:
    Os seguintes usuários foram alvo de ataques de força bruta:
 """
 
-for user, count in df[df["status"] == "FALHA"]["usuario"].value_counts().head(5).items():
-    relatorio += f"   - {user} ({count} tentativas)\n"
+    for user, count in agregados.top_usuarios(5):
+        relatorio += f"   - {user} ({count} tentativas)\n"
 
-relatorio += f"""
+    relatorio += f"""
 3. AÇÕES RECOMENDADAS:
    ✓ Implementar rate limiting (limite de tentativas)
    ✓ Usar autenticação de dois fatores (2FA)
@@ -244,36 +270,161 @@ FIM DO RELATÓRIO
 {'='*70}
 """
 
-with open("resultados/relatorio_seguranca.txt", "w", encoding="utf-8") as f:
-    f.write(relatorio)
-
-
-print("✓ Arquivo salvo: resultados/relatorio_seguranca.txt")
-
-# 8. MENSAGEM FINAL
-print("\n" + "="*60)
-print("✓ ANÁLISE CONCLUÍDA COM SUCESSO!")
-print("="*60)
-print("\nArquivos gerados na pasta 'resultados/':")
-print("  1. relatorio_completo.csv - Dados em formato tabular")
-print("  2. relatorio_seguranca.txt - Relatório executivo")
-print("  3. 01_sucessos_vs_falhas.png - Gráfico de distribuição")
-print("  4. 02_top_ips_falhas.png - IPs suspeitos")
-print("  5. 03_top_usuarios_atacados.png - Usuários atacados")
-print("  6. 04_atividade_por_hora.png - Atividade temporal")
-print("\n" + "="*60)
-
-# 9. ANÁLISE AVANÇADA COM IA GENERATIVA (LLM LOCAL)
-print("\n[9] Gerando análise avançada com IA (Mistral via Ollama)...")
-
-from ia_logs import analisar_com_llm
-
-with open("resultados/relatorio_seguranca.txt", "r", encoding="utf-8") as f:
-    texto_base = f.read()
-
-analise_avancada = analisar_com_llm(texto_base)
-
-with open("resultados/relatorio_ia_avancado.txt", "w", encoding="utf-8") as f:
-    f.write(analise_avancada)
-
-print("✓ Arquivo salvo: resultados/relatorio_ia_avancado.txt")
+    return relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise de logs de servidor Linux")
+    parser.add_argument("arquivo", nargs="?", default="logs_exemplo.txt",
+                        help="Arquivo, diretório ou glob (ex.: '/var/log/auth.log*'); "
+                             "aceita arquivos .gz, .bz2 e .xz (padrão: logs_exemplo.txt)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Número de processos para o parse (padrão: 1 para um arquivo "
+                             "de texto; todos os núcleos para conjuntos rotacionados/comprimidos)")
+    parser.add_argument("--follow", action="store_true",
+                        help="Processa apenas os eventos novos desde a última execução")
+    parser.add_argument("--checkpoint", default="resultados/checkpoint.json",
+                        help="Arquivo de checkpoint do modo --follow")
+    parser.add_argument("--topk-capacidade", type=int, default=0,
+                        help="Rankings de IPs/usuários aproximados (Space-Saving) com no "
+                             "máximo N contadores; 0 = contagem exata (padrão)")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Ignora as estatísticas em cache e refaz o parse")
+    parser.add_argument("--atualizar-ia", action="store_true",
+                        help="Ignora a análise de IA em cache e gera uma nova")
+    parser.add_argument("--ia-orcamento-tokens", type=int, default=0,
+                        help="Analisa o relatório com a IA em partes de até N tokens, enviadas "
+                             "em paralelo e consolidadas no final; 0 = prompt único (padrão)")
+    parser.add_argument("--ia-paralelismo", type=int, default=4,
+                        help="Partes analisadas ao mesmo tempo com --ia-orcamento-tokens (padrão: 4)")
+    parser.add_argument("--multiformato", action="store_true",
+                        help="Usa o registro de parsers (sshd, sudo, su, PAM, journald JSON, "
+                             "nginx) e grava uma tabela por parser")
+    args = parser.parse_args()
+    caminho_log = args.arquivo
+    capacidade_topk = args.topk_capacidade or None
+
+    print("=" * 60)
+    print("ANÁLISE DE LOGS DE SERVIDOR LINUX")
+    print("=" * 60)
+
+    # 1. LER O ARQUIVO DE LOGS
+    print("\n[1] Lendo arquivo de logs...")
+    caminhos = expandir_entrada(caminho_log)
+    if not caminhos:
+        print(f"✗ Erro: arquivo '{caminho_log}' não encontrado!")
+        return
+    conjunto = len(caminhos) > 1 or eh_comprimido(caminhos[0])
+    if conjunto:
+        print(f"✓ {len(caminhos)} arquivo(s) encontrados (do mais antigo ao mais novo):")
+        for caminho in caminhos:
+            print(f"   - {caminho}")
+    if args.follow and conjunto:
+        print("✗ Erro: o modo --follow aceita apenas um arquivo de texto")
+        return
+    if args.follow and args.multiformato:
+        print("✗ Erro: os modos --follow e --multiformato não podem ser combinados")
+        return
+
+    # 2. EXTRAIR DADOS DOS LOGS
+    # O parser lê o arquivo em streaming e entrega lotes de tamanho fixo,
+    # aplicando um único regex pré-compilado por linha.
+    # Exemplo: Jan 15 08:23:45 servidor-web sshd[12453]: Failed password for invalid user admin from 203.0.113.45 port 54321 ssh2
+    print("\n[2] Extraindo dados dos logs...")
+
+    agregados = None
+    if args.follow:
+        agregados = executar_incremental(caminhos[0], args.checkpoint, capacidade_topk)
+    elif args.multiformato:
+        # As tabelas por parser não ficam no cache: o parse é sempre refeito
+        agregados = extrair_multiformato(caminhos, capacidade_topk)
+    elif not args.sem_cache and os.path.exists(CAMINHO_CSV):
+        agregados = carregar_cache(caminhos, CAMINHO_CACHE, capacidade_topk)
+        if agregados is not None:
+            print(f"✓ Entrada sem alterações: estatísticas carregadas de {CAMINHO_CACHE}")
+
+    if agregados is None:
+        agregados = extrair(caminhos, conjunto, args.processos, capacidade_topk)
+        salvar_cache(agregados, caminhos, CAMINHO_CACHE)
+        print(f"✓ Dados extraídos com sucesso!")
+
+    # 3. CONSOLIDAR ESTATÍSTICAS
+    print("\n[3] Organizando estatísticas...")
+    print(f"✓ Estatísticas consolidadas de {agregados.total_eventos} registros!")
+
+    # 4. ANÁLISES E ESTATÍSTICAS
+    print("\n[4] Realizando análises...")
+
+    print(f"\n   Total de eventos: {agregados.total_eventos}")
+    print(f"   ✓ Logins bem-sucedidos: {agregados.status['SUCESSO']}")
+    print(f"   ✗ Falhas de login: {agregados.status['FALHA']}")
+
+    if agregados.aproximado:
+        print(f"\n   Rankings aproximados (Space-Saving): erro máximo de "
+              f"±{agregados.erro_maximo_topk()} tentativas por item")
+
+    # IPs com mais tentativas falhadas
+    print("\n   Top 5 IPs com falhas de login:")
+    for i, (ip, count) in enumerate(agregados.top_ips(5), 1):
+        print(f"   {i}. {ip}: {count} tentativas")
+
+    # Usuários mais atacados
+    print("\n   Top 5 usuários mais atacados:")
+    for i, (user, count) in enumerate(agregados.top_usuarios(5), 1):
+        print(f"   {i}. {user}: {count} tentativas")
+
+    # 5. RELATÓRIO EM CSV (gravado durante a extração)
+    print("\n[5] Salvando relatório em CSV...")
+    print(f"✓ Arquivo salvo: {CAMINHO_CSV}")
+
+    # 6. CRIAR GRÁFICOS
+    print("\n[6] Gerando gráficos...")
+    gerar_graficos(agregados)
+
+    # 7. CRIAR RELATÓRIO EM TEXTO
+    print("\n[7] Gerando relatório em texto...")
+    relatorio = gerar_relatorio(agregados)
+
+    with open("resultados/relatorio_seguranca.txt", "w", encoding="utf-8") as f:
+        f.write(relatorio)
+
+    print("✓ Arquivo salvo: resultados/relatorio_seguranca.txt")
+
+    # 8. MENSAGEM FINAL
+    print("\n" + "="*60)
+    print("✓ ANÁLISE CONCLUÍDA COM SUCESSO!")
+    print("="*60)
+    print("\nArquivos gerados na pasta 'resultados/':")
+    print("  1. relatorio_completo.csv - Dados em formato tabular")
+    print("  2. relatorio_seguranca.txt - Relatório executivo")
+    print("  3. 01_sucessos_vs_falhas.png - Gráfico de distribuição")
+    print("  4. 02_top_ips_falhas.png - IPs suspeitos")
+    print("  5. 03_top_usuarios_atacados.png - Usuários atacados")
+    print("  6. 04_atividade_por_hora.png - Atividade temporal")
+    print("\n" + "="*60)
+
+    # 9. ANÁLISE AVANÇADA COM IA GENERATIVA (LLM LOCAL)
+    print("\n[9] Gerando análise avançada com IA (Mistral via Ollama)...")
+
+    from ia_logs import analisar_com_llm
+    from comum.cache_llm import cache_padrao
+
+    with open("resultados/relatorio_seguranca.txt", "r", encoding="utf-8") as f:
+        texto_base = f.read()
+
+    # A resposta é exibida no console conforme o modelo gera
+    analise_avancada = analisar_com_llm(texto_base, ao_receber=lambda trecho: print(trecho, end="", flush=True),
+                                        forcar_atualizacao=args.atualizar_ia,
+                                        orcamento_tokens=args.ia_orcamento_tokens, paralelismo=args.ia_paralelismo)
+    print()
+    print(f"✓ Cache de análises IA: {cache_padrao().resumo()}")
+
+    with open("resultados/relatorio_ia_avancado.txt", "w", encoding="utf-8") as f:
+        f.write(analise_avancada)
+
+    print("✓ Arquivo salvo: resultados/relatorio_ia_avancado.txt")
+
+
+
+if __name__ == "__main__":
+    main()
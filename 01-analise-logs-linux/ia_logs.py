@@ -1,7 +1,11 @@
-import subprocess
+import os
+import sys
 
-def analisar_com_llm(texto_relatorio):
-    prompt = f"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.analise_em_partes import analisar_em_partes
+
+# Template do prompt; faz parte da chave do cache de análises
+PROMPT_ANALISE_LOGS = """
 Você é um especialista sênior em segurança ofensiva e defensiva.
 Analise o relatório de logs abaixo e produza:
 
@@ -17,25 +21,14 @@ Relatório:
 {texto_relatorio}
 """
 
-    comando = [
-        r"C:\Users\Bernardo\AppData\Local\Programs\Ollama\ollama.exe",
-        "run",
-        "mistral"
-    ]
-
-    processo = subprocess.Popen(
-        comando,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding='utf-8',
-        errors='replace'
+def analisar_com_llm(texto_relatorio, ao_receber=None, forcar_atualizacao=False,
+                     orcamento_tokens=0, paralelismo=4):
+    return analisar_em_partes(
+        PROMPT_ANALISE_LOGS, texto_relatorio,
+        orcamento_tokens=orcamento_tokens,
+        paralelismo=paralelismo,
+        ao_receber=ao_receber,
+        forcar_atualizacao=forcar_atualizacao,
+        aviso="Aviso do modelo:",
+        falha="Não foi possível gerar análise.",
     )
-
-    saida, erro = processo.communicate(prompt)
-
-    if erro:
-        print("Aviso do modelo:", erro)
-
-    return saida if saida else "Não foi possível gerar análise."
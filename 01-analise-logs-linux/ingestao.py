@@ -0,0 +1,242 @@
+import bz2
+import glob
+import gzip
+import lzma
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from agregacao import Agregados
+from parser_logs import COLUNAS, parse_bytes
+
+# Tamanho dos blocos descomprimidos entregues ao parser
+TAMANHO_BLOCO = 4 * 1024 * 1024
+
+# Blocos que a thread de leitura pode adiantar enquanto o parser trabalha
+BLOCOS_EM_ESPERA = 4
+
+# Intervalo (s) em que a thread de leitura confere se o consumidor parou
+ESPERA_FILA = 0.1
+
+# Bytes (já descomprimidos) lidos para decidir se um arquivo é texto
+AMOSTRA_TEXTO = 4096
+
+# Assinaturas (magic bytes) dos formatos suportados
+ASSINATURAS = [
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+]
+
+# auth.log, auth.log.1, auth.log.2.gz, auth.log.10.xz ...
+PADRAO_ROTACAO = re.compile(r"^(?P<base>.+?)(?:\.(?P<indice>\d+))?(?:\.(?:gz|bz2|xz))?$")
+
+
+def expandir_entrada(entrada: str) -> List[str]:
+    """
+    Converte a entrada (arquivo, diretório ou glob) na lista de arquivos de log,
+    em ordem cronológica dentro de cada nome base. Um diretório com vários
+    conjuntos (auth.log* e syslog*) fica agrupado por base; o
+    `processar_conjunto` intercala os registros pelo timestamp.
+
+    Em diretórios e globs, arquivos binários (wtmp, btmp, lastlog, journal)
+    e ilegíveis ficam de fora; um arquivo indicado pelo nome é sempre aceito.
+
+    Args:
+        entrada (str): Ex.: "auth.log", "/var/log/" ou "/var/log/auth.log*"
+
+    Returns:
+        list[str]: Arquivos do mais antigo (auth.log.N.gz) ao mais novo (auth.log)
+    """
+    if os.path.isdir(entrada):
+        caminhos = [os.path.join(entrada, nome) for nome in os.listdir(entrada)]
+    elif glob.has_magic(entrada):
+        caminhos = glob.glob(entrada)
+    else:
+        return [entrada] if os.path.isfile(entrada) else []
+
+    return sorted((c for c in caminhos if os.path.isfile(c) and eh_texto(c)), key=_chave_cronologica)
+
+
+def eh_texto(caminho: str) -> bool:
+    """
+    Indica se o arquivo (descomprimido, se for o caso) parece um log de texto:
+    o início não tem bytes NUL, presentes nos registros binários do wtmp/btmp.
+    """
+    try:
+        with abrir_log(caminho) as arquivo:
+            inicio = arquivo.read(AMOSTRA_TEXTO)
+    except (OSError, EOFError, lzma.LZMAError):
+        return False
+    return b"\x00" not in inicio
+
+
+def _chave_cronologica(caminho: str) -> Tuple[str, int]:
+    """
+    Ordena por nome base e, dentro dele, do maior índice de rotação (mais
+    antigo) ao arquivo sem índice (o atual).
+    """
+    match = PADRAO_ROTACAO.match(os.path.basename(caminho))
+    indice = int(match.group("indice")) if match.group("indice") else 0
+    return match.group("base"), -indice
+
+
+def nome_base(caminho: str) -> str:
+    """
+    Nome do conjunto rotacionado do arquivo (auth.log.2.gz -> auth.log).
+    """
+    return PADRAO_ROTACAO.match(os.path.basename(caminho)).group("base")
+
+
+def abrir_log(caminho: str) -> BinaryIO:
+    """
+    Abre o arquivo em modo binário, descomprimindo em streaming quando for
+    gzip, bz2 ou xz (o formato é detectado pelos magic bytes, não pela extensão).
+    """
+    with open(caminho, "rb") as arquivo:
+        inicio = arquivo.read(6)
+    for assinatura, abrir in ASSINATURAS:
+        if inicio.startswith(assinatura):
+            return abrir(caminho, "rb")
+    return open(caminho, "rb")
+
+
+def eh_comprimido(caminho: str) -> bool:
+    """
+    Indica se o arquivo está em um dos formatos comprimidos suportados.
+    """
+    with open(caminho, "rb") as arquivo:
+        inicio = arquivo.read(6)
+    return any(inicio.startswith(assinatura) for assinatura, _ in ASSINATURAS)
+
+
+def _ler_blocos(caminho: str) -> Iterator[bytes]:
+    """
+    Lê o arquivo em uma thread separada e entrega os blocos descomprimidos.
+
+    zlib, bz2 e lzma liberam o GIL durante a descompressão, então a leitura
+    do próximo bloco acontece em paralelo com o parse do bloco atual.
+
+    Se o consumidor parar antes do fim (exceção ou gerador fechado), a
+    thread de leitura é avisada e termina em vez de ficar presa na fila.
+    """
+    fila: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=BLOCOS_EM_ESPERA)
+    parada = threading.Event()
+    erros: List[BaseException] = []
+
+    def entregar(bloco: Optional[bytes]) -> bool:
+        # put com espera limitada: desiste quando o consumidor parou
+        while not parada.is_set():
+            try:
+                fila.put(bloco, timeout=ESPERA_FILA)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produtor():
+        try:
+            with abrir_log(caminho) as arquivo:
+                while True:
+                    bloco = arquivo.read(TAMANHO_BLOCO)
+                    if not bloco or not entregar(bloco):
+                        break
+        except BaseException as erro:
+            erros.append(erro)
+        finally:
+            entregar(None)
+
+    leitor = threading.Thread(target=produtor, daemon=True)
+    leitor.start()
+    try:
+        while True:
+            bloco = fila.get()
+            if bloco is None:
+                break
+            yield bloco
+    finally:
+        parada.set()
+        # Descarta os blocos já lidos, liberando um put em andamento
+        while leitor.is_alive():
+            try:
+                fila.get(timeout=ESPERA_FILA)
+            except queue.Empty:
+                pass
+        leitor.join()
+    if erros:
+        raise erros[0]
+
+
+def processar_arquivo(caminho: str, capacidade_topk: Optional[int] = None) -> Tuple[pd.DataFrame, Agregados]:
+    """
+    Faz o parse de um arquivo (comprimido ou não) sem extraí-lo para o disco.
+
+    Returns:
+        tuple[pd.DataFrame, Agregados]: Registros extraídos e estatísticas do arquivo
+    """
+    partes = []
+    agregados = Agregados(capacidade_topk=capacidade_topk)
+    resto = b""
+    referencia = os.path.getmtime(caminho)
+    for bloco in _ler_blocos(caminho):
+        buffer = resto + bloco
+        corte = buffer.rfind(b"\n") + 1
+        resto = buffer[corte:]
+        df = parse_bytes(buffer, 0, corte, referencia)
+        partes.append(df)
+        agregados.atualizar(df)
+
+    # Última linha sem '\n'
+    if resto:
+        df = parse_bytes(resto + b"\n", referencia=referencia)
+        partes.append(df)
+        agregados.atualizar(df)
+
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS), agregados
+    return pd.concat(partes, ignore_index=True), agregados
+
+
+def processar_conjunto(caminhos: List[str], processos: Optional[int] = None,
+                       capacidade_topk: Optional[int] = None) -> Tuple[pd.DataFrame, Agregados]:
+    """
+    Processa um conjunto de arquivos (ex.: auth.log*) em paralelo, um por worker.
+
+    Os maiores arquivos são enviados primeiro para manter o pool ocupado, mas
+    o resultado é montado na ordem de `caminhos` (cronológica, ver
+    `expandir_entrada`). Com mais de um conjunto (ex.: auth.log* e syslog*
+    do mesmo diretório), os registros são intercalados pelo timestamp.
+
+    Args:
+        caminhos (list[str]): Arquivos em ordem cronológica
+        processos (int): Número de processos (padrão: núcleos disponíveis)
+        capacidade_topk (int): Se definido, rankings aproximados com memória fixa
+
+    Returns:
+        tuple[pd.DataFrame, Agregados]: Registros de todos os arquivos e estatísticas somadas
+    """
+    if not caminhos:
+        return pd.DataFrame(columns=COLUNAS), Agregados(capacidade_topk=capacidade_topk)
+
+    processos = min(processos or os.cpu_count() or 1, len(caminhos))
+    if processos == 1:
+        resultados = [processar_arquivo(caminho, capacidade_topk) for caminho in caminhos]
+    else:
+        por_tamanho = sorted(caminhos, key=os.path.getsize, reverse=True)
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = {caminho: executor.submit(processar_arquivo, caminho, capacidade_topk) for caminho in por_tamanho}
+            resultados = [futuros[caminho].result() for caminho in caminhos]
+
+    agregados = Agregados(capacidade_topk=capacidade_topk)
+    for _, parcial in resultados:
+        agregados.merge(parcial)
+    df = pd.concat([parcial for parcial, _ in resultados], ignore_index=True)
+    if len({nome_base(caminho) for caminho in caminhos}) > 1:
+        # Ordenação estável: dentro do mesmo segundo mantém a ordem dos arquivos
+        df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+    return df, agregados
@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+import pandas as pd
+
+from agregacao import Agregados
+from parser_logs import parse_bytes
+
+# Quantidade de bytes lida por vez ao processar o trecho novo do arquivo
+TAMANHO_BLOCO = 16 * 1024 * 1024
+
+# Bytes do início do arquivo usados como assinatura (detecta truncamento
+# seguido de nova escrita que já ultrapassou o offset antigo)
+TAMANHO_ASSINATURA = 512
+
+
+@dataclass
+class Checkpoint:
+    """
+    Posição de leitura de um arquivo de log entre execuções.
+
+    Attributes:
+        inode (int): Inode do arquivo quando o checkpoint foi salvo
+        offset (int): Próximo byte a ser lido
+        resto (bytes): Linha parcial (sem '\\n') lida no fim da última execução
+        assinatura (str): Hash dos primeiros bytes do arquivo
+        agregados (Agregados): Estatísticas acumuladas desde o início
+    """
+    inode: int = 0
+    offset: int = 0
+    resto: bytes = b""
+    assinatura: str = ""
+    agregados: Agregados = field(default_factory=Agregados)
+    atualizado_em: str = ""
+
+
+def carregar_checkpoint(caminho: str, capacidade_topk: Optional[int] = None) -> Checkpoint:
+    """
+    Lê o checkpoint salvo; se ele não existir, retorna um checkpoint vazio.
+
+    `capacidade_topk` só vale para um checkpoint novo: um checkpoint existente
+    mantém o tipo de ranking (exato ou aproximado) com que foi criado.
+    """
+    if not os.path.exists(caminho):
+        return Checkpoint(agregados=Agregados(capacidade_topk=capacidade_topk))
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+
+    return Checkpoint(
+        inode=dados["inode"],
+        offset=dados["offset"],
+        resto=base64.b64decode(dados["resto"]),
+        assinatura=dados.get("assinatura", ""),
+        agregados=Agregados.de_dict(dados["agregados"]),
+        atualizado_em=dados.get("atualizado_em", ""),
+    )
+
+
+def salvar_checkpoint(checkpoint: Checkpoint, caminho: str) -> None:
+    """
+    Grava o checkpoint de forma atômica (arquivo temporário + rename).
+    """
+    checkpoint.atualizado_em = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    dados = {
+        "inode": checkpoint.inode,
+        "offset": checkpoint.offset,
+        "resto": base64.b64encode(checkpoint.resto).decode("ascii"),
+        "assinatura": checkpoint.assinatura,
+        "agregados": checkpoint.agregados.para_dict(),
+        "atualizado_em": checkpoint.atualizado_em,
+    }
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _assinatura(caminho: str, limite: int) -> str:
+    """
+    Hash dos primeiros `limite` bytes do arquivo (no máximo TAMANHO_ASSINATURA).
+    """
+    with open(caminho, "rb") as arquivo:
+        return hashlib.sha1(arquivo.read(min(limite, TAMANHO_ASSINATURA))).hexdigest()
+
+
+def _localizar_rotacionado(caminho_log: str, inode: int) -> Optional[str]:
+    """
+    Procura, no diretório do log, o arquivo que ainda tem o inode antigo
+    (ex.: auth.log renomeado para auth.log.1 pelo logrotate).
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho_log))
+    prefixo = os.path.basename(caminho_log)
+    for nome in sorted(os.listdir(diretorio)):
+        if not nome.startswith(prefixo) or nome == prefixo:
+            continue
+        candidato = os.path.join(diretorio, nome)
+        try:
+            if os.stat(candidato).st_ino == inode:
+                return candidato
+        except OSError:
+            continue
+    return None
+
+
+def _ler_novos(caminho: str, offset: int, resto: bytes) -> Iterator[Tuple[pd.DataFrame, int, bytes]]:
+    """
+    Lê o arquivo a partir de `offset` em blocos e entrega apenas linhas completas.
+
+    Yields:
+        tuple[pd.DataFrame, int, bytes]: Registros do bloco, novo offset e
+        a linha parcial que sobrou no fim do bloco
+    """
+    referencia = os.path.getmtime(caminho)
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(offset)
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            offset += len(bloco)
+            buffer = resto + bloco
+            corte = buffer.rfind(b"\n") + 1
+            resto = buffer[corte:]
+            df = parse_bytes(buffer, 0, corte, referencia)
+            yield df, offset, resto
+
+
+def processar_incremental(caminho_log: str, checkpoint: Checkpoint) -> Iterator[pd.DataFrame]:
+    """
+    Processa somente os bytes novos do log desde o último checkpoint.
+
+    Trata os dois casos de rotação:
+      - rename (logrotate padrão): o inode mudou; o restante do arquivo
+        antigo é lido antes de começar o novo do byte 0;
+      - truncamento (copytruncate): o arquivo ficou menor que o offset ou
+        seus primeiros bytes mudaram; a leitura recomeça do byte 0 e a
+        linha parcial é descartada.
+
+    O checkpoint é atualizado em memória (offset, resto e agregados) a cada
+    bloco; cabe ao chamador salvá-lo ao final.
+
+    Yields:
+        pd.DataFrame: Registros novos, bloco a bloco
+    """
+    info = os.stat(caminho_log)
+
+    if checkpoint.inode and checkpoint.inode != info.st_ino:
+        antigo = _localizar_rotacionado(caminho_log, checkpoint.inode)
+        if antigo is not None:
+            for df, _, resto in _ler_novos(antigo, checkpoint.offset, checkpoint.resto):
+                checkpoint.agregados.atualizar(df)
+                checkpoint.resto = resto
+                yield df
+            # A última linha do arquivo antigo pode não ter '\n'
+            if checkpoint.resto:
+                df = parse_bytes(checkpoint.resto + b"\n", referencia=os.path.getmtime(antigo))
+                checkpoint.agregados.atualizar(df)
+                yield df
+        checkpoint.offset = 0
+        checkpoint.resto = b""
+    elif info.st_size < checkpoint.offset or \
+            _assinatura(caminho_log, checkpoint.offset) != checkpoint.assinatura:
+        checkpoint.offset = 0
+        checkpoint.resto = b""
+
+    checkpoint.inode = info.st_ino
+    for df, offset, resto in _ler_novos(caminho_log, checkpoint.offset, checkpoint.resto):
+        checkpoint.agregados.atualizar(df)
+        checkpoint.offset = offset
+        checkpoint.resto = resto
+        yield df
+    checkpoint.assinatura = _assinatura(caminho_log, checkpoint.offset)
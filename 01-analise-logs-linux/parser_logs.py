@@ -0,0 +1,318 @@
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agregacao import Agregados
+
+# Quantidade de registros entregue por lote pelo parser
+TAMANHO_LOTE = 10_000
+
+# Padrão único (pré-compilado) aplicado uma vez por linha.
+# Exemplo: Jan 15 08:23:45 servidor-web sshd[12453]: Failed password for invalid user admin from 203.0.113.45 port 54321 ssh2
+# Os separadores usam [ \t] (e não \s) para que o mesmo padrão, compilado
+# em bytes com MULTILINE, nunca atravesse a quebra de linha.
+_FONTE_PADRAO = (
+    r"^(?P<data>\w{3}[ \t]+\d+)[ \t]+(?P<hora>\d+:\d+:\d+)[ \t]"
+    r"(?:.*?(?P<resultado>Accepted|Failed) password for (?:invalid user )?(?P<usuario>\S+)"
+    r" from (?P<ip>\d+\.\d+\.\d+\.\d+))?"
+)
+PADRAO_LINHA = re.compile(_FONTE_PADRAO)
+PADRAO_LINHA_BYTES = re.compile(_FONTE_PADRAO.encode("ascii"), re.MULTILINE)
+
+EVENTOS = {
+    "Accepted": ("Login Bem-sucedido", "SUCESSO"),
+    "Failed": ("Falha de Login", "FALHA"),
+    None: ("Outro", "OUTRO"),
+}
+EVENTOS_BYTES = {
+    (chave.encode("ascii") if chave else None): valor for chave, valor in EVENTOS.items()
+}
+
+MESES = {nome: numero for numero, nome in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+
+
+class RegistroLog(NamedTuple):
+    """
+    Evento de autenticação extraído de uma linha de log.
+    """
+    data: str
+    hora: str
+    ip: str
+    usuario: str
+    evento: str
+    status: str
+
+
+# Colunas dos DataFrames do parser: campos do registro + timestamp (int64,
+# segundos desde 1970 no horário local do log, sem fuso)
+COLUNAS = list(RegistroLog._fields) + ["timestamp"]
+
+
+def calcular_timestamps(datas: pd.Series, horas: pd.Series, referencia: Optional[float] = None) -> np.ndarray:
+    """
+    Converte as colunas "Jan 15" / "08:23:45" do syslog em timestamps int64.
+
+    O syslog não grava o ano. Cada data recebe o ano mais recente em que ela
+    não fica depois da `referencia` (normalmente o mtime do arquivo): com
+    referência em 3 de janeiro, "Dec 31" cai no ano anterior e "Jan 02" no
+    atual. A regra vale para logs que cobrem menos de 12 meses e não depende
+    das linhas vizinhas, então funciona igual em lotes, faixas paralelas e
+    leituras incrementais.
+
+    O parse é feito uma vez por valor distinto (poucas datas e no máximo
+    86.400 horários, muito repetidos em rajadas de ataque) e espalhado para
+    as linhas via códigos do `pd.factorize`.
+
+    Args:
+        datas (pd.Series): Datas no formato do syslog ("Jan 15", "Jan  5")
+        horas (pd.Series): Horários "HH:MM:SS"
+        referencia (float): Epoch do fim do log (padrão: agora)
+
+    Returns:
+        np.ndarray: Timestamps int64 (segundos); -1 para datas inválidas
+    """
+    if len(datas) == 0:
+        return np.empty(0, dtype=np.int64)
+    referencia = datetime.fromtimestamp(referencia) if referencia is not None else datetime.now()
+
+    codigos_data, datas_unicas = pd.factorize(datas)
+    inicio_dia = np.full(len(datas_unicas), -1, dtype=np.int64)
+    epoca = date(1970, 1, 1).toordinal()
+    for i, texto in enumerate(datas_unicas):
+        mes_texto, _, dia_texto = str(texto).partition(" ")
+        mes = MESES.get(mes_texto)
+        try:
+            dia = int(dia_texto)
+            ano = referencia.year if (mes, dia) <= (referencia.month, referencia.day) else referencia.year - 1
+            inicio_dia[i] = (date(ano, mes, dia).toordinal() - epoca) * 86400
+        except (TypeError, ValueError):
+            # 29/02 sem ano bissexto, mês desconhecido etc.
+            continue
+
+    codigos_hora, horas_unicas = pd.factorize(horas)
+    partes = pd.Series(horas_unicas).str.split(":", expand=True).astype(np.int64).to_numpy()
+    segundos_dia = partes[:, 0] * 3600 + partes[:, 1] * 60 + partes[:, 2]
+
+    dias = inicio_dia[codigos_data]
+    return np.where(dias >= 0, dias + segundos_dia[codigos_hora], -1)
+
+
+def adicionar_timestamp(df: pd.DataFrame, referencia: Optional[float] = None) -> pd.DataFrame:
+    """
+    Preenche a coluna `timestamp` de um DataFrame com `data` e `hora`.
+    """
+    df["timestamp"] = calcular_timestamps(df["data"], df["hora"], referencia)
+    return df
+
+
+def parse_linha(linha: str) -> Optional[RegistroLog]:
+    """
+    Converte uma linha de log em um RegistroLog.
+
+    Args:
+        linha (str): Linha bruta do arquivo de log
+
+    Returns:
+        RegistroLog | None: Registro extraído, ou None se a linha não tem data/hora
+    """
+    match = PADRAO_LINHA.match(linha)
+    if match is None:
+        return None
+
+    evento, status = EVENTOS[match.group("resultado")]
+    return RegistroLog(
+        data=match.group("data"),
+        hora=match.group("hora"),
+        ip=match.group("ip") or "N/A",
+        usuario=match.group("usuario") or "N/A",
+        evento=evento,
+        status=status,
+    )
+
+
+def ler_registros(caminho: str, tamanho_lote: int = TAMANHO_LOTE) -> Iterator[List[RegistroLog]]:
+    """
+    Lê o arquivo de log linha a linha e entrega os registros em lotes.
+
+    O arquivo nunca é carregado inteiro em memória: no máximo um lote de
+    `tamanho_lote` registros existe por vez.
+
+    Args:
+        caminho (str): Caminho do arquivo de log
+        tamanho_lote (int): Quantidade máxima de registros por lote
+
+    Yields:
+        list[RegistroLog]: Lote de registros na ordem do arquivo
+    """
+    lote = []
+    with open(caminho, "r", encoding="utf-8", errors="replace") as arquivo:
+        for linha in arquivo:
+            registro = parse_linha(linha)
+            if registro is None:
+                continue
+            lote.append(registro)
+            if len(lote) >= tamanho_lote:
+                yield lote
+                lote = []
+    if lote:
+        yield lote
+
+
+def lote_para_dataframe(lote: List[RegistroLog], referencia: Optional[float] = None) -> pd.DataFrame:
+    """
+    Converte um lote de registros em DataFrame com as colunas padrão.
+
+    Args:
+        lote (list[RegistroLog]): Registros extraídos
+        referencia (float): Epoch usado para inferir o ano (ver `calcular_timestamps`)
+    """
+    df = pd.DataFrame.from_records(lote, columns=RegistroLog._fields)
+    return adicionar_timestamp(df, referencia)
+
+
+def ler_dataframes(caminho: str, tamanho_lote: int = TAMANHO_LOTE) -> Iterator[pd.DataFrame]:
+    """
+    Versão de `ler_registros` que entrega cada lote já como DataFrame.
+    """
+    referencia = os.path.getmtime(caminho)
+    for lote in ler_registros(caminho, tamanho_lote):
+        yield lote_para_dataframe(lote, referencia)
+
+
+def carregar_dataframe(caminho: str, tamanho_lote: int = TAMANHO_LOTE) -> pd.DataFrame:
+    """
+    Lê o arquivo inteiro e retorna um único DataFrame.
+
+    Útil para arquivos pequenos (dashboard, exemplos); para arquivos grandes
+    prefira consumir `ler_registros` / `ler_dataframes` lote a lote.
+    """
+    partes = list(ler_dataframes(caminho, tamanho_lote))
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS)
+    return pd.concat(partes, ignore_index=True)
+
+
+# ========== PARSE PARALELO (MULTIPROCESSO) ==========
+
+def calcular_intervalos(caminho: str, partes: int) -> List[Tuple[int, int]]:
+    """
+    Divide o arquivo em faixas de bytes [inicio, fim) alinhadas a quebras de linha.
+
+    Args:
+        caminho (str): Caminho do arquivo de log
+        partes (int): Quantidade desejada de faixas
+
+    Returns:
+        list[tuple[int, int]]: Faixas contíguas que cobrem o arquivo inteiro
+    """
+    tamanho = os.path.getsize(caminho)
+    if tamanho == 0:
+        return []
+
+    with open(caminho, "rb") as arquivo, \
+            mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        cortes = [0]
+        for i in range(1, partes):
+            posicao = mm.find(b"\n", max(tamanho * i // partes, cortes[-1]))
+            if posicao == -1:
+                break
+            if posicao + 1 > cortes[-1]:
+                cortes.append(posicao + 1)
+        cortes.append(tamanho)
+
+    return [(inicio, fim) for inicio, fim in zip(cortes, cortes[1:]) if fim > inicio]
+
+
+def parse_bytes(buffer, inicio: int = 0, fim: Optional[int] = None,
+                referencia: Optional[float] = None) -> pd.DataFrame:
+    """
+    Aplica o padrão em bytes sobre um buffer (bytes, mmap) sem decodificar linhas.
+
+    Apenas os grupos capturados viram str, com cache para os valores
+    repetidos (IPs, usuários, datas).
+
+    Args:
+        buffer: Conteúdo em bytes, começando no início de uma linha
+        inicio (int): Posição inicial (deve estar no início de uma linha)
+        fim (int): Posição final (exclusiva); padrão: fim do buffer
+        referencia (float): Epoch usado para inferir o ano (ver `calcular_timestamps`)
+
+    Returns:
+        pd.DataFrame: Registros extraídos
+    """
+    fim = len(buffer) if fim is None else fim
+    colunas: Dict[str, list] = {coluna: [] for coluna in RegistroLog._fields}
+    textos: Dict[bytes, str] = {}
+
+    def texto(valor: Optional[bytes]) -> str:
+        if valor is None:
+            return "N/A"
+        convertido = textos.get(valor)
+        if convertido is None:
+            convertido = textos[valor] = valor.decode("utf-8", errors="replace")
+        return convertido
+
+    for match in PADRAO_LINHA_BYTES.finditer(buffer, inicio, fim):
+        data, hora, resultado, usuario, ip = match.group("data", "hora", "resultado", "usuario", "ip")
+        evento, status = EVENTOS_BYTES[resultado]
+        colunas["data"].append(texto(data))
+        colunas["hora"].append(texto(hora))
+        colunas["ip"].append(texto(ip))
+        colunas["usuario"].append(texto(usuario))
+        colunas["evento"].append(evento)
+        colunas["status"].append(status)
+
+    return adicionar_timestamp(pd.DataFrame(colunas, columns=RegistroLog._fields), referencia)
+
+
+def _parse_intervalo(args: Tuple[str, int, int, Optional[int]]) -> Tuple[pd.DataFrame, Agregados]:
+    """
+    Worker: aplica `parse_bytes` sobre uma faixa do arquivo mapeado em memória
+    e já devolve as estatísticas parciais da faixa.
+    """
+    caminho, inicio, fim, capacidade_topk = args
+    with open(caminho, "rb") as arquivo, \
+            mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        df = parse_bytes(mm, inicio, fim, os.path.getmtime(caminho))
+    return df, Agregados(capacidade_topk=capacidade_topk).atualizar(df)
+
+
+def parse_paralelo(caminho: str, processos: Optional[int] = None, partes_por_processo: int = 4,
+                   capacidade_topk: Optional[int] = None) -> Tuple[pd.DataFrame, Agregados]:
+    """
+    Faz o parse do arquivo em vários processos e junta os resultados.
+
+    O resultado é idêntico ao de `carregar_dataframe` (mesmas linhas, mesma
+    ordem): as faixas são processadas independentemente e concatenadas na
+    ordem do arquivo.
+
+    Args:
+        caminho (str): Caminho do arquivo de log
+        processos (int): Número de processos (padrão: núcleos disponíveis)
+        partes_por_processo (int): Faixas por processo, para balancear a carga
+        capacidade_topk (int): Se definido, rankings aproximados com memória fixa
+
+    Returns:
+        tuple[pd.DataFrame, Agregados]: Registros extraídos e estatísticas somadas
+    """
+    processos = processos or os.cpu_count() or 1
+    intervalos = calcular_intervalos(caminho, processos * partes_por_processo)
+    if not intervalos:
+        return pd.DataFrame(columns=COLUNAS), Agregados(capacidade_topk=capacidade_topk)
+
+    tarefas = [(caminho, inicio, fim, capacidade_topk) for inicio, fim in intervalos]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        resultados = list(executor.map(_parse_intervalo, tarefas))
+
+    agregados = Agregados(capacidade_topk=capacidade_topk)
+    for _, parcial in resultados:
+        agregados.merge(parcial)
+    df = pd.concat([parcial for parcial, _ in resultados], ignore_index=True)
+    return df, agregados
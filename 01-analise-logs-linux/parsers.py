@@ -0,0 +1,412 @@
+import io
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ingestao import abrir_log
+from parser_logs import COLUNAS, EVENTOS, MESES, TAMANHO_LOTE, calcular_timestamps
+
+# Colunas comuns a todas as tabelas do registro de parsers
+COLUNAS_CABECALHO = ("data", "hora", "host", "programa")
+
+
+@dataclass
+class ParserLog:
+    """
+    Parser de um tipo de mensagem, registrado pelas tags de programa que atende.
+
+    Attributes:
+        nome (str): Nome do parser (também nome da tabela de saída)
+        programas (tuple[str]): Tags do syslog tratadas (ex.: "sshd", "sudo")
+        esquema (tuple[str]): Colunas extraídas, na ordem devolvida por `extrair`
+        contem (tuple[str]): Pré-filtro: a mensagem precisa conter um destes textos
+        extrair (Callable): Recebe a mensagem e devolve a tupla do esquema ou None
+    """
+    nome: str
+    programas: Tuple[str, ...]
+    esquema: Tuple[str, ...]
+    contem: Tuple[str, ...]
+    extrair: Callable[[str], Optional[tuple]]
+
+    @property
+    def colunas(self) -> List[str]:
+        """Colunas da tabela de saída: cabeçalho + esquema + timestamp."""
+        return list(COLUNAS_CABECALHO) + list(self.esquema) + ["timestamp"]
+
+    def aceita(self, mensagem: str) -> bool:
+        """Pré-filtro por substring, avaliado antes de qualquer regex."""
+        return any(texto in mensagem for texto in self.contem)
+
+
+@dataclass
+class EstatisticaParser:
+    """
+    Contadores de um parser (o tempo é medido por lote, não por parser).
+    """
+    testadas: int = 0
+    aceitas: int = 0
+    bytes: int = 0
+
+
+# Parsers indexados pela tag do programa e pelo nome
+REGISTRO: Dict[str, List[ParserLog]] = {}
+PARSERS: Dict[str, ParserLog] = {}
+
+
+def registrar(parser: ParserLog) -> ParserLog:
+    """
+    Adiciona um parser ao registro; a ordem de registro é a ordem de tentativa.
+    """
+    PARSERS[parser.nome] = parser
+    for programa in parser.programas:
+        REGISTRO.setdefault(programa, []).append(parser)
+    return parser
+
+
+# ========== PARSERS ==========
+
+# sshd: Failed password for invalid user admin from 203.0.113.45 port 54321 ssh2
+PADRAO_SSHD = re.compile(
+    r"(?P<resultado>Accepted|Failed) password for (?:invalid user )?(?P<usuario>\S+)"
+    r" from (?P<ip>\d+\.\d+\.\d+\.\d+)"
+)
+
+
+def _extrair_sshd(mensagem: str) -> Optional[tuple]:
+    match = PADRAO_SSHD.match(mensagem)
+    if match is None:
+        return None
+    evento, status = EVENTOS[match.group("resultado")]
+    return match.group("ip"), match.group("usuario"), evento, status
+
+
+# sudo: bernardo : TTY=pts/0 ; PWD=/home/bernardo ; USER=root ; COMMAND=/usr/bin/apt update
+# sudo: bernardo : 3 incorrect password attempts ; TTY=pts/0 ; PWD=/home/bernardo ; USER=root ; COMMAND=/bin/ls
+PADRAO_SUDO = re.compile(
+    r"\s*(?P<usuario>\S+) : (?:(?P<motivo>[^;=]+?) ; )?TTY=(?P<tty>\S+) ; PWD=(?P<diretorio>.*?) ;"
+    r" USER=(?P<usuario_alvo>\S+) ; (?:.*?; )?COMMAND=(?P<comando>.*)$"
+)
+
+
+def _extrair_sudo(mensagem: str) -> Optional[tuple]:
+    match = PADRAO_SUDO.match(mensagem)
+    if match is None:
+        return None
+    motivo = match.group("motivo")
+    return (match.group("usuario"), match.group("usuario_alvo"), match.group("tty"),
+            match.group("diretorio"), match.group("comando").strip(),
+            "NEGADO" if motivo else "EXECUTADO", motivo or "")
+
+
+# su: (to root) bernardo on pts/0 | su: FAILED SU (to root) bernardo on pts/0
+# su[812]: Successful su for root by bernardo | su[812]: FAILED su for root by bernardo
+PADRAO_SU = re.compile(
+    r"(?:(?P<falha>FAILED SU )?\(to (?P<alvo>\S+)\) (?P<usuario>\S+) on (?P<tty>\S+)"
+    r"|(?P<resultado>Successful|FAILED) su for (?P<alvo_debian>\S+) by (?P<usuario_debian>\S+))"
+)
+
+
+def _extrair_su(mensagem: str) -> Optional[tuple]:
+    match = PADRAO_SU.match(mensagem)
+    if match is None:
+        return None
+    if match.group("alvo"):
+        falha = bool(match.group("falha"))
+        return (match.group("usuario"), match.group("alvo"), match.group("tty"),
+                "FALHA" if falha else "SUCESSO")
+    falha = match.group("resultado") == "FAILED"
+    return (match.group("usuario_debian"), match.group("alvo_debian"), "N/A",
+            "FALHA" if falha else "SUCESSO")
+
+
+# pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost=203.0.113.45  user=root
+# pam_unix(sshd:session): session opened for user bernardo(uid=1000) by (uid=0)
+PADRAO_PAM = re.compile(
+    r"(?P<modulo>pam_\w+)\((?P<servico>[^:)]+):(?P<tipo>\w+)\): (?P<acao>[^;(]+?)(?:;|$| for user (?P<usuario>[^\s(]+))"
+)
+PADRAO_PAM_CAMPO = re.compile(r"\b(rhost|user)=(\S*)")
+
+
+def _extrair_pam(mensagem: str) -> Optional[tuple]:
+    match = PADRAO_PAM.match(mensagem)
+    if match is None:
+        return None
+    campos = dict(PADRAO_PAM_CAMPO.findall(mensagem, match.end()))
+    usuario = match.group("usuario") or campos.get("user") or "N/A"
+    return (match.group("modulo"), match.group("servico"), match.group("tipo"),
+            match.group("acao").strip(), usuario, campos.get("rhost") or "N/A")
+
+
+# 203.0.113.45 - - [15/Jan/2025:08:23:45 +0000] "GET /wp-login.php HTTP/1.1" 404 153 "-" "curl/7.68.0"
+PADRAO_NGINX = re.compile(
+    r'(?P<ip>\S+) \S+ (?P<usuario>\S+) \[(?P<momento>[^\]]+)\] "(?P<metodo>\S+) (?P<caminho>\S+)'
+    r'(?: (?P<protocolo>[^"]*))?" (?P<status>\d{3}) (?P<bytes>\d+|-)'
+    r'(?: "(?P<referer>[^"]*)" "(?P<agente>[^"]*)")?'
+)
+
+
+def _extrair_nginx(mensagem: str) -> Optional[tuple]:
+    match = PADRAO_NGINX.match(mensagem)
+    if match is None:
+        return None
+    tamanho = match.group("bytes")
+    return (match.group("ip"), match.group("usuario"), match.group("momento"), match.group("metodo"),
+            match.group("caminho"), match.group("protocolo") or "", int(match.group("status")),
+            0 if tamanho == "-" else int(tamanho), match.group("referer") or "", match.group("agente") or "")
+
+
+PARSER_SSHD = registrar(ParserLog(
+    nome="sshd", programas=("sshd",), contem=(" password for ",),
+    esquema=("ip", "usuario", "evento", "status"), extrair=_extrair_sshd,
+))
+registrar(ParserLog(
+    nome="sudo", programas=("sudo",), contem=("COMMAND=",),
+    esquema=("usuario", "usuario_alvo", "tty", "diretorio", "comando", "status", "motivo"),
+    extrair=_extrair_sudo,
+))
+registrar(ParserLog(
+    nome="su", programas=("su",), contem=("(to ", " su for "),
+    esquema=("usuario", "usuario_alvo", "tty", "status"), extrair=_extrair_su,
+))
+registrar(ParserLog(
+    nome="pam", programas=("sshd", "su", "sudo", "login", "cron", "systemd-logind", "gdm-password"),
+    contem=("pam_",), esquema=("modulo", "servico", "tipo", "acao", "usuario", "rhost"),
+    extrair=_extrair_pam,
+))
+PARSER_NGINX = registrar(ParserLog(
+    nome="nginx", programas=("nginx",), contem=('" ',),
+    esquema=("ip", "usuario", "momento", "metodo", "caminho", "protocolo", "status_http", "bytes",
+             "referer", "user_agent"),
+    extrair=_extrair_nginx,
+))
+# {"__REALTIME_TIMESTAMP":"1736929425000000","_HOSTNAME":"servidor-web","SYSLOG_IDENTIFIER":"sshd",
+#  "_PID":"12453","PRIORITY":"6","MESSAGE":"Failed password for root from 203.0.113.45 port 54321 ssh2"}
+def _extrair_journald(linha: str) -> Optional[tuple]:
+    """
+    Uma entrada de `journalctl -o json`. Diferente dos outros parsers, a
+    linha inteira é a entrada: devolve o cabeçalho (data, hora, host,
+    programa) seguido do esquema, já que não há cabeçalho de syslog.
+    """
+    try:
+        entrada = json.loads(linha)
+        momento = datetime.fromtimestamp(int(entrada["__REALTIME_TIMESTAMP"]) / 1_000_000)
+    except (ValueError, KeyError, TypeError, OverflowError, OSError):
+        return None
+    mensagem = entrada.get("MESSAGE", "")
+    if not isinstance(mensagem, str):
+        # Mensagens binárias vêm como lista de bytes
+        try:
+            mensagem = bytes(mensagem).decode("utf-8", errors="replace")
+        except (TypeError, ValueError):
+            return None
+    return (momento.strftime("%b %d"), momento.strftime("%H:%M:%S"), entrada.get("_HOSTNAME", "N/A"),
+            entrada.get("SYSLOG_IDENTIFIER", ""), entrada.get("_PID", "N/A"),
+            entrada.get("PRIORITY", "N/A"), mensagem)
+
+
+PARSER_JOURNALD = ParserLog(
+    nome="journald", programas=(), contem=('"MESSAGE"',),
+    esquema=("pid", "prioridade", "mensagem"), extrair=_extrair_journald,
+)
+PARSERS[PARSER_JOURNALD.nome] = PARSER_JOURNALD
+
+
+# ========== PROCESSAMENTO ==========
+
+@dataclass
+class ProcessadorMultiformato:
+    """
+    Classifica linhas de syslog, journald (journalctl -o json) e nginx e
+    acumula uma tabela por parser.
+
+    O despacho usa só operações de texto: a tag do programa é lida do
+    cabeçalho do syslog (ou do campo SYSLOG_IDENTIFIER do journald), o
+    registro devolve os parsers daquela tag e o pré-filtro por substring
+    descarta as mensagens que não interessam antes de qualquer regex.
+
+    Toda linha com data/hora (syslog ou journald) também gera uma linha na
+    tabela `registros`, no formato de COLUNAS usado pelo relatório: eventos
+    do sshd classificados e o resto como "Outro", como no parser padrão.
+
+    O tempo de parse é somado em `segundos` por lote (em `ler_multiformato`),
+    não a cada linha: a vazão exibida é a do conjunto de parsers.
+    """
+    referencia: Optional[float] = None
+    estatisticas: Dict[str, EstatisticaParser] = field(
+        default_factory=lambda: {nome: EstatisticaParser() for nome in PARSERS})
+    ignoradas: int = 0
+    linhas: int = 0
+    bytes: int = 0
+    segundos: float = 0.0
+    _tabelas: Dict[str, list] = field(default_factory=dict)
+
+    def _linhas(self, nome: str) -> list:
+        if nome not in self._tabelas:
+            self._tabelas[nome] = []
+        return self._tabelas[nome]
+
+    def _despachar(self, data: str, hora: str, host: str, programa: str, mensagem: str) -> None:
+        registro_sshd = None
+        for parser in REGISTRO.get(programa, ()):
+            estatistica = self.estatisticas[parser.nome]
+            valores = parser.extrair(mensagem) if parser.aceita(mensagem) else None
+            estatistica.testadas += 1
+            estatistica.bytes += len(mensagem)
+            if valores is None:
+                continue
+            estatistica.aceitas += 1
+            self._linhas(parser.nome).append((data, hora, host, programa) + valores)
+            if parser is PARSER_SSHD:
+                registro_sshd = valores
+            break
+        ip, usuario, evento, status = registro_sshd or ("N/A", "N/A") + EVENTOS[None]
+        self._linhas("registros").append((data, hora, ip, usuario, evento, status))
+
+    def _linha_syslog(self, linha: str) -> None:
+        # Jan 15 08:23:45 servidor-web sshd[12453]: mensagem
+        cabecalho, _, mensagem = linha.partition(": ")
+        partes = cabecalho.split()
+        if len(partes) < 3 or ":" not in partes[2]:
+            self.ignoradas += 1
+            return
+        data = cabecalho[:cabecalho.index(partes[2])].rstrip()
+        host = partes[3] if len(partes) > 3 else "N/A"
+        programa = partes[4].split("[", 1)[0] if len(partes) > 4 else ""
+        self._despachar(data, partes[2], host, programa, mensagem.rstrip("\n"))
+
+    def _linha_journald(self, linha: str) -> None:
+        estatistica = self.estatisticas[PARSER_JOURNALD.nome]
+        valores = PARSER_JOURNALD.extrair(linha) if PARSER_JOURNALD.aceita(linha) else None
+        estatistica.testadas += 1
+        estatistica.bytes += len(linha)
+        if valores is None:
+            self.ignoradas += 1
+            return
+        estatistica.aceitas += 1
+        self._linhas(PARSER_JOURNALD.nome).append(valores)
+        data, hora, host, programa, _, _, mensagem = valores
+        # A mensagem segue para os parsers da tag, como uma linha de syslog
+        self._despachar(data, hora, host, programa, mensagem)
+
+    def _linha_nginx(self, linha: str) -> None:
+        estatistica = self.estatisticas[PARSER_NGINX.nome]
+        valores = PARSER_NGINX.extrair(linha)
+        estatistica.testadas += 1
+        estatistica.bytes += len(linha)
+        if valores is None:
+            self.ignoradas += 1
+            return
+        estatistica.aceitas += 1
+        momento = valores[2]  # 15/Jan/2025:08:23:45 +0000
+        self._linhas(PARSER_NGINX.nome).append(
+            (f"{momento[3:6]} {momento[0:2]}", momento[12:20], "N/A", "nginx") + valores)
+
+    def processar_linha(self, linha: str) -> None:
+        """
+        Encaminha a linha pelo formato, decidido pelos primeiros caracteres.
+        """
+        self.linhas += 1
+        self.bytes += len(linha)
+        if linha[:3] in MESES:
+            self._linha_syslog(linha)
+        elif linha.startswith("{"):
+            self._linha_journald(linha)
+        elif linha[:1].isdigit() and ' "' in linha:
+            self._linha_nginx(linha)
+        else:
+            self.ignoradas += 1
+
+    def pendentes(self) -> int:
+        return sum(len(linhas) for linhas in self._tabelas.values())
+
+    def esvaziar(self) -> Dict[str, pd.DataFrame]:
+        """
+        Converte o que foi acumulado em DataFrames e limpa os buffers.
+
+        Returns:
+            dict[str, pd.DataFrame]: "registros" (formato COLUNAS) e uma tabela
+            por parser com linhas neste lote, nas colunas de `ParserLog.colunas`
+        """
+        tabelas = {}
+        for nome, linhas in self._tabelas.items():
+            if not linhas:
+                continue
+            if nome == "registros":
+                df = pd.DataFrame.from_records(linhas, columns=COLUNAS[:-1])
+            else:
+                df = pd.DataFrame.from_records(linhas, columns=PARSERS[nome].colunas[:-1])
+            if nome == PARSER_NGINX.nome:
+                df["timestamp"] = _timestamps_nginx(df["momento"])
+            else:
+                df["timestamp"] = calcular_timestamps(df["data"], df["hora"], self.referencia)
+            tabelas[nome] = df
+        self._tabelas = {}
+        return tabelas
+
+
+def _timestamps_nginx(momentos: pd.Series) -> np.ndarray:
+    """
+    "15/Jan/2025:08:23:45 +0000" -> int64 no horário local do servidor (o
+    mesmo relógio do syslog), com parse único por segundo distinto.
+    """
+    codigos, unicos = pd.factorize(momentos)
+    convertidos = pd.to_datetime(pd.Series(unicos).str[:20], format="%d/%b/%Y:%H:%M:%S", errors="coerce")
+    segundos = (convertidos - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    return segundos.fillna(-1).astype(np.int64).to_numpy()[codigos]
+
+
+def ler_multiformato(caminho: str, tamanho_lote: int = TAMANHO_LOTE,
+                     processador: Optional[ProcessadorMultiformato] = None) -> Iterator[Dict[str, pd.DataFrame]]:
+    """
+    Lê um arquivo (texto ou comprimido) com o registro de parsers, em lotes.
+
+    Args:
+        caminho (str): Arquivo de log
+        tamanho_lote (int): Linhas acumuladas (somando todas as tabelas) por lote
+        processador (ProcessadorMultiformato): Reaproveitado entre arquivos para
+            somar as estatísticas de desempenho
+
+    Yields:
+        dict[str, pd.DataFrame]: Tabelas do lote (ver `ProcessadorMultiformato.esvaziar`)
+    """
+    processador = processador or ProcessadorMultiformato()
+    processador.referencia = os.path.getmtime(caminho)
+    with io.TextIOWrapper(abrir_log(caminho), encoding="utf-8", errors="replace") as arquivo:
+        # Um par de leituras do relógio por lote (leitura + parse das linhas)
+        inicio = time.perf_counter()
+        for linha in arquivo:
+            processador.processar_linha(linha)
+            if processador.pendentes() >= tamanho_lote:
+                processador.segundos += time.perf_counter() - inicio
+                yield processador.esvaziar()
+                inicio = time.perf_counter()
+        processador.segundos += time.perf_counter() - inicio
+    if processador.pendentes():
+        yield processador.esvaziar()
+
+
+def resumo_desempenho(processador: ProcessadorMultiformato) -> List[str]:
+    """
+    Linhas de texto com o volume de cada parser usado e a vazão total.
+    """
+    linhas = []
+    for nome, estatistica in processador.estatisticas.items():
+        if not estatistica.testadas:
+            continue
+        linhas.append(
+            f"{nome:10s} {estatistica.aceitas:>9,} aceitas / {estatistica.testadas:>9,} testadas"
+            f" | {estatistica.bytes / 1e6:7.2f} MB"
+        )
+    vazao = processador.linhas / processador.segundos if processador.segundos else 0.0
+    linhas.append(
+        f"{'total':10s} {processador.linhas:>9,} linhas"
+        f" | {processador.bytes / 1e6:7.2f} MB | {vazao:>12,.0f} linhas/s"
+    )
+    return linhas
@@ -0,0 +1,163 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+HORAS_SEMANA = 168
+
+# Semanas mais recentes que entram na referência
+SEMANAS_MAXIMAS = 8
+
+# Semanas necessárias para o perfil entrar no modelo: com menos, um ataque
+# que ocupa uma hora vira a mediana daquela hora
+SEMANAS_MINIMAS = 3
+
+# Converte MAD em desvio padrão para dados normais
+FATOR_MAD = 1.4826
+
+# |z| acima deste valor em alguma métrica = desvio do padrão do horário
+LIMIAR_Z_PADRAO = 3.5
+
+
+def hora_da_semana(timestamps):
+    """
+    Índice 0..167 (segunda 00h = 0) de cada timestamp.
+    """
+    ts = pd.to_datetime(timestamps)
+    return (ts.dt.dayofweek * 24 + ts.dt.hour).to_numpy()
+
+
+def _estatisticas_semana(horas, X):
+    """
+    Mediana e MAD por hora da semana de um conjunto de registros (168 x F;
+    NaN nas horas sem registros) e a quantidade de registros por hora.
+    """
+    mediana = pd.DataFrame(X).groupby(horas).median().reindex(range(HORAS_SEMANA)).to_numpy()
+    desvio = np.abs(X - mediana[horas])
+    mad = pd.DataFrame(desvio).groupby(horas).median().reindex(range(HORAS_SEMANA)).to_numpy()
+    return mediana, mad, np.bincount(horas, minlength=HORAS_SEMANA)
+
+
+def _combinar_estatisticas(atual, nova):
+    """
+    Junta dois resumos da mesma semana. Horas presentes em só um deles ficam
+    exatas; horas presentes nos dois recebem a média das medianas e dos MADs
+    ponderada pela quantidade de registros (aproximação).
+    """
+    mediana_a, mad_a, n_a = atual
+    mediana_b, mad_b, n_b = nova
+    n = n_a + n_b
+    peso_a = np.divide(n_a, n, out=np.zeros(len(n)), where=n > 0)[:, None]
+
+    def media(a, b):
+        combinada = np.nan_to_num(a) * peso_a + np.nan_to_num(b) * (1 - peso_a)
+        return np.where((n_a == 0)[:, None], b, np.where((n_b == 0)[:, None], a, combinada))
+
+    return media(mediana_a, mediana_b), media(mad_a, mad_b), n
+
+
+class BaselineSazonal:
+    """
+    Perfil de normalidade por hora da semana: mediana e escala (MAD) de cada
+    métrica nas 168 horas, para que picos habituais (ex.: segunda 9h) não
+    pareçam anomalias.
+
+    Cada semana ISO é resumida (mediana, MAD e contagem por hora) e a tabela
+    final é a mediana dos resumos das últimas SEMANAS_MAXIMAS semanas, então
+    novas semanas entram sem reler o histórico e o perfil tem tamanho fixo
+    (nenhum registro é guardado). Uma semana recebida em partes tem os
+    resumos combinados: exato quando as partes cobrem horas diferentes (ex.:
+    um dia por vez), aproximado quando repetem a mesma hora. Horas sem dados
+    usam os valores globais da métrica.
+
+    Args:
+        features (list[str]): Métricas do perfil
+        semanas_maximas (int): Semanas mantidas na referência
+    """
+
+    def __init__(self, features, semanas_maximas=SEMANAS_MAXIMAS):
+        self.features = list(features)
+        self.semanas_maximas = semanas_maximas
+        self.semanas = {}
+        self.mediana = np.full((HORAS_SEMANA, len(self.features)), np.nan)
+        self.escala = np.full((HORAS_SEMANA, len(self.features)), np.nan)
+
+    def atualizar(self, df):
+        """
+        Incorpora as semanas presentes em `df` (colunas 'timestamp' e features).
+        O resumo de uma semana já conhecida é combinado com o das linhas novas
+        (uma semana pode chegar em várias partes; não repita registros).
+
+        Returns:
+            list[str]: Semanas (AAAA-Www) atualizadas
+        """
+        ts = pd.to_datetime(df['timestamp'])
+        iso = ts.dt.isocalendar()
+        chaves = iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2)
+        horas = hora_da_semana(ts)
+        X = df[self.features].to_numpy(dtype=np.float64)
+
+        atualizadas = []
+        for chave, posicoes in pd.Series(np.arange(len(df))).groupby(chaves.to_numpy()):
+            indices = posicoes.to_numpy()
+            estatisticas = _estatisticas_semana(horas[indices], X[indices])
+            if chave in self.semanas:
+                estatisticas = _combinar_estatisticas(self.semanas[chave], estatisticas)
+            self.semanas[chave] = estatisticas
+            atualizadas.append(chave)
+
+        for chave in sorted(self.semanas)[:-self.semanas_maximas]:
+            del self.semanas[chave]
+        self._recalcular()
+        return atualizadas
+
+    def _recalcular(self):
+        if not self.semanas:
+            return
+        medianas = np.stack([mediana for mediana, _, _ in self.semanas.values()])
+        mads = np.stack([mad for _, mad, _ in self.semanas.values()])
+        with warnings.catch_warnings():
+            # Horas sem dados em nenhuma semana ficam NaN e recebem o valor global
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mediana = np.nanmedian(medianas, axis=0)
+            escala = FATOR_MAD * np.nanmedian(mads, axis=0)
+            mediana_global = np.nanmedian(medianas.reshape(-1, len(self.features)), axis=0)
+            escala_global = FATOR_MAD * np.nanmedian(mads.reshape(-1, len(self.features)), axis=0)
+
+        escala_global = np.where(escala_global > 0, escala_global, 1.0)
+        self.mediana = np.where(np.isnan(mediana), mediana_global, mediana)
+        self.escala = np.where(np.isnan(escala) | (escala <= 0), escala_global, escala)
+
+    def confiavel(self):
+        """
+        Se o perfil já tem semanas suficientes para entrar no modelo.
+        """
+        return len(self.semanas) >= SEMANAS_MINIMAS
+
+    def residuos(self, X, horas):
+        """
+        z robusto das métricas de X (colunas na ordem de self.features) contra
+        o perfil das horas da semana `horas`.
+        """
+        return (X - self.mediana[horas]) / self.escala[horas]
+
+    def pontuar(self, df):
+        """
+        z robusto de cada métrica contra o perfil da hora da semana do registro.
+
+        Returns:
+            np.ndarray: Matriz (registros x features) de z-scores
+        """
+        X = df[self.features].to_numpy(dtype=np.float64)
+        return self.residuos(X, hora_da_semana(df['timestamp']))
+
+    def adicionar_colunas(self, df, limiar_z=LIMIAR_Z_PADRAO):
+        """
+        Acrescenta a `df` as colunas z_<métrica>, z_sazonal_max e anomalia_sazonal.
+        """
+        z = self.pontuar(df)
+        for i, feature in enumerate(self.features):
+            df[f'z_{feature}'] = z[:, i]
+        df['z_sazonal_max'] = np.abs(z).max(axis=1)
+        df['anomalia_sazonal'] = df['z_sazonal_max'] > limiar_z
+        return df
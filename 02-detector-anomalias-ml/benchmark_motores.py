@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
+
+from modelo_anomalias import FEATURES, MOTORES, pontuar_matriz, treinar_modelo
+
+parser = argparse.ArgumentParser(description="Compara os motores de detecção em latência e qualidade")
+parser.add_argument('--dados', default='dados/logs_exemplo.csv',
+                    help="CSV com as quatro métricas e a coluna 'tipo' (padrão: dados/logs_exemplo.csv)")
+parser.add_argument('--fracao-treino', type=float, default=0.6,
+                    help="Fração inicial (em ordem de tempo) usada no treino (padrão: 0.6)")
+parser.add_argument('--saida', default='resultados/benchmark_motores.txt',
+                    help="Arquivo com a tabela de resultados")
+args = parser.parse_args()
+
+# ============================================
+# 1. DADOS: treino no início, avaliação no restante (ordem de chegada)
+# ============================================
+
+df = pd.read_csv(args.dados).sort_values('timestamp').reset_index(drop=True)
+rotulos = (df['tipo'] == 'Anômalo').to_numpy()
+corte = int(len(df) * args.fracao_treino)
+treino, teste = df.iloc[:corte], df.iloc[corte:]
+X_teste = teste[FEATURES].to_numpy(dtype=np.float64)
+y_teste = rotulos[corte:]
+
+print("=" * 60)
+print("⏱️ BENCHMARK DOS MOTORES DE DETECÇÃO")
+print("=" * 60)
+print(f"Treino: {len(treino)} registros | Avaliação: {len(teste)} registros "
+      f"({y_teste.sum()} anômalos rotulados)\n")
+
+# ============================================
+# 2. CADA MOTOR: treino, pontuação evento a evento e em lote
+# ============================================
+
+linhas = []
+for motor in MOTORES:
+    inicio = time.perf_counter()
+    pacote = treinar_modelo(treino, motor=motor)
+    tempo_treino = time.perf_counter() - inicio
+
+    # Evento a evento, como no streaming: uma chamada por registro
+    latencias = np.empty(len(X_teste))
+    scores = np.empty(len(X_teste))
+    for i in range(len(X_teste)):
+        inicio = time.perf_counter()
+        _, score = pontuar_matriz(pacote, X_teste[i:i + 1])
+        latencias[i] = time.perf_counter() - inicio
+        scores[i] = score[0]
+    previstos = scores < pacote['limiar']
+
+    # Em lote (o ewma parte do mesmo estado do fim do treino)
+    pacote_lote = treinar_modelo(treino, motor=motor)
+    inicio = time.perf_counter()
+    pontuar_matriz(pacote_lote, X_teste)
+    tempo_lote = time.perf_counter() - inicio
+
+    linhas.append({
+        'motor': motor,
+        'treino_s': tempo_treino,
+        'latencia_p50_us': np.percentile(latencias, 50) * 1e6,
+        'latencia_p99_us': np.percentile(latencias, 99) * 1e6,
+        'lote_us_por_evento': tempo_lote / len(X_teste) * 1e6,
+        'precisao': precision_score(y_teste, previstos, zero_division=0),
+        'recall': recall_score(y_teste, previstos, zero_division=0),
+        'f1': f1_score(y_teste, previstos, zero_division=0),
+        # Score menor = mais anômalo
+        'roc_auc': roc_auc_score(y_teste, -scores),
+    })
+
+resultado = pd.DataFrame(linhas).set_index('motor')
+texto = resultado.to_string(float_format=lambda valor: f"{valor:.3f}")
+print(texto)
+
+with open(args.saida, 'w', encoding='utf-8') as f:
+    f.write("BENCHMARK DOS MOTORES DE DETECÇÃO\n")
+    f.write(f"Dados: {args.dados} | treino: {len(treino)} | avaliação: {len(teste)}\n\n")
+    f.write(texto + "\n")
+
+print(f"\n✓ Resultado salvo: {args.saida}")
@@ -1,16 +1,210 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
+import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from features_janela import CacheFeatures, adicionar_features_janela, interpretar_janelas, nomes_features_janela
+from modelo_anomalias import (CAMINHO_MODELO_PADRAO, FEATURES, TAMANHO_LOTE_PADRAO, carregar_modelo,
+                              MOTORES, descrever_perfil, ler_tabela, pontuar, pontuar_arquivo,
+                              salvar_modelo, treinar_modelo, treinar_modelo_out_of_core)
+
+parser = argparse.ArgumentParser(description="Detector de anomalias em logs com Machine Learning")
+parser.add_argument('--atualizar-ia', action='store_true',
+                    help="Ignora a análise de IA em cache e gera uma nova")
+parser.add_argument('--ia-orcamento-tokens', type=int, default=0,
+                    help="Analisa o relatório com a IA em partes de até N tokens, enviadas "
+                         "em paralelo e consolidadas no final; 0 = prompt único (padrão)")
+parser.add_argument('--ia-paralelismo', type=int, default=4,
+                    help="Partes analisadas ao mesmo tempo com --ia-orcamento-tokens (padrão: 4)")
+parser.add_argument('--janelas', default='',
+                    help="Features de janela deslizante (média, EWMA, diferença e z) com estes "
+                         "tamanhos em registros, ex.: 5,15; vazio = cada registro isolado (padrão)")
+subcomandos = parser.add_subparsers(dest='comando', metavar='{treinar,pontuar,monitorar,atualizar-perfil}',
+                                    help="Sem comando: gera os dados, treina, pontua e gera relatórios/gráficos")
+parser_treinar = subcomandos.add_parser('treinar', help="Treina e salva o modelo, sem relatórios")
+parser_treinar.add_argument('--dados',
+                            help="CSV/Parquet com as quatro métricas (padrão: gera os dados simulados)")
+parser_treinar.add_argument('--motor', choices=MOTORES, default='isolation_forest',
+                            help="isolation_forest (lote, padrão) ou ewma (z-score robusto que aprende a cada registro)")
+parser_treinar.add_argument('--modelo', default=CAMINHO_MODELO_PADRAO,
+                            help=f"Arquivo do modelo salvo (padrão: {CAMINHO_MODELO_PADRAO})")
+parser_treinar.add_argument('--janelas', default=argparse.SUPPRESS,
+                            help="Como a opção global --janelas (ex.: 5,15)")
+parser_treinar.add_argument('--out-of-core', action='store_true',
+                            help="Lê --dados em lotes: treina em uma amostra de reservatório e pontua "
+                                 "o arquivo todo em uma segunda passada, com memória limitada")
+parser_treinar.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                            help=f"Linhas por lote no modo --out-of-core (padrão: {TAMANHO_LOTE_PADRAO})")
+parser_treinar.add_argument('--tamanho-amostra', type=int, default=100_000,
+                            help="Linhas guardadas para o ajuste no modo --out-of-core (padrão: 100000)")
+parser_treinar.add_argument('--saida', default='resultados/pontuacao.csv',
+                            help="Pontuação gerada pela segunda passada do modo --out-of-core")
+parser_pontuar = subcomandos.add_parser('pontuar', help="Pontua um CSV/Parquet com o modelo salvo")
+parser_pontuar.add_argument('arquivo', help="CSV/Parquet com as quatro métricas")
+parser_pontuar.add_argument('--saida', default='resultados/pontuacao.csv',
+                            help="Arquivo de saída, CSV ou Parquet pela extensão (padrão: resultados/pontuacao.csv)")
+parser_pontuar.add_argument('--modelo', default=CAMINHO_MODELO_PADRAO,
+                            help=f"Arquivo do modelo salvo (padrão: {CAMINHO_MODELO_PADRAO})")
+parser_pontuar.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                            help=f"Linhas lidas e pontuadas por vez (padrão: {TAMANHO_LOTE_PADRAO})")
+parser_monitorar = subcomandos.add_parser('monitorar',
+                                         help="Pontua registros conforme chegam (arquivo seguido ou stdin)")
+parser_monitorar.add_argument('arquivo', help="CSV com cabeçalho e as quatro métricas; '-' = entrada padrão")
+parser_monitorar.add_argument('--seguir', action='store_true',
+                              help="Começa no fim do arquivo e espera linhas novas (como tail -f)")
+parser_monitorar.add_argument('--modelo', default=CAMINHO_MODELO_PADRAO,
+                              help=f"Arquivo do modelo salvo (padrão: {CAMINHO_MODELO_PADRAO})")
+parser_monitorar.add_argument('--lote-max', type=int, default=256,
+                              help="Registros por micro-lote (padrão: 256)")
+parser_monitorar.add_argument('--espera-max-ms', type=float, default=200,
+                              help="Tempo máximo de espera para fechar um micro-lote (padrão: 200 ms)")
+parser_monitorar.add_argument('--janela', type=int, default=5000,
+                              help="Registros recentes usados no reajuste do modelo (padrão: 5000)")
+parser_monitorar.add_argument('--reajuste-segundos', type=float, default=60,
+                              help="Intervalo entre reajustes em segundo plano; 0 = sem reajuste (padrão: 60)")
+parser_perfil = subcomandos.add_parser('atualizar-perfil',
+                                      help="Incorpora semanas novas ao perfil por hora da semana do modelo salvo")
+parser_perfil.add_argument('arquivo', help="CSV/Parquet com timestamp e as quatro métricas")
+parser_perfil.add_argument('--modelo', default=CAMINHO_MODELO_PADRAO,
+                           help=f"Arquivo do modelo salvo (padrão: {CAMINHO_MODELO_PADRAO})")
+parser.set_defaults(modelo=CAMINHO_MODELO_PADRAO, motor='isolation_forest')
+args = parser.parse_args()
+try:
+    janelas = interpretar_janelas(args.janelas)
+except ValueError as erro:
+    parser.error(f"--janelas inválido: {erro}")
+
+# ============================================
+# MODO PONTUAR: só inferência com o modelo salvo
+# ============================================
+
+if args.comando == 'pontuar':
+    try:
+        pacote = carregar_modelo(args.modelo)
+    except (OSError, ValueError) as erro:
+        print(f"❌ Não foi possível carregar o modelo: {erro}")
+        sys.exit(1)
+    print(f"✅ Modelo carregado: {args.modelo} (motor {pacote.get('motor', 'isolation_forest')}, treinado em {pacote['criado_em']}, "
+          f"{pacote['registros_treino']} registros)")
+
+    inicio = time.perf_counter()
+    try:
+        resumo = pontuar_arquivo(pacote, args.arquivo, args.saida, args.tamanho_lote)
+    except (OSError, ValueError) as erro:
+        print(f"❌ {erro}")
+        sys.exit(1)
+    duracao = time.perf_counter() - inicio
+
+    print(f"✅ Registros pontuados: {resumo['registros']} em {resumo['lotes']} lote(s), {duracao:.2f}s "
+          f"({resumo['registros'] / max(duracao, 1e-9):,.0f} registros/s)")
+    if resumo['registros']:
+        print(f"🚨 Anomalias: {resumo['anomalias']} ({100 * resumo['anomalias'] / resumo['registros']:.2f}%)")
+    print(f"💾 Resultado salvo em '{args.saida}'")
+    sys.exit(0)
+
+# ============================================
+# MODO ATUALIZAR-PERFIL: semanas novas no perfil sazonal, sem retreinar
+# ============================================
+
+if args.comando == 'atualizar-perfil':
+    from baseline_sazonal import BaselineSazonal
+
+    try:
+        pacote = carregar_modelo(args.modelo)
+        novos = ler_tabela(args.arquivo)
+        if pacote.get('baseline') is None:
+            pacote['baseline'] = BaselineSazonal(pacote.get('features_base', pacote['features']))
+        semanas = pacote['baseline'].atualizar(novos)
+    except (OSError, ValueError, KeyError) as erro:
+        print(f"❌ Não foi possível atualizar o perfil: {erro}")
+        sys.exit(1)
+    salvar_modelo(pacote, args.modelo)
+    print(f"✅ Semanas incorporadas: {', '.join(semanas)}")
+    print(f"💾 Perfil com {len(pacote['baseline'].semanas)} semana(s) salvo em '{args.modelo}'")
+    if pacote['baseline'].confiavel() and not pacote.get('sazonal'):
+        print("💡 O perfil já tem semanas suficientes: treine novamente para o modelo usar os resíduos por hora da semana")
+    sys.exit(0)
+
+# ============================================
+# MODO MONITORAR: micro-lotes conforme os registros chegam
+# ============================================
+
+if args.comando == 'monitorar':
+    from streaming_anomalias import AtualizadorModelo, monitorar
+
+    try:
+        pacote = carregar_modelo(args.modelo)
+    except (OSError, ValueError) as erro:
+        print(f"❌ Não foi possível carregar o modelo: {erro}")
+        sys.exit(1)
+    print(f"✅ Modelo carregado: {args.modelo} (motor {pacote.get('motor', 'isolation_forest')})")
+    print(f"📡 Monitorando '{args.arquivo}' (micro-lotes de até {args.lote_max} registros "
+          f"ou {args.espera_max_ms:.0f} ms; Ctrl+C para encerrar)\n")
+
+    atualizador = None
+    # O motor ewma já aprende a cada registro; só o Isolation Forest precisa de reajuste
+    # (o reajuste usa as métricas cruas, então não vale para modelos com janelas)
+    if args.reajuste_segundos > 0 and pacote.get('motor') != 'ewma' and not pacote.get('janelas'):
+        atualizador = AtualizadorModelo(pacote, janela=args.janela, intervalo=args.reajuste_segundos)
+
+    def exibir_anomalia(linha, valores, score, latencia):
+        metricas = ' | '.join(f"{nome}={valor:.1f}" for nome, valor in
+                              zip(pacote.get('features_base', pacote['features']), valores))
+        print(f"🚨 linha {linha} | score {score:.3f} | {metricas} | {latencia:.1f} ms", flush=True)
+
+    try:
+        estatisticas = monitorar(pacote, args.arquivo, seguir=args.seguir, tamanho_lote=args.lote_max,
+                                 espera_max=args.espera_max_ms / 1000, atualizador=atualizador,
+                                 ao_anomalia=exibir_anomalia)
+    except OSError as erro:
+        print(f"❌ {erro}")
+        sys.exit(1)
+    print("\n📊 " + estatisticas.resumo())
+    sys.exit(0)
+
 # ============================================
 # 1. GERAR DADOS DE EXEMPLO (Logs simulados)
 # ============================================
 
+if args.comando == 'treinar' and args.out_of_core:
+    if not args.dados or args.motor != 'isolation_forest' or janelas:
+        parser.error("--out-of-core requer --dados e o motor isolation_forest, sem --janelas")
+
+    inicio = time.perf_counter()
+    try:
+        pacote, resumo = treinar_modelo_out_of_core(args.dados, args.tamanho_lote, args.tamanho_amostra)
+    except (OSError, ValueError) as erro:
+        print(f"❌ {erro}")
+        sys.exit(1)
+    salvar_modelo(pacote, args.modelo)
+    print(f"✅ Treino: {resumo['registros']} registros lidos, {resumo['amostrados']} amostrados "
+          f"em {resumo['rodadas']} rodadas ({time.perf_counter() - inicio:.2f}s)")
+    print(f"💾 Modelo salvo em '{args.modelo}' (limiar {pacote['limiar']:.4f})")
+
+    # Segunda passada: pontua o arquivo inteiro, lote a lote
+    inicio = time.perf_counter()
+    resumo = pontuar_arquivo(pacote, args.dados, args.saida, args.tamanho_lote)
+    print(f"✅ Registros pontuados: {resumo['registros']} em {resumo['lotes']} lote(s), "
+          f"{time.perf_counter() - inicio:.2f}s")
+    print(f"🚨 Anomalias: {resumo['anomalias']} ({100 * resumo['anomalias'] / max(resumo['registros'], 1):.2f}%)")
+    print(f"💾 Resultado salvo em '{args.saida}'")
+    sys.exit(0)
+
+if args.comando == 'treinar' and args.dados:
+    # Treino com dados do usuário: não há rótulo 'tipo' nem relatórios
+    df = ler_tabela(args.dados)
+    print(f"✅ Dados carregados: {len(df)} registros de '{args.dados}'")
+    pacote = treinar_modelo(df, motor=args.motor, janelas=janelas)
+    salvar_modelo(pacote, args.modelo)
+    print(f"💾 Modelo salvo em '{args.modelo}' (limiar {pacote['limiar']:.4f}, {len(pacote['features'])} features)")
+    print(f"🕒 {descrever_perfil(pacote)}")
+    sys.exit(0)
+
 np.random.seed(42)
 
 # Comportamento NORMAL
@@ -51,27 +245,38 @@ print(f"   - Anômalos: {len(df_anomalo)}\n")
 # 2. PREPARAR DADOS PARA O MODELO
 # ============================================
 
-features = ['tentativas_login', 'requisicoes_http', 'bytes_transferidos', 'tempo_resposta_ms']
-X = df[features].copy()
+features = FEATURES
 
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+# Features de janela (opcional): calculadas uma vez e guardadas em
+# dados/.cache_features; o treino e a pontuação abaixo reaproveitam o cache
+if janelas:
+    inicio = time.perf_counter()
+    _, origem_janelas = adicionar_features_janela(df, FEATURES, janelas, CacheFeatures())
+    print(f"✅ Features de janela {', '.join(map(str, janelas))}: "
+          f"{len(nomes_features_janela(FEATURES, janelas))} colunas ({origem_janelas}, "
+          f"{time.perf_counter() - inicio:.2f}s)\n")
 
 # ============================================
 # 3. TREINAR O MODELO (Isolation Forest)
 # ============================================
 
-modelo = IsolationForest(
-    contamination=0.05,
-    random_state=42,
-    n_estimators=100
-)
+# Motor padrão: StandardScaler + Isolation Forest (contaminação 5%, 100 árvores, seed 42)
+pacote = treinar_modelo(df, motor=args.motor, janelas=janelas)
+salvar_modelo(pacote, args.modelo)
+print(f"💾 Modelo salvo em '{args.modelo}'")
+print(f"🕒 {descrever_perfil(pacote)}")
 
-df['anomalia_pred'] = modelo.fit_predict(X_scaled)
-df['anomalia_score'] = modelo.score_samples(X_scaled)
+if args.comando == 'treinar':
+    sys.exit(0)
+
+df['anomalia_pred'], df['anomalia_score'] = pontuar(pacote, df)
 
 df['eh_anomalia'] = df['anomalia_pred'].apply(lambda x: 'Sim' if x == -1 else 'Não')
 
+# z de cada métrica contra o padrão da mesma hora da semana
+pacote['baseline'].adicionar_colunas(df)
+desvios_sazonais = int(df['anomalia_sazonal'].sum())
+
 # ============================================
 # 4. ANÁLISE DOS RESULTADOS
 # ============================================
@@ -85,6 +290,7 @@ acuracia = (df['eh_anomalia'] == df['tipo'].apply(lambda x: 'Sim' if x == 'Anôm
 
 print(f"\n🔍 Anomalias Detectadas: {anomalias_detectadas}")
 print(f"✅ Acurácia do Modelo: {acuracia:.2f}%")
+print(f"🕒 Desvios do padrão por hora da semana (|z| > 3.5): {desvios_sazonais}")
 print(f"\n📈 Estatísticas das Features:")
 print(df[features].describe())
 
@@ -170,7 +376,11 @@ with open('resultados/relatorio_anomalias.txt', 'w', encoding='utf-8') as f:
     f.write(f"Total de registros analisados: {len(df)}\n")
     f.write(f"Anomalias detectadas: {anomalias_detectadas}\n")
     f.write(f"Taxa de anomalias: {(anomalias_detectadas/len(df))*100:.2f}%\n")
-    f.write(f"Acurácia do modelo: {acuracia:.2f}%\n\n")
+    f.write(f"Acurácia do modelo: {acuracia:.2f}%\n")
+    f.write(f"Desvios do padrão por hora da semana (|z| > 3.5): {desvios_sazonais}\n")
+    if janelas:
+        f.write(f"Features de janela (registros): {', '.join(map(str, janelas))}\n")
+    f.write("\n")
     f.write("Top 10 Anomalias Detectadas:\n")
     f.write(anomalias.head(10).to_string())
 
@@ -182,11 +392,17 @@ print("✓ Relatório salvo: resultados/relatorio_anomalias.txt")
 print("\n[9] Gerando análise avançada com IA (Mistral via Ollama)...")
 
 from ia_anomalias import analisar_anomalias_com_llm
+from comum.cache_llm import cache_padrao
 
 with open('resultados/relatorio_anomalias.txt', 'r', encoding='utf-8') as f:
     texto_base = f.read()
 
-analise_ia = analisar_anomalias_com_llm(texto_base)
+# A resposta é exibida no console conforme o modelo gera
+analise_ia = analisar_anomalias_com_llm(texto_base, ao_receber=lambda trecho: print(trecho, end="", flush=True),
+                                        forcar_atualizacao=args.atualizar_ia,
+                                        orcamento_tokens=args.ia_orcamento_tokens, paralelismo=args.ia_paralelismo)
+print()
+print(f"✓ Cache de análises IA: {cache_padrao().resumo()}")
 
 with open('resultados/relatorio_ia_avancado.txt', 'w', encoding='utf-8') as f:
     f.write(analise_ia)
@@ -0,0 +1,74 @@
+import numpy as np
+
+# Para dados normais, E|x - média| = 0.7979·σ; converte o desvio absoluto em σ
+FATOR_DESVIO = 1.2533
+
+
+class DetectorEWMA:
+    """
+    Detector online por z-score robusto: média e desvio absoluto médio
+    exponenciais (EWMA) por feature.
+
+    Cada registro é pontuado com o estado atual e só depois entra no estado
+    (pontua-depois-aprende). A atualização é O(1) por registro e a memória
+    é fixa (dois vetores do tamanho do número de features). Valores além de
+    `corte` desvios são limitados antes de entrar na média, para que um
+    ataque não desloque a referência de normalidade.
+
+    Args:
+        n_features (int): Quantidade de métricas por registro
+        alfa (float): Peso de cada registro novo nas médias exponenciais
+        aquecimento (int): Registros iniciais só de aprendizado (score 0)
+        corte (float): Limite, em desvios, dos valores usados na atualização
+    """
+
+    def __init__(self, n_features, alfa=0.02, aquecimento=30, corte=3.0):
+        self.alfa = alfa
+        self.aquecimento = aquecimento
+        self.corte = corte
+        self.media = np.zeros(n_features)
+        self.desvio = np.zeros(n_features)
+        self.vistos = 0
+
+    def _escala(self):
+        return np.maximum(FATOR_DESVIO * self.desvio, 1e-9 * (np.abs(self.media) + 1))
+
+    def atualizar_um(self, x):
+        """
+        Pontua um registro e o incorpora ao estado.
+
+        Returns:
+            float: Maior |z| entre as features (0 durante o aquecimento)
+        """
+        if self.vistos == 0:
+            self.media = np.array(x, dtype=np.float64)
+            self.vistos = 1
+            return 0.0
+
+        aquecido = self.vistos >= self.aquecimento
+        escala = self._escala()
+        z = 0.0
+        if aquecido:
+            z = float(np.max(np.abs(x - self.media) / escala))
+            x = np.clip(x, self.media - self.corte * escala, self.media + self.corte * escala)
+
+        # No início a média é a média simples; depois, exponencial
+        alfa = max(self.alfa, 1.0 / (self.vistos + 1))
+        diferenca = x - self.media
+        self.media += alfa * diferenca
+        self.desvio += alfa * (np.abs(diferenca) - self.desvio)
+        self.vistos += 1
+        return z
+
+    def processar(self, X):
+        """
+        Pontua e aprende uma sequência de registros, na ordem.
+
+        Returns:
+            np.ndarray: Maior |z| de cada registro
+        """
+        X = np.asarray(X, dtype=np.float64)
+        z = np.empty(len(X))
+        for i, x in enumerate(X):
+            z[i] = self.atualizar_um(x)
+        return z
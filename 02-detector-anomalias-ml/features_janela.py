@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Janelas padrão, em registros (os dados simulados têm um registro por minuto)
+JANELAS_PADRAO = (5, 15)
+
+DIRETORIO_CACHE = os.path.join('dados', '.cache_features')
+
+# Resultados guardados no cache; os mais antigos (mtime) saem primeiro
+MAX_ENTRADAS_CACHE = 8
+
+# Muda quando o cálculo das colunas muda (invalida o cache)
+VERSAO_FEATURES = 1
+
+
+def interpretar_janelas(texto):
+    """
+    Converte '5,15' em (5, 15); texto vazio = sem janelas.
+
+    Raises:
+        ValueError: Se alguma janela não for um inteiro maior que 1
+    """
+    janelas = tuple(sorted({int(parte) for parte in texto.split(',') if parte.strip()}))
+    if any(janela < 2 for janela in janelas):
+        raise ValueError("As janelas precisam ter pelo menos 2 registros")
+    return janelas
+
+
+def nomes_features_janela(features, janelas):
+    """
+    Colunas geradas, na ordem em que entram no modelo.
+    """
+    nomes = [f'{feature}_delta' for feature in features]
+    for janela in janelas:
+        nomes += [f'{feature}_media_{janela}' for feature in features]
+        nomes += [f'{feature}_ewma_{janela}' for feature in features]
+        nomes += [f'{feature}_z_{janela}' for feature in features]
+    return nomes
+
+
+def _estatisticas_janela(X, janela, fim_de, fim_ate):
+    """
+    Média, desvio padrão (ddof=1) e quantidade de registros das janelas de
+    até `janela` linhas de X que terminam nas linhas fim_de..fim_ate-1
+    (pandas rolling sobre só o trecho necessário: O(registros)).
+    """
+    inicio = max(fim_de - janela + 1, 0)
+    rolagem = pd.DataFrame(X[inicio:fim_ate]).rolling(janela, min_periods=1)
+    corte = fim_de - inicio
+    media = rolagem.mean().to_numpy()[corte:]
+    desvio = rolagem.std().to_numpy()[corte:]
+    contagem = np.minimum(np.arange(fim_de, fim_ate) + 1, janela)
+    return media, desvio, contagem
+
+
+class FeaturesJanela:
+    """
+    Features de janela deslizante sobre as métricas, calculadas de forma
+    vetorizada para todas as métricas de uma vez:
+
+    - <métrica>_delta: diferença para o registro anterior
+    - <métrica>_media_<w>: média dos últimos w registros
+    - <métrica>_ewma_<w>: média exponencial com span w (como ewm(adjust=False))
+    - <métrica>_z_<w>: z do registro contra os w registros anteriores a ele
+      (um pico que cresce aos poucos continua acima da média recente)
+
+    O cálculo é incremental: o objeto guarda os últimos max(janelas)
+    registros e o último valor de cada EWMA, então `processar` em lotes
+    consecutivos dá o mesmo resultado que processar tudo de uma vez e só
+    recalcula a cauda. Não há laço Python por registro (rolling do pandas
+    para média/desvio, lfilter para as EWMAs), o que serve tanto para o
+    arquivo inteiro quanto para os micro-lotes do streaming.
+
+    Args:
+        features (list[str]): Métricas de entrada
+        janelas (tuple[int]): Tamanhos das janelas, em registros
+    """
+
+    def __init__(self, features, janelas=JANELAS_PADRAO):
+        self.features = list(features)
+        self.janelas = tuple(janelas)
+        self.contexto = max(self.janelas)
+        self.cauda = np.empty((0, len(self.features)))
+        self.ewma = {}
+        self.registros = 0
+
+    @property
+    def colunas(self):
+        return nomes_features_janela(self.features, self.janelas)
+
+    def processar(self, df):
+        """
+        Features dos registros de `df`, continuando do estado atual.
+
+        Returns:
+            pd.DataFrame: Colunas de `colunas`, com o índice de `df`
+        """
+        novos = df[self.features].to_numpy(dtype=np.float64)
+        if not len(novos):
+            return pd.DataFrame(np.empty((0, len(self.colunas))), index=df.index, columns=self.colunas)
+        X = np.vstack([self.cauda, novos])
+        inicio = len(self.cauda)
+        blocos = [np.diff(X, axis=0, prepend=X[:1])[inicio:]]
+
+        for janela in self.janelas:
+            # Uma passada por janela: as estatísticas até a linha t servem de
+            # "janela atual" para t e de "janela anterior" para t+1
+            de = max(inicio - 1, 0)
+            medias, desvios, contagens = _estatisticas_janela(X, janela, de, len(X))
+            media = medias[inicio - de:]
+            media_anterior, desvio_anterior, contagem = medias[:-1], desvios[:-1], contagens[:-1]
+            if inicio == 0:
+                # Primeiro registro do fluxo: não há anteriores
+                media_anterior = np.vstack([np.full((1, X.shape[1]), np.nan), media_anterior])
+                desvio_anterior = np.vstack([np.full((1, X.shape[1]), np.nan), desvio_anterior])
+                contagem = np.concatenate([[0], contagem])
+            valido = (contagem[:, None] >= 2) & (desvio_anterior > 0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                z = np.where(valido, (novos - media_anterior) / desvio_anterior, 0.0)
+
+            # EWMA: y[t] = alfa * x[t] + (1 - alfa) * y[t-1], continuando do último valor
+            alfa = 2.0 / (janela + 1)
+            anterior = self.ewma.get(janela, novos[0])
+            ewma, _ = lfilter([alfa], [1.0, alfa - 1.0], novos, axis=0, zi=((1 - alfa) * anterior)[None, :])
+            self.ewma[janela] = ewma[-1]
+            blocos += [media, ewma, z]
+
+        self.cauda = X[-self.contexto:]
+        self.registros += len(novos)
+        return pd.DataFrame(np.hstack(blocos), index=df.index, columns=self.colunas)
+
+
+def _hashes_linhas(df, features):
+    """
+    Hash de cada registro (métricas e timestamp, quando houver).
+    """
+    colunas = list(features) + (['timestamp'] if 'timestamp' in df.columns else [])
+    return pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+
+
+class CacheFeatures:
+    """
+    Features de janela salvas em disco, endereçadas pelo hash da entrada
+    (registros + métricas + janelas).
+
+    Cada entrada guarda também o estado do FeaturesJanela. Quando a entrada
+    nova começa com os mesmos registros de uma entrada salva (arquivo que
+    cresceu), só os registros acrescentados são calculados.
+
+    Args:
+        diretorio (str): Pasta do cache
+        max_entradas (int): Entradas mantidas (as mais antigas são removidas)
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE, max_entradas=MAX_ENTRADAS_CACHE):
+        self.diretorio = diretorio
+        self.max_entradas = max_entradas
+
+    def _chave(self, configuracao, hashes):
+        resumo = hashlib.sha256(configuracao.encode('utf-8'))
+        resumo.update(hashes.tobytes())
+        return resumo.hexdigest()
+
+    def _indice(self):
+        try:
+            with open(os.path.join(self.diretorio, 'indice.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _salvar_indice(self, indice):
+        caminho = os.path.join(self.diretorio, 'indice.json')
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(indice, f)
+        os.replace(caminho + '.tmp', caminho)
+
+    def calcular(self, df, features, janelas):
+        """
+        Features de janela de `df`, do cache quando possível.
+
+        Returns:
+            tuple[pd.DataFrame, str]: Features (índice de `df`) e a origem:
+                'cache', 'incremental' ou 'calculado'
+        """
+        configuracao = json.dumps({'versao': VERSAO_FEATURES, 'features': list(features),
+                                   'janelas': list(janelas)})
+        hashes = _hashes_linhas(df, features)
+        chave = self._chave(configuracao, hashes)
+        indice = self._indice()
+
+        entrada = self._carregar(chave) if chave in indice else None
+        if entrada is not None:
+            return entrada['features'].set_axis(df.index), 'cache'
+
+        # Maior entrada salva que seja um prefixo de df
+        origem = 'calculado'
+        calculadora, anteriores = FeaturesJanela(features, janelas), None
+        prefixos = sorted(((linhas, chave_salva) for chave_salva, linhas in indice.items()
+                           if linhas < len(df)), reverse=True)
+        for linhas, chave_salva in prefixos:
+            if self._chave(configuracao, hashes[:linhas]) != chave_salva:
+                continue
+            entrada = self._carregar(chave_salva)
+            if entrada is not None:
+                calculadora, anteriores = entrada['estado'], entrada['features']
+                origem = 'incremental'
+                break
+
+        inicio = calculadora.registros
+        novas = calculadora.processar(df.iloc[inicio:])
+        resultado = pd.concat([anteriores, novas]) if anteriores is not None else novas
+        resultado = resultado.set_axis(df.index)
+
+        self._salvar(chave, len(df), resultado, calculadora, indice)
+        return resultado, origem
+
+    def _carregar(self, chave):
+        caminho = os.path.join(self.diretorio, chave + '.pkl')
+        try:
+            entrada = pd.read_pickle(caminho)
+        except (OSError, ValueError, EOFError):
+            return None
+        try:
+            os.utime(caminho)
+        except FileNotFoundError:
+            # Removida por outro processo logo após a leitura: a entrada já foi lida
+            pass
+        return entrada
+
+    def _salvar(self, chave, linhas, features, calculadora, indice):
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = os.path.join(self.diretorio, chave + '.pkl')
+        pd.to_pickle({'features': features.reset_index(drop=True), 'estado': calculadora},
+                     caminho + '.tmp')
+        os.replace(caminho + '.tmp', caminho)
+        indice[chave] = linhas
+
+        # Mantém só as entradas mais recentes (outro processo pode removê-las
+        # entre a listagem e o stat/remove)
+        salvas = []
+        for c in indice:
+            try:
+                salvas.append((os.stat(os.path.join(self.diretorio, c + '.pkl')).st_mtime_ns, c))
+            except FileNotFoundError:
+                continue
+        manter = {c for _, c in sorted(salvas, reverse=True)[:self.max_entradas]}
+        for c in list(indice):
+            if c not in manter:
+                try:
+                    os.remove(os.path.join(self.diretorio, c + '.pkl'))
+                except FileNotFoundError:
+                    pass
+                del indice[c]
+        self._salvar_indice(indice)
+
+
+def adicionar_features_janela(df, features, janelas, cache=None):
+    """
+    Acrescenta a `df` as features de janela (usando o cache, se houver).
+
+    Returns:
+        tuple[pd.DataFrame, str]: df com as colunas novas e a origem do cálculo
+    """
+    if cache is not None:
+        novas, origem = cache.calcular(df, features, janelas)
+    else:
+        novas, origem = FeaturesJanela(features, janelas).processar(df), 'calculado'
+    return pd.concat([df.drop(columns=novas.columns, errors='ignore'), novas], axis=1), origem
@@ -0,0 +1,346 @@
+import os
+import sys
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from baseline_sazonal import SEMANAS_MINIMAS, BaselineSazonal, hora_da_semana
+from detector_online import DetectorEWMA
+from features_janela import CacheFeatures, FeaturesJanela, adicionar_features_janela, nomes_features_janela
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.floresta_compacta import LOTE_MAXIMO_COMPACTO, compactar_floresta
+from comum.treino_out_of_core import TAMANHO_AMOSTRA_PADRAO, treinar_out_of_core
+
+# Versão do formato do pacote salvo; muda quando os campos mudam
+VERSAO_MODELO = 1
+
+FEATURES = ['tentativas_login', 'requisicoes_http', 'bytes_transferidos', 'tempo_resposta_ms']
+
+CAMINHO_MODELO_PADRAO = 'modelos/modelo_anomalias.pkl'
+
+# 'isolation_forest': treino em lote; 'ewma': z-score robusto que aprende a cada registro
+MOTORES = ['isolation_forest', 'ewma']
+
+TAMANHO_LOTE_PADRAO = 100_000
+
+
+def treinar_modelo(df, contaminacao=0.05, n_estimadores=100, semente=42, motor='isolation_forest', janelas=(),
+                   baseline=None):
+    """
+    Ajusta o motor de detecção nas métricas e monta o pacote salvo em disco.
+
+    - isolation_forest: StandardScaler + IsolationForest; o limiar é o
+      offset_ do modelo (o mesmo corte de predict).
+    - ewma: DetectorEWMA alimentado com os registros na ordem; o limiar é o
+      quantil `contaminacao` dos scores vistos no treino.
+
+    Com um perfil sazonal confiável (BaselineSazonal.confiavel) e timestamp
+    nos dados, o motor recebe as métricas como resíduos do perfil da hora da
+    semana (z robusto) em vez dos valores brutos: um pico habitual, como o da
+    segunda às 9h, fica perto de zero e não é isolado como anomalia.
+
+    Args:
+        df (pd.DataFrame): Registros com as colunas de FEATURES
+        contaminacao (float): Fração esperada de anomalias
+        n_estimadores (int): Número de árvores (isolation_forest)
+        semente (int): random_state do modelo (isolation_forest)
+        motor (str): Um dos MOTORES
+        janelas (tuple[int]): Janelas das features de janela deslizante
+            (vazio = só as métricas de cada registro)
+        baseline (BaselineSazonal): Perfil já montado (padrão: montado a partir de `df`)
+
+    Returns:
+        dict: Pacote com motor, scaler, modelo (e a forma compacta da floresta),
+            lista de features, limiar e perfil sazonal
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconhecido: {motor} (opções: {', '.join(MOTORES)})")
+    features = list(FEATURES)
+    if janelas:
+        df, _ = adicionar_features_janela(df, FEATURES, janelas, CacheFeatures())
+        features += nomes_features_janela(FEATURES, janelas)
+    if baseline is None:
+        baseline = criar_baseline(df)
+    sazonal = baseline is not None and baseline.confiavel() and 'timestamp' in df.columns
+    X = _matriz(df, features)
+    if sazonal:
+        X = _remover_sazonalidade(baseline, X, hora_da_semana(df['timestamp']))
+
+    floresta = None
+    if motor == 'ewma':
+        scaler = None
+        modelo = DetectorEWMA(len(features))
+        # Score no mesmo sentido do Isolation Forest: menor = mais anômalo
+        scores = -modelo.processar(X)
+        limiar = float(np.quantile(scores[modelo.aquecimento:], contaminacao)) \
+            if len(X) > modelo.aquecimento else -np.inf
+    else:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+
+        modelo = IsolationForest(
+            contamination=contaminacao,
+            random_state=semente,
+            n_estimators=n_estimadores
+        )
+        modelo.fit(X_scaled)
+        # score_samples abaixo do limiar = anomalia (o mesmo corte de predict)
+        limiar = float(modelo.offset_)
+        floresta = compactar_floresta(modelo)
+
+    return {
+        'versao': VERSAO_MODELO,
+        'motor': motor,
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'sklearn': sklearn.__version__,
+        'features': features,
+        # Métricas lidas da entrada; as demais features saem delas pelas janelas
+        'features_base': list(FEATURES),
+        'janelas': list(janelas),
+        'scaler': scaler,
+        'modelo': modelo,
+        # Mesma floresta em arrays planos, para lotes pequenos (streaming)
+        'floresta': floresta,
+        'limiar': limiar,
+        'contaminacao': contaminacao,
+        'registros_treino': len(df),
+        # Perfil por hora da semana (só quando os dados têm timestamp)
+        'baseline': baseline,
+        # Motor treinado nos resíduos do perfil (as métricas brutas passam por ele)
+        'sazonal': sazonal,
+    }
+
+
+def treinar_modelo_out_of_core(caminho, tamanho_lote=TAMANHO_LOTE_PADRAO,
+                               tamanho_amostra=TAMANHO_AMOSTRA_PADRAO, contaminacao=0.05,
+                               n_estimadores=100, semente=42):
+    """
+    Como `treinar_modelo` (motor isolation_forest), lendo o arquivo em lotes:
+    a memória depende do lote e da amostra, não do tamanho do arquivo.
+
+    O perfil sazonal não é montado aqui (precisa das semanas completas);
+    use o comando atualizar-perfil com arquivos semanais.
+
+    Returns:
+        tuple[dict, dict]: Pacote do modelo e resumo do treino
+    """
+    scaler, modelo, resumo = treinar_out_of_core(
+        lambda: (_matriz(lote) for lote in ler_em_lotes(caminho, tamanho_lote)),
+        tamanho_amostra=tamanho_amostra,
+        n_estimadores=n_estimadores,
+        contaminacao=contaminacao,
+        semente=semente,
+    )
+    pacote = {
+        'versao': VERSAO_MODELO,
+        'motor': 'isolation_forest',
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'sklearn': sklearn.__version__,
+        'features': list(FEATURES),
+        'features_base': list(FEATURES),
+        'janelas': [],
+        'scaler': scaler,
+        'modelo': modelo,
+        'floresta': compactar_floresta(modelo),
+        'limiar': float(modelo.offset_),
+        'contaminacao': contaminacao,
+        'registros_treino': resumo['registros'],
+        'baseline': None,
+        'sazonal': False,
+    }
+    return pacote, resumo
+
+
+def criar_baseline(df):
+    """
+    Perfil sazonal das métricas, ou None se `df` não tem a coluna 'timestamp'.
+    """
+    if 'timestamp' not in df.columns:
+        return None
+    baseline = BaselineSazonal(FEATURES)
+    baseline.atualizar(df)
+    return baseline
+
+
+def descrever_perfil(pacote):
+    """
+    Uma linha sobre o perfil sazonal do pacote, para o console.
+    """
+    baseline = pacote.get('baseline')
+    if baseline is None:
+        return "Sem perfil por hora da semana (dados sem timestamp)"
+    semanas = len(baseline.semanas)
+    if pacote.get('sazonal'):
+        return f"Modelo treinado nos resíduos do perfil por hora da semana ({semanas} semanas)"
+    return (f"Perfil por hora da semana com {semanas} semana(s): o modelo usa as métricas brutas "
+            f"até o perfil ter {SEMANAS_MINIMAS} semanas")
+
+
+def salvar_modelo(pacote, caminho=CAMINHO_MODELO_PADRAO):
+    """
+    Grava o pacote do modelo de forma atômica (arquivo temporário + rename).
+    """
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = caminho + '.tmp'
+    joblib.dump(pacote, temporario)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar_modelo(caminho=CAMINHO_MODELO_PADRAO):
+    """
+    Lê o pacote salvo por `salvar_modelo`.
+
+    Raises:
+        ValueError: Se o arquivo não for um pacote desta versão
+    """
+    pacote = joblib.load(caminho)
+    if not isinstance(pacote, dict) or pacote.get('versao') != VERSAO_MODELO:
+        raise ValueError(f"{caminho} não é um modelo de anomalias na versão {VERSAO_MODELO}; "
+                         f"treine novamente com o comando 'treinar'")
+    return pacote
+
+
+def _remover_sazonalidade(baseline, X, horas):
+    """
+    Troca as métricas base (primeiras colunas de X) pelos resíduos do perfil
+    sazonal; as features de janela continuam como estão.
+    """
+    X = X.copy()
+    base = len(baseline.features)
+    X[:, :base] = baseline.residuos(X[:, :base], horas)
+    return X
+
+
+def _horas(pacote, df):
+    """
+    Horas da semana de `df`, se o pacote foi treinado nos resíduos sazonais.
+    """
+    if not pacote.get('sazonal'):
+        return None
+    if 'timestamp' not in df.columns:
+        raise ValueError("Colunas ausentes nos dados: timestamp (o modelo usa o perfil por hora da semana)")
+    return hora_da_semana(df['timestamp'])
+
+
+def _matriz(df, features=FEATURES):
+    faltando = [coluna for coluna in features if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes nos dados: {', '.join(faltando)}")
+    return df[features].to_numpy(dtype=np.float64)
+
+
+def pontuar(pacote, df):
+    """
+    Aplica o modelo salvo aos registros. O Isolation Forest não muda; o
+    motor ewma continua aprendendo com os registros pontuados. Com janelas
+    no pacote, `df` é uma sequência contínua de registros (em ordem).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Predição (-1 = anomalia, 1 = normal) e score
+    """
+    if pacote.get('janelas'):
+        df, _ = adicionar_features_janela(df, pacote['features_base'], pacote['janelas'], CacheFeatures())
+    return pontuar_matriz(pacote, _matriz(df, pacote['features']), _horas(pacote, df))
+
+
+def pontuar_matriz(pacote, X, horas=None):
+    """
+    Como `pontuar`, para uma matriz já na ordem de pacote['features'] (com
+    as métricas brutas). Modelos sazonais precisam de `horas`, a hora da
+    semana (0..167) de cada linha.
+    """
+    if pacote.get('sazonal'):
+        if horas is None:
+            raise ValueError("O modelo usa o perfil por hora da semana: informe a hora de cada registro")
+        X = _remover_sazonalidade(pacote['baseline'], X, horas)
+    if pacote.get('motor') == 'ewma':
+        scores = -pacote['modelo'].processar(X)
+    elif pacote.get('floresta') is not None and len(X) <= LOTE_MAXIMO_COMPACTO:
+        scores = pacote['floresta'].score_samples(pacote['scaler'].transform(X))
+    else:
+        scores = pacote['modelo'].score_samples(pacote['scaler'].transform(X))
+    predicoes = np.where(scores < pacote['limiar'], -1, 1)
+    return predicoes, scores
+
+
+def _eh_parquet(caminho):
+    return caminho.lower().endswith(('.parquet', '.pq'))
+
+
+def ler_tabela(caminho):
+    """
+    Lê um CSV ou Parquet inteiro.
+    """
+    if _eh_parquet(caminho):
+        return pd.read_parquet(caminho)
+    return pd.read_csv(caminho)
+
+
+def ler_em_lotes(caminho, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Lê um CSV ou Parquet em lotes de até `tamanho_lote` linhas.
+
+    Yields:
+        pd.DataFrame: Um lote por vez
+    """
+    if _eh_parquet(caminho):
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_lote):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_lote)
+
+
+def pontuar_arquivo(pacote, entrada, saida, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Pontua um arquivo lote a lote e grava os registros com as colunas
+    'anomalia_pred' e 'anomalia_score' (CSV ou Parquet, pela extensão da saída).
+    Com perfil sazonal no pacote e timestamp nos dados, grava também os z por
+    hora da semana (z_<métrica>, z_sazonal_max, anomalia_sazonal).
+
+    Returns:
+        dict: Registros, anomalias e lotes processados
+    """
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    resumo = {'registros': 0, 'anomalias': 0, 'lotes': 0}
+    escritor = None
+    # As janelas continuam de um lote para o outro
+    janela = FeaturesJanela(pacote['features_base'], pacote['janelas']) if pacote.get('janelas') else None
+    try:
+        for lote in ler_em_lotes(entrada, tamanho_lote):
+            if janela is not None:
+                lote = pd.concat([lote, janela.processar(lote)], axis=1)
+            predicoes, scores = pontuar_matriz(pacote, _matriz(lote, pacote['features']), _horas(pacote, lote))
+            lote['anomalia_pred'] = predicoes
+            lote['anomalia_score'] = scores
+            if pacote.get('baseline') is not None and 'timestamp' in lote.columns:
+                pacote['baseline'].adicionar_colunas(lote)
+
+            if _eh_parquet(saida):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                tabela = pa.Table.from_pandas(lote, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(saida, tabela.schema)
+                escritor.write_table(tabela)
+            else:
+                lote.to_csv(saida, mode='w' if resumo['lotes'] == 0 else 'a',
+                            header=resumo['lotes'] == 0, index=False)
+
+            resumo['registros'] += len(lote)
+            resumo['anomalias'] += int((predicoes == -1).sum())
+            resumo['lotes'] += 1
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return resumo
@@ -0,0 +1,212 @@
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from features_janela import FeaturesJanela
+from modelo_anomalias import pontuar_matriz, treinar_modelo
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.leitura_continua import linhas_continuas
+
+# Latências guardadas para os percentis (as mais recentes)
+MAX_LATENCIAS = 100_000
+
+
+class EstatisticasStreaming:
+    """
+    Contadores do modo streaming e latência de ponta a ponta por registro
+    (da leitura da linha até a emissão do resultado do micro-lote).
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.registros = 0
+        self.invalidos = 0
+        self.lotes = 0
+        self.anomalias = 0
+        self.reajustes = 0
+        self.latencias_ms = deque(maxlen=MAX_LATENCIAS)
+
+    def resumo(self):
+        duracao = time.perf_counter() - self.inicio
+        texto = (f"Registros: {self.registros} em {self.lotes} micro-lote(s) | "
+                 f"inválidos: {self.invalidos} | anomalias: {self.anomalias} | "
+                 f"reajustes do modelo: {self.reajustes}\n"
+                 f"Vazão: {self.registros / max(duracao, 1e-9):,.0f} registros/s")
+        if self.latencias_ms:
+            p50, p95, p99 = np.percentile(np.fromiter(self.latencias_ms, dtype=np.float64), [50, 95, 99])
+            texto += (f"\nLatência (ms): p50 {p50:.1f} | p95 {p95:.1f} | p99 {p99:.1f} | "
+                      f"máx {max(self.latencias_ms):.1f}")
+        return texto
+
+
+class AtualizadorModelo(threading.Thread):
+    """
+    Reajusta o modelo em segundo plano com os registros mais recentes
+    (com o perfil sazonal do pacote, quando a entrada tem timestamp).
+
+    O pontuador lê `pacote` uma vez por micro-lote; o novo pacote é montado
+    por inteiro antes de substituir o atual (atribuição atômica), então a
+    pontuação nunca pausa nem vê um modelo pela metade.
+
+    Args:
+        pacote (dict): Pacote inicial (carregado de disco)
+        janela (int): Quantidade de registros recentes usados no reajuste
+        intervalo (float): Segundos entre reajustes
+        minimo (int): Registros necessários para o primeiro reajuste
+    """
+
+    def __init__(self, pacote, janela=5000, intervalo=60.0, minimo=500):
+        super().__init__(name='atualizador-modelo', daemon=True)
+        self.pacote = pacote
+        self.intervalo = intervalo
+        self.minimo = minimo
+        self.reajustes = 0
+        self._janela = deque(maxlen=janela)
+        self._momentos = deque(maxlen=janela)
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+
+    def adicionar(self, X, momentos):
+        with self._trava:
+            self._janela.extend(X)
+            self._momentos.extend(momentos)
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            with self._trava:
+                if len(self._janela) < self.minimo:
+                    continue
+                X = np.array(self._janela)
+                momentos = list(self._momentos)
+            atual = self.pacote
+            dados = pd.DataFrame(X, columns=atual['features'])
+            if None not in momentos:
+                dados['timestamp'] = pd.to_datetime(momentos)
+            self.pacote = treinar_modelo(dados, contaminacao=atual['contaminacao'],
+                                         baseline=atual.get('baseline'))
+            self.reajustes += 1
+
+    def parar(self):
+        self._parar.set()
+
+
+def _ler_registros(origem, seguir, features, fila, estatisticas, exige_timestamp=False):
+    """
+    Thread de leitura: converte cada linha CSV nas features e a coloca na
+    fila com o instante de chegada e o timestamp do registro (None se a
+    entrada não tem a coluna). Coloca None no fim da entrada.
+    """
+    try:
+        linhas = linhas_continuas(origem, seguir)
+        cabecalho = next(linhas, '').strip().split(',')
+        faltando = [coluna for coluna in features if coluna not in cabecalho]
+        if exige_timestamp and 'timestamp' not in cabecalho:
+            faltando.append('timestamp')
+        if faltando:
+            print(f"❌ Colunas ausentes no cabeçalho: {', '.join(faltando)}")
+            return
+        indices = [cabecalho.index(coluna) for coluna in features]
+        indice_momento = cabecalho.index('timestamp') if 'timestamp' in cabecalho else None
+
+        for numero, linha in enumerate(linhas, 2):
+            chegada = time.perf_counter()
+            campos = linha.rstrip('\r\n').split(',')
+            try:
+                valores = [float(campos[i]) for i in indices]
+                momento = datetime.fromisoformat(campos[indice_momento]) if indice_momento is not None else None
+            except (IndexError, ValueError):
+                estatisticas.invalidos += 1
+                continue
+            fila.put((numero, valores, chegada, momento))
+    finally:
+        fila.put(None)
+
+
+def monitorar(pacote, origem, seguir=False, tamanho_lote=256, espera_max=0.2,
+              atualizador=None, ao_anomalia=None):
+    """
+    Pontua registros conforme chegam, em micro-lotes.
+
+    Um micro-lote fecha quando atinge `tamanho_lote` registros ou quando o
+    primeiro registro dele está esperando há `espera_max` segundos.
+
+    Args:
+        pacote (dict): Pacote do modelo (usado quando não há atualizador)
+        origem (str): Arquivo CSV ou '-' para a entrada padrão
+        seguir (bool): Continua lendo as linhas novas do arquivo
+        tamanho_lote (int): Máximo de registros por micro-lote
+        espera_max (float): Espera máxima, em segundos, para fechar um micro-lote
+        atualizador (AtualizadorModelo): Reajuste em segundo plano (opcional)
+        ao_anomalia (Callable): Recebe (linha, valores, score, latência em ms) de cada anomalia
+
+    Returns:
+        EstatisticasStreaming: Contadores e latências
+    """
+    estatisticas = EstatisticasStreaming()
+    fila = queue.Queue(maxsize=100_000)
+    # Com janelas no pacote, a entrada tem só as métricas; as features de
+    # janela são calculadas aqui, continuando de um micro-lote para o outro
+    base = pacote.get('features_base', pacote['features'])
+    janela = FeaturesJanela(base, pacote['janelas']) if pacote.get('janelas') else None
+    threading.Thread(target=_ler_registros, name='leitor', daemon=True,
+                     args=(origem, seguir, base, fila, estatisticas, bool(pacote.get('sazonal')))).start()
+    if atualizador is not None:
+        atualizador.start()
+
+    fim = False
+    try:
+        while not fim:
+            item = fila.get()
+            if item is None:
+                break
+            lote = [item]
+            prazo = item[2] + espera_max
+            while len(lote) < tamanho_lote:
+                restante = prazo - time.perf_counter()
+                try:
+                    # Prazo vencido (fila acumulada): leva só o que já chegou, sem esperar
+                    item = fila.get(timeout=restante) if restante > 0 else fila.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    fim = True
+                    break
+                lote.append(item)
+
+            X = np.array([valores for _, valores, _, _ in lote], dtype=np.float64)
+            if janela is not None:
+                X = np.hstack([X, janela.processar(pd.DataFrame(X, columns=base)).to_numpy()])
+            momentos = [momento for _, _, _, momento in lote]
+            # Hora da semana de cada registro (usada pelos modelos sazonais)
+            horas = None if None in momentos else np.array([m.weekday() * 24 + m.hour for m in momentos])
+            modelo_atual = atualizador.pacote if atualizador is not None else pacote
+            predicoes, scores = pontuar_matriz(modelo_atual, X, horas)
+            emitido = time.perf_counter()
+
+            for (numero, valores, chegada, _), predicao, score in zip(lote, predicoes, scores):
+                latencia = (emitido - chegada) * 1000
+                estatisticas.latencias_ms.append(latencia)
+                if predicao == -1:
+                    estatisticas.anomalias += 1
+                    if ao_anomalia is not None:
+                        ao_anomalia(numero, valores, score, latencia)
+
+            estatisticas.registros += len(lote)
+            estatisticas.lotes += 1
+            if atualizador is not None:
+                atualizador.adicionar(X, momentos)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if atualizador is not None:
+            atualizador.parar()
+            estatisticas.reajustes = atualizador.reajustes
+    return estatisticas
@@ -0,0 +1,106 @@
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.floresta_compacta import compactar_floresta
+from pacote_forca_bruta import CAMINHO_PACOTE, carregar_floresta_sklearn, carregar_pacote_forca_bruta
+
+parser = argparse.ArgumentParser(description="Compara o score_samples do sklearn com a floresta compacta")
+parser.add_argument('--dados', default='dados/logins_gerados.csv',
+                    help="Dataset de logins (padrão: dados/logins_gerados.csv)")
+parser.add_argument('--pacote', default=CAMINHO_PACOTE,
+                    help=f"Pacote do modelo salvo pelo detector_forca_bruta.py (padrão: {CAMINHO_PACOTE})")
+parser.add_argument('--repeticoes', type=int, default=50,
+                    help="Chamadas medidas por tamanho de lote (padrão: 50)")
+parser.add_argument('--saida', default='resultados/benchmark_floresta.txt',
+                    help="Arquivo com a tabela de resultados")
+args = parser.parse_args()
+
+# ============================================
+# 1. MODELO E DADOS (mesmas features do detector)
+# ============================================
+
+pacote = carregar_pacote_forca_bruta(args.pacote)
+
+df = pd.read_csv(args.dados)
+df['timestamp'] = pd.to_datetime(df['timestamp'])
+df['hora'] = df['timestamp'].dt.hour
+df['dia_semana'] = df['timestamp'].dt.dayofweek
+df[['ip_encoded', 'usuario_encoded', 'localizacao_encoded']] = pacote['codificador'].transformar(df)
+X = (df[pacote['features']].to_numpy(dtype=np.float64) - pacote['media']) / pacote['escala']
+
+# Modelo do sklearn salvo ao lado do pacote; sem ele, é treinado de novo com
+# os parâmetros do detector (no mesmo dataset, é a mesma floresta)
+modelo = carregar_floresta_sklearn(args.pacote)
+if modelo is None:
+    modelo = IsolationForest(contamination=pacote['contaminacao'], random_state=42, n_estimators=100)
+    modelo.fit(X)
+
+inicio = time.perf_counter()
+floresta = compactar_floresta(modelo)
+tempo_exportacao = time.perf_counter() - inicio
+mesma_floresta = np.array_equal(floresta.limiar, pacote['floresta'].limiar)
+
+print("=" * 60)
+print("⏱️ BENCHMARK: SKLEARN x FLORESTA COMPACTA")
+print("=" * 60)
+print(f"Eventos: {len(X)} | árvores: {len(modelo.estimators_)} | "
+      f"exportação: {tempo_exportacao * 1000:.0f} ms\n")
+
+# ============================================
+# 2. FIDELIDADE: scores e predições no dataset inteiro
+# ============================================
+
+scores_sklearn = modelo.score_samples(X)
+predicoes_compacta, scores_compacta = floresta.pontuar(X)
+diferenca_maxima = float(np.abs(scores_sklearn - scores_compacta).max())
+predicoes_diferentes = int((modelo.predict(X) != predicoes_compacta).sum())
+
+# ============================================
+# 3. LATÊNCIA POR CHAMADA, por tamanho de lote
+# ============================================
+
+def medir(funcao, lote):
+    tempos = np.empty(args.repeticoes)
+    for i in range(args.repeticoes):
+        inicio = time.perf_counter()
+        funcao(lote)
+        tempos[i] = time.perf_counter() - inicio
+    return np.median(tempos)
+
+
+linhas = []
+for tamanho in [1, 16, 256, 2048, 8192]:
+    lote = X[:tamanho]
+    tempo_sklearn = medir(modelo.score_samples, lote)
+    tempo_compacta = medir(floresta.score_samples, lote)
+    linhas.append({
+        'lote': len(lote),
+        'sklearn_ms': tempo_sklearn * 1000,
+        'compacta_ms': tempo_compacta * 1000,
+        'aceleracao': tempo_sklearn / tempo_compacta,
+    })
+
+resultado = pd.DataFrame(linhas).set_index('lote')
+texto = resultado.to_string(float_format=lambda valor: f"{valor:.3f}")
+texto += (f"\n\nDiferença máxima de score: {diferenca_maxima:.2e}"
+          f"\nPredições diferentes: {predicoes_diferentes} de {len(X)}"
+          f"\nFloresta igual à do pacote: {'sim' if mesma_floresta else 'não (dataset diferente do treino)'}"
+          f"\nMemória: modelo sklearn (pickle) {len(pickle.dumps(modelo)) / 1024:.0f} KB | "
+          f"arrays da floresta compacta {floresta.bytes / 1024:.0f} KB")
+print(texto)
+
+os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+with open(args.saida, 'w', encoding='utf-8') as f:
+    f.write("BENCHMARK: SKLEARN x FLORESTA COMPACTA\n")
+    f.write(f"Dados: {args.dados} | eventos: {len(X)} | árvores: {len(modelo.estimators_)}\n\n")
+    f.write(texto + "\n")
+
+print(f"\n✓ Resultado salvo: {args.saida}")
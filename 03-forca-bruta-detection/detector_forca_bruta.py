@@ -4,65 +4,205 @@ from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
 import seaborn as sns
-import joblib
+import argparse
+import os
+import sys
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.sketches import DistintosPorPeriodo, carregar_distintos, salvar_distintos
+from comum.treino_out_of_core import (TAMANHO_AMOSTRA_PADRAO, TAMANHO_BLOCO_PADRAO, AmostraReservatorio,
+                                      ler_em_blocos, treinar_out_of_core)
+from comum.codificador_categorico import CodificadorCategorico
+from comum.floresta_compacta import compactar_floresta, pontuar_floresta
+from comum.pacote_modelo import caminho_manifesto
+from indice_ips import CAPACIDADE_IPS_PADRAO, IndiceIPs, ResumoIPsEmBlocos
+from pacote_forca_bruta import CAMINHO_PACOTE, caminho_floresta_sklearn, montar_pacote, salvar_pacote_forca_bruta
+
+parser = argparse.ArgumentParser(description="Detector de força bruta com Machine Learning")
+parser.add_argument('--topk-capacidade', type=int, default=0,
+                    help="Com --out-of-core, máximo de IPs anômalos acompanhados pelo resumo "
+                         "de tamanho fixo (Space-Saving); 0 = padrão de 10000")
+parser.add_argument('--atualizar-ia', action='store_true',
+                    help="Ignora a análise de IA em cache e gera uma nova")
+parser.add_argument('--ia-orcamento-tokens', type=int, default=0,
+                    help="Analisa o relatório com a IA em partes de até N tokens, enviadas "
+                         "em paralelo e consolidadas no final; 0 = prompt único (padrão)")
+parser.add_argument('--ia-paralelismo', type=int, default=4,
+                    help="Partes analisadas ao mesmo tempo com --ia-orcamento-tokens (padrão: 4)")
+parser.add_argument('--out-of-core', action='store_true',
+                    help="Treina e pontua lendo o dataset em blocos, com memória limitada ao "
+                         "bloco, às amostras e a um resumo de tamanho fixo dos IPs anômalos")
+parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO,
+                    help=f"Eventos por bloco com --out-of-core (padrão: {TAMANHO_BLOCO_PADRAO})")
+parser.add_argument('--tamanho-amostra', type=int, default=TAMANHO_AMOSTRA_PADRAO,
+                    help=f"Eventos amostrados para ajustar a floresta com --out-of-core "
+                         f"(padrão: {TAMANHO_AMOSTRA_PADRAO})")
+args = parser.parse_args()
+if args.topk_capacidade and not args.out_of_core:
+    # Em memória o dataset inteiro já está carregado: o ranking exato não custa nada a mais
+    parser.error("--topk-capacidade só se aplica com --out-of-core")
+
 print("=" * 70)
 print("🔐 DETECTOR DE FORÇA BRUTA COM MACHINE LEARNING")
 print("=" * 70)
 
 # ========== CARREGAR DADOS ==========
-print("\n📂 Carregando dataset...")
-df = pd.read_csv('dados/logins_gerados.csv')
-print(f"✅ Dataset carregado: {len(df)} eventos")
-
-# ========== PRÉ-PROCESSAMENTO ==========
-print("\n🔧 Pré-processando dados...")
-
-# Converter timestamp para datetime
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-# Extrair features temporais
-df['hora'] = df['timestamp'].dt.hour
-df['dia_semana'] = df['timestamp'].dt.dayofweek
+CAMINHO_DADOS = 'dados/logins_gerados.csv'
 
-# Codificar variáveis categóricas
-df['ip_encoded'] = pd.factorize(df['ip'])[0]
-df['usuario_encoded'] = pd.factorize(df['usuario'])[0]
-df['localizacao_encoded'] = pd.factorize(df['localizacao'])[0]
+# Sketches de distintos (IPs, usuários, localizações) por dia, gerados junto com o dataset
+distintos = carregar_distintos(CAMINHO_DADOS)
+recalcular_distintos = distintos is None
+if recalcular_distintos:
+    distintos = DistintosPorPeriodo(['ip', 'usuario', 'localizacao'])
 
 # Features para o modelo
 features = ['tentativas_intervalo', 'origem_confiavel', 'sucesso', 
             'hora', 'dia_semana', 'ip_encoded', 'usuario_encoded', 
             'localizacao_encoded']
 
-X = df[features].copy()
-
-# Normalizar features
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-print(f"✅ Features preparadas: {len(features)} variáveis")
-
-# ========== TREINAR MODELO ==========
-print("\n🤖 Treinando modelo Isolation Forest...")
-
-# Isolation Forest para detecção de anomalias
-modelo = IsolationForest(
-    contamination=0.05,  # 5% são anomalias (ataques)
-    random_state=42,
-    n_estimators=100
-)
-
-# Treinar
-predicoes = modelo.fit_predict(X_scaled)
-scores = modelo.score_samples(X_scaled)
-
-# Adicionar ao dataframe
-df['anomalia'] = predicoes  # -1 = anomalia, 1 = normal
-df['anomalia_score'] = scores
+# Códigos por ordem de primeira ocorrência no treino (iguais a pd.factorize no
+# arquivo todo), salvos com o modelo para pontuar lotes novos com os mesmos códigos
+codificador = CodificadorCategorico(['ip', 'usuario', 'localizacao'])
+
+
+def preparar_eventos(eventos, ajustar=False):
+    """
+    Converte o timestamp e acrescenta as features temporais e categóricas.
+
+    Args:
+        eventos (pd.DataFrame): Eventos do dataset
+        ajustar (bool): Acrescenta ao codificador as categorias novas dos eventos
+    """
+    eventos['timestamp'] = pd.to_datetime(eventos['timestamp'])
+    eventos['hora'] = eventos['timestamp'].dt.hour
+    eventos['dia_semana'] = eventos['timestamp'].dt.dayofweek
+    if ajustar:
+        codificador.ajustar_parcial(eventos)
+    eventos[[f'{coluna}_encoded' for coluna in codificador.colunas]] = codificador.transformar(eventos)
+    return eventos
+
+
+if not args.out_of_core:
+    print("\n📂 Carregando dataset...")
+    df = pd.read_csv(CAMINHO_DADOS)
+    print(f"✅ Dataset carregado: {len(df)} eventos")
+
+    # ========== PRÉ-PROCESSAMENTO ==========
+    print("\n🔧 Pré-processando dados...")
+    df = preparar_eventos(df, ajustar=True)
+
+    if recalcular_distintos:
+        distintos.atualizar(df, df['timestamp'].dt.strftime('%Y-%m-%d'))
+
+    X = df[features].copy()
+
+    # Normalizar features
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    print(f"✅ Features preparadas: {len(features)} variáveis")
+
+    # ========== TREINAR MODELO ==========
+    print("\n🤖 Treinando modelo Isolation Forest...")
+
+    # Isolation Forest para detecção de anomalias
+    modelo = IsolationForest(
+        contamination=0.05,  # 5% são anomalias (ataques)
+        random_state=42,
+        n_estimators=100
+    )
+
+    # Treinar e pontuar (predição e score saem da mesma passada pelas árvores)
+    modelo.fit(X_scaled)
+    floresta = compactar_floresta(modelo)
+    predicoes, scores = pontuar_floresta(modelo, X_scaled, floresta)
+
+    # Adicionar ao dataframe
+    df['anomalia'] = predicoes  # -1 = anomalia, 1 = normal
+    df['anomalia_score'] = scores
+
+    # Resumos usados nos alertas, no relatório e nos gráficos
+    ataques = df[df['anomalia'] == -1]
+    total_eventos = len(df)
+    inicio_periodo, fim_periodo = df['timestamp'].min(), df['timestamp'].max()
+    primeira_localizacao = df.groupby('ip', sort=False)['localizacao'].first()
+    normais = df[df['anomalia'] == 1]
+    sucessos_normais = normais['sucesso'].sum()
+    origem_confiavel_normais = normais['origem_confiavel'].sum()
+    scores_normais = normais['anomalia_score'].to_numpy()
+    tentativas_por_ip = df.groupby('ip')['tentativas_intervalo'].mean()
+    total_anomalias = len(ataques)
+    anomalias_hora = ataques['hora'].value_counts().sort_index()
+    scores_anomalos = ataques['anomalia_score'].to_numpy()
+
+    # Índice por IP (uma ordenação): alertas, relatório e gráficos consultam
+    # faixas de linhas e agregados prontos em vez de filtrar a tabela por IP
+    indice_ips = IndiceIPs(ataques, primeira_localizacao, tentativas_por_ip)
+else:
+    # ========== TREINO E PONTUAÇÃO EM BLOCOS (OUT-OF-CORE) ==========
+    # 1ª passada: scaler (partial_fit) + amostras de reservatório para a floresta
+    # 2ª passada: pontua cada bloco e o dobra em agregados de tamanho fixo
+    print(f"\n🤖 Treinando Isolation Forest em blocos de {args.tamanho_bloco} eventos...")
+
+    def blocos_de_features():
+        for bloco in ler_em_blocos(CAMINHO_DADOS, args.tamanho_bloco):
+            yield preparar_eventos(bloco, ajustar=True)[features].to_numpy(dtype=np.float64)
+
+    scaler, modelo, resumo_treino = treinar_out_of_core(
+        blocos_de_features, tamanho_amostra=args.tamanho_amostra,
+        n_estimadores=100, contaminacao=0.05, semente=42,
+    )
+    floresta = compactar_floresta(modelo)
+    print(f"✅ Modelo treinado: {resumo_treino['registros']} eventos lidos, "
+          f"{resumo_treino['amostrados']} amostrados em {resumo_treino['rodadas']} rodadas")
+
+    print("\n🔍 Pontuando o dataset em blocos...")
+    total_eventos = total_anomalias = 0
+    inicio_periodo = fim_periodo = None
+    sucessos_normais = origem_confiavel_normais = 0
+    amostra_scores_normais = AmostraReservatorio(args.tamanho_amostra, semente=42)
+    amostra_scores_anomalos = AmostraReservatorio(args.tamanho_amostra, semente=43)
+    anomalias_hora = pd.Series(0, index=range(24), dtype=np.int64)
+    # Memória fixa: nenhum evento fica guardado, só um Space-Saving de IPs
+    # anômalos e os agregados dos IPs que ele acompanha
+    indice_ips = ResumoIPsEmBlocos(args.topk_capacidade or CAPACIDADE_IPS_PADRAO)
+
+    for bloco in ler_em_blocos(CAMINHO_DADOS, args.tamanho_bloco):
+        bloco = preparar_eventos(bloco)
+        X_bloco = scaler.transform(bloco[features].to_numpy(dtype=np.float64))
+        predicoes, scores = pontuar_floresta(modelo, X_bloco, floresta)
+        bloco['anomalia'] = predicoes
+        bloco['anomalia_score'] = scores
+
+        if recalcular_distintos:
+            distintos.atualizar(bloco, bloco['timestamp'].dt.strftime('%Y-%m-%d'))
+
+        indice_ips.atualizar(bloco)
+        anomalos = bloco[bloco['anomalia'] == -1]
+        total_anomalias += len(anomalos)
+        anomalias_hora = anomalias_hora.add(anomalos['hora'].value_counts(), fill_value=0)
+        amostra_scores_anomalos.atualizar(anomalos['anomalia_score'].to_numpy())
+        normais = bloco[bloco['anomalia'] == 1]
+        sucessos_normais += normais['sucesso'].sum()
+        origem_confiavel_normais += normais['origem_confiavel'].sum()
+        amostra_scores_normais.atualizar(normais['anomalia_score'].to_numpy())
+
+        total_eventos += len(bloco)
+        inicio_bloco, fim_bloco = bloco['timestamp'].min(), bloco['timestamp'].max()
+        inicio_periodo = inicio_bloco if inicio_periodo is None else min(inicio_periodo, inicio_bloco)
+        fim_periodo = fim_bloco if fim_periodo is None else max(fim_periodo, fim_bloco)
+
+    scores_normais = amostra_scores_normais.amostra()
+    scores_anomalos = amostra_scores_anomalos.amostra()
+    anomalias_hora = anomalias_hora[anomalias_hora > 0].astype(np.int64)
+    print(f"✅ Dataset pontuado: {total_eventos} eventos")
+
+if recalcular_distintos:
+    salvar_distintos(distintos, CAMINHO_DADOS)
+    print("✅ Sketches de distintos recalculados")
 
 print(f"✅ Modelo treinado com sucesso!")
 
@@ -70,20 +210,21 @@ print(f"✅ Modelo treinado com sucesso!")
 print("\n📊 RESULTADOS DA DETECÇÃO:")
 print("-" * 70)
 
-total_anomalias = (df['anomalia'] == -1).sum()
-total_normais = (df['anomalia'] == 1).sum()
+total_normais = total_eventos - total_anomalias
 
-print(f"🔍 Eventos normais: {total_normais} ({100*total_normais/len(df):.1f}%)")
-print(f"🚨 Eventos anômalos (ataques): {total_anomalias} ({100*total_anomalias/len(df):.1f}%)")
+print(f"🔍 Eventos normais: {total_normais} ({100*total_normais/total_eventos:.1f}%)")
+print(f"🚨 Eventos anômalos (ataques): {total_anomalias} ({100*total_anomalias/total_eventos:.1f}%)")
 
 # ========== IDENTIFICAR IPS ATACANTES ==========
 print("\n🕵️ IPS SUSPEITOS DETECTADOS:")
 print("-" * 70)
 
-ips_suspeitos = df[df['anomalia'] == -1]['ip'].value_counts().head(10)
+ips_suspeitos = indice_ips.ranking(10)
+if args.out_of_core:
+    print(f"   (ranking aproximado: erro máximo de ±{indice_ips.erro_maximo} tentativas por IP)\n")
 
 for ip, count in ips_suspeitos.items():
-    localizacao = df[df['ip'] == ip]['localizacao'].iloc[0]
+    localizacao = indice_ips.resumo.at[ip, 'localizacao']
     confianca = (count / total_anomalias) * 100
     print(f"   IP: {ip}")
     print(f"   Tentativas anômalas: {count}")
@@ -97,12 +238,12 @@ print("\n⚠️ GERANDO ALERTAS...")
 alertas = []
 
 for ip in ips_suspeitos.head(5).index:
-    eventos_ip = df[df['ip'] == ip]
-    eventos_ataque = eventos_ip[eventos_ip['anomalia'] == -1]
+    resumo_ip = indice_ips.resumo.loc[ip]
 
-    usuarios_alvo = eventos_ataque['usuario'].unique()
-    localizacao = eventos_ataque['localizacao'].iloc[0]
-    tentativas = eventos_ataque['tentativas_intervalo'].mean()
+    usuarios_alvo = indice_ips.usuarios_alvo(ip)
+    localizacao = resumo_ip['localizacao_ataque']
+    tentativas = resumo_ip['media_tentativas_anomalas']
+    anomalias_ip = resumo_ip['anomalias']
 
     alerta = f"""
 ╔════════════════════════════════════════════════════════════════╗
@@ -111,13 +252,13 @@ for ip in ips_suspeitos.head(5).index:
 
 IP ATACANTE: {ip}
 LOCALIZAÇÃO: {localizacao}
-TENTATIVAS DETECTADAS: {len(eventos_ataque)}
+TENTATIVAS DETECTADAS: {anomalias_ip}
 MÉDIA DE TENTATIVAS/INTERVALO: {tentativas:.1f}
 
 USUÁRIOS ALVO:
 {', '.join(usuarios_alvo)}
 
-CONFIANÇA DA DETECÇÃO: {(len(eventos_ataque)/total_anomalias)*100:.1f}%
+CONFIANÇA DA DETECÇÃO: {(anomalias_ip/total_anomalias)*100:.1f}%
 
 RECOMENDAÇÃO: ⛔ BLOQUEAR IP IMEDIATAMENTE
 
@@ -151,19 +292,19 @@ DATA DO RELATÓRIO: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 📊 ESTATÍSTICAS GERAIS:
 
-   • Total de eventos analisados: {len(df):,}
-   • Período: {df['timestamp'].min()} até {df['timestamp'].max()}
-   • IPs únicos: {df['ip'].nunique()}
-   • Usuários únicos: {df['usuario'].nunique()}
-   • Localizações: {df['localizacao'].nunique()}
+   • Total de eventos analisados: {total_eventos:,}
+   • Período: {inicio_periodo} até {fim_periodo}
+   • IPs únicos: ~{distintos.estimar('ip')}
+   • Usuários únicos: ~{distintos.estimar('usuario')}
+   • Localizações: ~{distintos.estimar('localizacao')}
 
 ═══════════════════════════════════════════════════════════════════
 
 🚨 DETECÇÃO DE ATAQUES:
 
-   • Eventos normais: {total_normais} ({100*total_normais/len(df):.2f}%)
-   • Eventos anômalos: {total_anomalias} ({100*total_anomalias/len(df):.2f}%)
-   • Taxa de detecção: {(total_anomalias/len(df))*100:.2f}%
+   • Eventos normais: {total_normais} ({100*total_normais/total_eventos:.2f}%)
+   • Eventos anômalos: {total_anomalias} ({100*total_anomalias/total_eventos:.2f}%)
+   • Taxa de detecção: {(total_anomalias/total_eventos)*100:.2f}%
 
 ═══════════════════════════════════════════════════════════════════
 
@@ -172,7 +313,7 @@ DATA DO RELATÓRIO: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
 
 for idx, (ip, count) in enumerate(ips_suspeitos.head(10).items(), 1):
-    localizacao = df[df['ip'] == ip]['localizacao'].iloc[0]
+    localizacao = indice_ips.resumo.at[ip, 'localizacao']
     risco = "🔴 CRÍTICO" if count > 50 else "🟠 ALTO" if count > 20 else "🟡 MÉDIO"
     relatorio += f"\n   {idx}. IP: {ip} | Tentativas: {count} | {risco} | Localização: {localizacao}"
 
@@ -182,8 +323,8 @@ relatorio += f"""
 
 ✅ EVENTOS LEGÍTIMOS:
 
-   • Taxa de sucesso: {(df[df['anomalia']==1]['sucesso'].sum() / total_normais * 100):.2f}%
-   • Origem confiável: {(df[df['anomalia']==1]['origem_confiavel'].sum() / total_normais * 100):.2f}%
+   • Taxa de sucesso: {(sucessos_normais / total_normais * 100):.2f}%
+   • Origem confiável: {(origem_confiavel_normais / total_normais * 100):.2f}%
 
 ═══════════════════════════════════════════════════════════════════
 
@@ -215,10 +356,14 @@ with open('resultados/relatorio.txt', 'w', encoding='utf-8') as f:
 print("✅ Relatório detalhado salvo em: resultados/relatorio.txt")
 
 # ========== SALVAR MODELO ==========
+# Um pacote só (normalização e floresta compacta em arrays, codificadores,
+# ordem das features e limiar), com manifesto de versão e checksum, legível via
+# mmap; o IsolationForest do sklearn vai à parte, para pontuar lotes grandes
 print("\n💾 Salvando modelo treinado...")
-joblib.dump(modelo, 'modelos/modelo_deteccao.pkl')
-joblib.dump(scaler, 'modelos/scaler.pkl')
-print("✅ Modelo salvo em: modelos/modelo_deteccao.pkl")
+pacote = montar_pacote(scaler, floresta, codificador, features,
+                       contaminacao=0.05, registros_treino=total_eventos)
+salvar_pacote_forca_bruta(pacote, CAMINHO_PACOTE, modelo=modelo)
+print(f"✅ Modelo salvo em: {CAMINHO_PACOTE} (+ manifesto {caminho_manifesto(CAMINHO_PACOTE)})")
 
 # ========== GERAR GRÁFICOS ==========
 print("\n📈 Gerando visualizações...")
@@ -247,15 +392,14 @@ axes[0, 1].set_xlabel('Número de Tentativas Anômalas', fontsize=11)
 axes[0, 1].invert_yaxis()
 
 # Gráfico 1.3: Anomalias por hora do dia
-anomalias_hora = df[df['anomalia'] == -1]['hora'].value_counts().sort_index()
 axes[1, 0].bar(anomalias_hora.index, anomalias_hora.values, color='#e74c3c', alpha=0.7)
 axes[1, 0].set_title('Ataques por Hora do Dia', fontsize=14, weight='bold')
 axes[1, 0].set_xlabel('Hora do Dia', fontsize=11)
 axes[1, 0].set_ylabel('Quantidade de Ataques', fontsize=11)
 
 # Gráfico 1.4: Score de anomalia
-axes[1, 1].hist(df[df['anomalia'] == 1]['anomalia_score'], bins=50, alpha=0.7, label='Normal', color='#2ecc71')
-axes[1, 1].hist(df[df['anomalia'] == -1]['anomalia_score'], bins=50, alpha=0.7, label='Anômalo', color='#e74c3c')
+axes[1, 1].hist(scores_normais, bins=50, alpha=0.7, label='Normal', color='#2ecc71')
+axes[1, 1].hist(scores_anomalos, bins=50, alpha=0.7, label='Anômalo', color='#e74c3c')
 axes[1, 1].set_title('Distribuição de Scores de Anomalia', fontsize=14, weight='bold')
 axes[1, 1].set_xlabel('Score de Anomalia', fontsize=11)
 axes[1, 1].set_ylabel('Frequência', fontsize=11)
@@ -268,12 +412,9 @@ print("✅ Gráfico salvo em: resultados/analise_deteccao.png")
 # Gráfico 2: Matriz de confusão visual
 fig, ax = plt.subplots(figsize=(10, 6))
 
-tentativas_por_ip = df.groupby('ip')['tentativas_intervalo'].mean()
-anomalias_por_ip = df[df['anomalia'] == -1].groupby('ip').size()
-
-dados_plot = pd.DataFrame({
-    'Tentativas Médias': tentativas_por_ip,
-    'Anomalias Detectadas': anomalias_por_ip
+dados_plot = indice_ips.resumo[['tentativas_medias', 'anomalias']].rename(columns={
+    'tentativas_medias': 'Tentativas Médias',
+    'anomalias': 'Anomalias Detectadas'
 }).fillna(0).head(15)
 
 dados_plot.plot(kind='barh', ax=ax, color=['#3498db', '#e74c3c'])
@@ -287,13 +428,18 @@ print("✅ Gráfico salvo em: resultados/analise_ips.png")
 print("\n🤖 Gerando análise avançada com IA (Mistral via Ollama)...")
 
 from ia_brute_force import analisar_brute_force_com_llm
+from comum.cache_llm import cache_padrao
 
 # Ler o relatório gerado
 with open('resultados/relatorio.txt', 'r', encoding='utf-8') as f:
     texto_base = f.read()
 
 # Gerar análise com IA
-analise_ia = analisar_brute_force_com_llm(texto_base)
+# A resposta é exibida no console conforme o modelo gera
+analise_ia = analisar_brute_force_com_llm(texto_base, ao_receber=lambda trecho: print(trecho, end="", flush=True),
+                                          forcar_atualizacao=args.atualizar_ia,
+                                          orcamento_tokens=args.ia_orcamento_tokens, paralelismo=args.ia_paralelismo)
+print()
 
 # Salvar análise IA
 with open('resultados/relatorio_ia_avancado.txt', 'w', encoding='utf-8') as f:
@@ -305,6 +451,23 @@ with open('resultados/relatorio_ia_avancado.txt', 'w', encoding='utf-8') as f:
 
 print("✅ Análise IA salva em: resultados/relatorio_ia_avancado.txt")
 
+# ========== TRIAGEM DOS ALERTAS COM IA ==========
+# Alertas parecidos são agrupados e explicados com uma chamada ao LLM por
+# grupo; a explicação vale para todos os IPs do grupo
+print("\n🧩 Triagem dos alertas por grupo...")
+
+from ia_brute_force import explicar_grupos_com_llm
+from triagem_alertas import salvar_triagem, triar_alertas
+
+alertas_triagem, explicacoes_grupos = triar_alertas(indice_ips, explicar_grupos_com_llm, paralelismo=args.ia_paralelismo,
+                                                    forcar_atualizacao=args.atualizar_ia)
+salvar_triagem(alertas_triagem, explicacoes_grupos,
+               'resultados/triagem_alertas.txt', 'resultados/triagem_alertas.csv')
+print(f"✅ {len(alertas_triagem)} alertas em {len(explicacoes_grupos)} grupos "
+      f"({len(explicacoes_grupos)} chamadas ao LLM em vez de {len(alertas_triagem)})")
+print("✅ Triagem salva em: resultados/triagem_alertas.txt e resultados/triagem_alertas.csv")
+print(f"✅ Cache de análises IA: {cache_padrao().resumo()}")
+
 
 # ========== RESUMO FINAL ==========
 print("\n" + "=" * 70)
@@ -312,12 +475,13 @@ print("✅ ANÁLISE CONCLUÍDA COM SUCESSO!")
 print("=" * 70)
 print(f"\n📁 Arquivos gerados:")
 print(f"   ✅ dados/logins_gerados.csv")
-print(f"   ✅ modelos/modelo_deteccao.pkl")
-print(f"   ✅ modelos/scaler.pkl")
+print(f"   ✅ {CAMINHO_PACOTE}")
+print(f"   ✅ {caminho_floresta_sklearn(CAMINHO_PACOTE)}")
 print(f"   ✅ resultados/alertas.txt")
 print(f"   ✅ resultados/relatorio.txt")
 print(f"   ✅ resultados/analise_deteccao.png")
 print(f"   ✅ resultados/analise_ips.png")
+print(f"   ✅ resultados/triagem_alertas.txt")
 print(f"\n🎯 Próximos passos:")
 print(f"   1. Revisar os alertas em: resultados/alertas.txt")
 print(f"   2. Analisar o relatório em: resultados/relatorio.txt")
@@ -0,0 +1,182 @@
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from janelas_login import JANELAS_PADRAO, DetectorTempoReal, treinar_modelo_janelas
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '01-analise-logs-linux'))
+from comum.leitura_continua import linhas_continuas
+from parser_logs import PADRAO_LINHA, calcular_timestamps
+
+parser = argparse.ArgumentParser(
+    description="Detector de força bruta em tempo real (janelas deslizantes por IP e por usuário)")
+parser.add_argument('arquivo', nargs='?', default='dados/logins_gerados.csv',
+                    help="CSV de logins (timestamp,ip,usuario,sucesso) ou auth.log do sshd; "
+                         "'-' lê da entrada padrão (padrão: dados/logins_gerados.csv)")
+parser.add_argument('--seguir', action='store_true',
+                    help="Continua lendo as linhas novas do arquivo (como tail -f)")
+parser.add_argument('--janelas', default=','.join(str(j) for j in JANELAS_PADRAO),
+                    help="Durações das janelas em segundos (padrão: 60,300,3600)")
+parser.add_argument('--modelo', default=None,
+                    help="Pacote salvo com --treinar; os scores do modelo também geram alertas")
+parser.add_argument('--treinar', default=None, metavar='CSV',
+                    help="Treina o modelo de janelas com um CSV de referência (tráfego normal), "
+                         "salva em modelos/modelo_tempo_real.pkl e encerra")
+parser.add_argument('--silencioso', action='store_true',
+                    help="Mostra só o resumo final, sem imprimir cada alerta")
+parser.add_argument('--saida', default=None,
+                    help="CSV com os alertas e o tempo até o alerta de cada um")
+args = parser.parse_args()
+
+janelas = tuple(sorted({float(parte) for parte in args.janelas.split(',') if parte.strip()}))
+
+# ============================================
+# 1. TREINO DO MODELO (opcional)
+# ============================================
+
+if args.treinar:
+    print("=" * 60)
+    print("🤖 TREINANDO MODELO DE JANELAS")
+    print("=" * 60)
+    eventos = pd.read_csv(args.treinar, usecols=['timestamp', 'ip', 'usuario', 'sucesso'])
+    eventos['timestamp'] = pd.to_datetime(eventos['timestamp'])
+    eventos = eventos.sort_values('timestamp', kind='stable')
+    inicio = time.perf_counter()
+    pacote = treinar_modelo_janelas(eventos, janelas)
+    os.makedirs('modelos', exist_ok=True)
+    joblib.dump(pacote, 'modelos/modelo_tempo_real.pkl')
+    print(f"✓ {len(eventos)} eventos reproduzidos em {time.perf_counter() - inicio:.1f}s")
+    print(f"✓ Features: {', '.join(pacote['features'])}")
+    print("✓ Modelo salvo: modelos/modelo_tempo_real.pkl")
+    sys.exit(0)
+
+modelo = None
+if args.modelo:
+    modelo = joblib.load(args.modelo)
+    if tuple(modelo['janelas']) != janelas:
+        print(f"❌ O modelo foi treinado com as janelas {modelo['janelas']}; use --janelas "
+              f"{','.join(f'{j:g}' for j in modelo['janelas'])}")
+        sys.exit(1)
+
+# ============================================
+# 2. LEITURA: CSV do gerador ou linhas do sshd
+# ============================================
+
+# Início do dia (epoch) por data do syslog, com o ano deduzido como no 01
+inicio_dia = {}
+
+
+def evento_syslog(linha):
+    """
+    (timestamp, ip, usuario, sucesso) de uma linha Accepted/Failed do sshd.
+    """
+    match = PADRAO_LINHA.match(linha)
+    if match is None or match.group('resultado') is None:
+        return None
+    data = match.group('data')
+    if data not in inicio_dia:
+        inicio_dia[data] = int(calcular_timestamps(pd.Series([data]), pd.Series(['00:00:00']))[0])
+    if inicio_dia[data] < 0:
+        return None
+    h, m, s = match.group('hora').split(':')
+    momento = inicio_dia[data] + int(h) * 3600 + int(m) * 60 + int(s)
+    return momento, match.group('ip'), match.group('usuario'), match.group('resultado') == 'Accepted'
+
+
+def eventos_entrada():
+    """
+    Eventos na ordem de chegada, com o instante (perf_counter) em que cada
+    linha foi lida, para medir o tempo até o alerta.
+    """
+    colunas = None
+    for linha in linhas_continuas(args.arquivo, args.seguir):
+        lida = time.perf_counter()
+        if colunas is None and linha.startswith('timestamp,'):
+            colunas = {nome: i for i, nome in enumerate(linha.rstrip('\n').split(','))}
+            continue
+        if colunas is not None:
+            campos = linha.rstrip('\n').split(',')
+            try:
+                momento = pd.Timestamp(campos[colunas['timestamp']]).timestamp()
+                yield (lida, momento, campos[colunas['ip']], campos[colunas['usuario']],
+                       campos[colunas['sucesso']].strip() in ('1', 'True', 'true'))
+            except (ValueError, IndexError):
+                continue
+        else:
+            evento = evento_syslog(linha)
+            if evento is not None:
+                yield (lida,) + evento
+
+
+# ============================================
+# 3. DETECÇÃO EVENTO A EVENTO
+# ============================================
+
+print("=" * 60)
+print("⚡ DETECTOR DE FORÇA BRUTA EM TEMPO REAL")
+print("=" * 60)
+print(f"Janelas: {', '.join(f'{j:g}s' for j in janelas)} | "
+      f"modelo: {'sim' if modelo is not None else 'não'} | "
+      f"entrada: {args.arquivo}{' (seguindo)' if args.seguir else ''}\n")
+
+detector = DetectorTempoReal(janelas, modelo=modelo)
+alertas = []
+latencias = []
+total_eventos = 0
+inicio = time.perf_counter()
+
+try:
+    for lida, momento, ip, usuario, sucesso in eventos_entrada():
+        total_eventos += 1
+        disparados = detector.processar(momento, ip, usuario, sucesso)
+        if not disparados:
+            continue
+        latencia_ms = (time.perf_counter() - lida) * 1000
+        latencias.append(latencia_ms)
+        quando = pd.Timestamp(momento, unit='s').strftime('%Y-%m-%d %H:%M:%S')
+        for alerta in disparados:
+            alerta.update({'timestamp': quando, 'ip': ip, 'usuario': usuario,
+                           'tempo_ate_alerta_ms': latencia_ms})
+            alertas.append(alerta)
+            if not args.silencioso:
+                valor = f"{alerta['valor']:.3f}" if isinstance(alerta['valor'], float) else alerta['valor']
+                print(f"🚨 {quando} [{alerta['regra']}] {alerta['chave']}={alerta['valor_chave']} "
+                      f"{alerta['metrica']}={valor} (limite {alerta['limite']:g}, "
+                      f"janela {alerta['janela']:g}s) | {latencia_ms:.2f} ms", flush=True)
+except KeyboardInterrupt:
+    print("\n⏹️ Interrompido")
+
+duracao = time.perf_counter() - inicio
+
+# ============================================
+# 4. RESUMO
+# ============================================
+
+print("\n" + "=" * 60)
+print("📊 RESUMO")
+print("=" * 60)
+print(f"Eventos processados: {total_eventos} em {duracao:.2f}s "
+      f"({total_eventos / max(duracao, 1e-9):,.0f} eventos/s)")
+print(f"Alertas: {len(alertas)}")
+if alertas:
+    tabela = pd.DataFrame(alertas)
+    for regra, quantidade in tabela['regra'].value_counts().items():
+        print(f"  • {regra}: {quantidade}")
+    ips = tabela.loc[tabela['chave'] == 'ip', 'valor_chave'].unique()
+    usuarios = tabela.loc[tabela['chave'] == 'usuario', 'valor_chave'].unique()
+    print(f"IPs alertados: {', '.join(sorted(ips)) or '-'}")
+    print(f"Usuários alertados: {', '.join(sorted(usuarios)) or '-'}")
+    p50, p99 = np.percentile(latencias, [50, 99])
+    print(f"Tempo até o alerta (leitura da linha → alerta): p50 {p50:.3f} ms | "
+          f"p99 {p99:.3f} ms | máx {max(latencias):.3f} ms")
+
+    if args.saida:
+        os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+        tabela.to_csv(args.saida, index=False)
+        print(f"✓ Alertas salvos: {args.saida}")
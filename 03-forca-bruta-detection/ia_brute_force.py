@@ -1,10 +1,11 @@
-import subprocess
+import os
+import sys
 
-def analisar_brute_force_com_llm(texto_relatorio):
-    """
-    Envia o relatório de força bruta para o Mistral (Ollama) e retorna análise avançada.
-    """
-    prompt = f"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.analise_em_partes import analisar_em_partes, gerar_em_paralelo
+
+# Template do prompt; faz parte da chave do cache de análises
+PROMPT_ANALISE_FORCA_BRUTA = """
 Você é um especialista em segurança cibernética e detecção de ataques de força bruta.
 Analise o relatório de detecção abaixo e produza:
 
@@ -22,25 +23,45 @@ Relatório:
 {texto_relatorio}
 """
 
-    comando = [
-        r"C:\Users\Bernardo\AppData\Local\Programs\Ollama\ollama.exe",
-        "run",
-        "mistral"
-    ]
-
-    processo = subprocess.Popen(
-        comando,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding='utf-8',
-        errors='replace'
-    )
+# Template da explicação de um grupo de alertas parecidos (triagem)
+PROMPT_GRUPO_ALERTAS = """
+Você é um analista de SOC fazendo a triagem de alertas de força bruta.
+Os alertas abaixo foram agrupados por terem o mesmo perfil (usuários alvo,
+origem e ritmo de tentativas). Em no máximo 8 linhas, explique:
+
+1. O tipo de ataque mais provável (rápido, lento, distribuído, falso positivo)
+2. A severidade (baixa/média/alta/crítica) e o motivo
+3. A ação recomendada para todos os IPs do grupo
+
+Grupo:
+{texto_relatorio}
+"""
 
-    saida, erro = processo.communicate(prompt)
+def analisar_brute_force_com_llm(texto_relatorio, ao_receber=None, forcar_atualizacao=False,
+                                 orcamento_tokens=0, paralelismo=4):
+    """
+    Envia o relatório de força bruta para o Mistral (Ollama) e retorna análise avançada.
+    """
+    return analisar_em_partes(
+        PROMPT_ANALISE_FORCA_BRUTA, texto_relatorio,
+        orcamento_tokens=orcamento_tokens,
+        paralelismo=paralelismo,
+        ao_receber=ao_receber,
+        forcar_atualizacao=forcar_atualizacao,
+        aviso="⚠️ Aviso do modelo:",
+        falha="❌ Não foi possível gerar análise com IA.",
+    )
 
-    if erro:
-        print("⚠️ Aviso do modelo:", erro)
 
-    return saida if saida else "❌ Não foi possível gerar análise com IA."
+def explicar_grupos_com_llm(descricoes, paralelismo=4, forcar_atualizacao=False):
+    """
+    Gera uma explicação por grupo de alertas (uma chamada ao Mistral por grupo).
+    """
+    respostas = gerar_em_paralelo(
+        PROMPT_GRUPO_ALERTAS, descricoes,
+        paralelismo=paralelismo,
+        forcar_atualizacao=forcar_atualizacao,
+        aviso="⚠️ Aviso do modelo:",
+        rotulo="grupo",
+    )
+    return [resposta or "❌ Não foi possível gerar explicação com IA." for resposta in respostas]
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+from comum.sketches import SpaceSaving
+
+
+class IndiceIPs:
+    """
+    Índice por IP montado uma vez: os eventos anômalos ordenados por IP (uma
+    ordenação estável, então cada IP ocupa uma faixa contígua de linhas, na
+    ordem original) e um resumo por IP com os agregados usados nos alertas,
+    no relatório e nos gráficos.
+
+    Consultar um IP custa o tamanho da sua faixa, e não uma varredura da
+    tabela de ataques, então gerar alertas para milhares de IPs continua
+    linear no número de eventos.
+
+    Args:
+        ataques (pd.DataFrame): Eventos anômalos (ip, usuario, localizacao,
+            tentativas_intervalo, origem_confiavel, sucesso)
+        primeira_localizacao (pd.Series): Localização do primeiro evento de
+            cada IP, entre todos os eventos
+        tentativas_por_ip (pd.Series): Média de tentativas/intervalo de cada
+            IP, entre todos os eventos
+    """
+
+    def __init__(self, ataques, primeira_localizacao, tentativas_por_ip):
+        codigos, ips = pd.factorize(ataques['ip'])
+        ordem = np.argsort(codigos, kind='stable')
+        self.ataques = ataques.iloc[ordem].reset_index(drop=True)
+
+        contagens = np.bincount(codigos, minlength=len(ips))
+        fim = np.cumsum(contagens)
+        inicio = fim - contagens
+        somas = {}
+        for coluna in ['tentativas_intervalo', 'origem_confiavel', 'sucesso']:
+            valores = self.ataques[coluna].to_numpy(dtype=np.float64)
+            somas[coluna] = np.add.reduceat(valores, inicio) if len(valores) else np.zeros(0)
+
+        anomalos = pd.DataFrame({
+            'inicio': inicio,
+            'fim': fim,
+            'anomalias': contagens,
+            'localizacao_ataque': self.ataques['localizacao'].to_numpy()[inicio],
+            'media_tentativas_anomalas': somas['tentativas_intervalo'] / np.maximum(contagens, 1),
+            'origem_confiavel_anomala': somas['origem_confiavel'] / np.maximum(contagens, 1),
+            'sucessos_anomalos': somas['sucesso'].astype(np.int64),
+        }, index=pd.Index(ips, name='ip'))
+
+        # Todos os IPs vistos (com ou sem anomalias), em ordem de IP
+        self.resumo = pd.DataFrame({
+            'localizacao': primeira_localizacao,
+            'tentativas_medias': tentativas_por_ip,
+        }).join(anomalos, how='outer').sort_index()
+        self.resumo[['inicio', 'fim', 'anomalias']] = (
+            self.resumo[['inicio', 'fim', 'anomalias']].fillna(0).astype('int64'))
+        self.resumo.index.name = 'ip'
+
+        # Ordem de primeira ocorrência (desempate do ranking, como no value_counts)
+        self._ordem_ataque = pd.Series(np.arange(len(ips)), index=ips)
+
+    def eventos(self, ip):
+        """
+        Eventos anômalos do IP, na ordem original.
+        """
+        linha = self.resumo.loc[ip]
+        return self.ataques.iloc[linha['inicio']:linha['fim']]
+
+    def usuarios_alvo(self, ip):
+        """
+        Usuários tentados pelo IP nos eventos anômalos, por ordem de primeira tentativa.
+        """
+        return self.eventos(ip)['usuario'].unique()
+
+    def pares_usuarios(self):
+        """
+        Pares (ip, usuário) distintos dos eventos anômalos, agrupados por IP e
+        na ordem de primeira tentativa.
+        """
+        return self.ataques[['ip', 'usuario']].drop_duplicates(ignore_index=True)
+
+    def ranking(self, n=10):
+        """
+        IPs com mais eventos anômalos.
+
+        Returns:
+            pd.Series: Eventos anômalos por IP (maior primeiro)
+        """
+        contagens = self.resumo.loc[self._ordem_ataque.index, 'anomalias']
+        return contagens.sort_values(ascending=False, kind='stable').head(n).rename('count')
+
+
+# IPs acompanhados pelo resumo em blocos (padrão) e usuários guardados por IP
+CAPACIDADE_IPS_PADRAO = 10000
+MAX_USUARIOS_POR_IP = 20
+
+COLUNAS_SOMA = ['eventos', 'soma_tentativas', 'anomalias_vistas', 'soma_tentativas_anomalas',
+                'soma_origem_confiavel', 'sucessos_anomalos']
+
+
+class ResumoIPsEmBlocos:
+    """
+    Equivalente do IndiceIPs para o modo out-of-core, com memória fixa: cada
+    bloco pontuado é dobrado em um Space-Saving de IPs anômalos e em uma
+    tabela de agregados só dos IPs que ele acompanha, sem guardar eventos.
+
+    Oferece a mesma interface usada por alertas, relatório, gráficos e
+    triagem (`resumo`, `ranking`, `usuarios_alvo`, `pares_usuarios`), com
+    duas aproximações:
+
+    - `anomalias` é a contagem do Space-Saving (nunca menor que a real,
+      excesso de no máximo `erro_maximo`);
+    - os demais agregados de um IP contam a partir do bloco em que ele
+      passou a ser acompanhado (e recomeçam se ele sair e voltar), e no
+      máximo MAX_USUARIOS_POR_IP usuários alvo são guardados por IP.
+
+    Args:
+        capacidade (int): Máximo de IPs acompanhados
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_IPS_PADRAO):
+        self.contagens = SpaceSaving(capacidade)
+        self.tabela = pd.DataFrame(columns=['localizacao', 'localizacao_ataque'] + COLUNAS_SOMA,
+                                   index=pd.Index([], name='ip'))
+        self.pares = pd.DataFrame(columns=['ip', 'usuario'])
+
+    @property
+    def erro_maximo(self):
+        return self.contagens.erro_maximo
+
+    def atualizar(self, bloco):
+        """
+        Dobra um bloco pontuado (com a coluna 'anomalia') no resumo.
+        """
+        anomalos = bloco['anomalia'] == -1
+        # Uma atualização por IP distinto do bloco, e não por evento (na ordem
+        # de primeira ocorrência: empates no ranking ficam como no IndiceIPs)
+        self.contagens.update(bloco.loc[anomalos, 'ip'].value_counts(sort=False))
+        acompanhados = list(self.contagens.contagens)
+
+        # IPs descartados pelo Space-Saving deixam a tabela
+        self.tabela = self.tabela[self.tabela.index.isin(acompanhados)]
+        self.pares = self.pares[self.pares['ip'].isin(acompanhados)]
+
+        eventos = bloco[bloco['ip'].isin(acompanhados)]
+        if eventos.empty:
+            return self
+        eventos = eventos.assign(anomalo=(eventos['anomalia'] == -1).astype(np.int64))
+        eventos['tentativas_anomalas'] = eventos['tentativas_intervalo'] * eventos['anomalo']
+        eventos['origem_anomala'] = eventos['origem_confiavel'] * eventos['anomalo']
+        eventos['sucesso_anomalo'] = eventos['sucesso'] * eventos['anomalo']
+        por_ip = eventos.groupby('ip', sort=False)
+        parcial = pd.DataFrame({
+            'localizacao': por_ip['localizacao'].first(),
+            'eventos': por_ip.size(),
+            'soma_tentativas': por_ip['tentativas_intervalo'].sum(),
+            'anomalias_vistas': por_ip['anomalo'].sum(),
+            'soma_tentativas_anomalas': por_ip['tentativas_anomalas'].sum(),
+            'soma_origem_confiavel': por_ip['origem_anomala'].sum(),
+            'sucessos_anomalos': por_ip['sucesso_anomalo'].sum(),
+        })
+        ataques = eventos[eventos['anomalo'] == 1]
+        parcial['localizacao_ataque'] = ataques.groupby('ip', sort=False)['localizacao'].first()
+
+        # Localizações: a já registrada vale (primeira ocorrência); somas acumulam
+        colunas = ['localizacao', 'localizacao_ataque']
+        localizacoes = self.tabela[colunas].combine_first(parcial[colunas])
+        somas = self.tabela[COLUNAS_SOMA].astype(np.float64).add(parcial[COLUNAS_SOMA], fill_value=0)
+        self.tabela = localizacoes.join(somas)
+
+        pares = pd.concat([self.pares, ataques[['ip', 'usuario']]]).drop_duplicates()
+        self.pares = pares.groupby('ip', sort=False).head(MAX_USUARIOS_POR_IP)
+        return self
+
+    @property
+    def resumo(self):
+        """
+        Agregados por IP acompanhado, em ordem de IP (mesmas colunas do IndiceIPs).
+        """
+        tabela = self.tabela.sort_index()
+        anomalias = pd.Series(self.contagens.contagens, dtype=np.int64).reindex(tabela.index).fillna(0)
+        vistas = np.maximum(tabela['anomalias_vistas'], 1)
+        return pd.DataFrame({
+            'localizacao': tabela['localizacao'],
+            'tentativas_medias': tabela['soma_tentativas'] / np.maximum(tabela['eventos'], 1),
+            'anomalias': anomalias.astype(np.int64),
+            'localizacao_ataque': tabela['localizacao_ataque'],
+            'media_tentativas_anomalas': tabela['soma_tentativas_anomalas'] / vistas,
+            'origem_confiavel_anomala': tabela['soma_origem_confiavel'] / vistas,
+            'sucessos_anomalos': tabela['sucessos_anomalos'].astype(np.int64),
+        })
+
+    def usuarios_alvo(self, ip):
+        """
+        Usuários tentados pelo IP nos eventos anômalos, por ordem de primeira tentativa.
+        """
+        return self.pares.loc[self.pares['ip'] == ip, 'usuario'].to_numpy()
+
+    def pares_usuarios(self):
+        """
+        Pares (ip, usuário) distintos dos eventos anômalos, agrupados por IP e
+        na ordem de primeira tentativa.
+        """
+        return self.pares.sort_values('ip', kind='stable', ignore_index=True)
+
+    def ranking(self, n=10):
+        """
+        IPs com mais eventos anômalos (contagem aproximada).
+
+        Returns:
+            pd.Series: Eventos anômalos por IP (maior primeiro)
+        """
+        return pd.Series(dict(self.contagens.most_common(n)), dtype='int64', name='count')
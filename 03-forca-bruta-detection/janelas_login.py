@@ -0,0 +1,296 @@
+import os
+import sys
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.floresta_compacta import compactar_floresta
+
+# Janelas padrão, em segundos de tempo do evento
+JANELAS_PADRAO = (60, 300, 3600)
+
+
+class Janela:
+    """
+    Eventos de uma chave (IP ou usuário) nos últimos `duracao` segundos, em
+    tempo do evento, com contadores mantidos na entrada e na saída de cada
+    evento: cada evento entra e sai uma única vez, então a atualização é
+    O(1) amortizado.
+
+    `alvos_falha` conta, por alvo (o usuário tentado por um IP, ou o IP que
+    tentou um usuário), as falhas dentro da janela.
+
+    Args:
+        duracao (float): Tamanho da janela em segundos
+    """
+
+    __slots__ = ('duracao', 'eventos', 'falhas', 'alvos_falha')
+
+    def __init__(self, duracao):
+        self.duracao = duracao
+        self.eventos = deque()
+        self.falhas = 0
+        self.alvos_falha = {}
+
+    def adicionar(self, momento, falha, alvo):
+        self.eventos.append((momento, falha, alvo))
+        if falha:
+            self.falhas += 1
+            self.alvos_falha[alvo] = self.alvos_falha.get(alvo, 0) + 1
+
+    def expirar(self, agora):
+        """
+        Remove os eventos que saíram da janela terminada em `agora`.
+        """
+        limite = agora - self.duracao
+        while self.eventos and self.eventos[0][0] <= limite:
+            _, falha, alvo = self.eventos.popleft()
+            if falha:
+                self.falhas -= 1
+                restantes = self.alvos_falha[alvo] - 1
+                if restantes:
+                    self.alvos_falha[alvo] = restantes
+                else:
+                    del self.alvos_falha[alvo]
+
+    @property
+    def tentativas(self):
+        return len(self.eventos)
+
+    @property
+    def taxa_falha(self):
+        return self.falhas / len(self.eventos) if self.eventos else 0.0
+
+    @property
+    def por_minuto(self):
+        return 60.0 * len(self.eventos) / self.duracao
+
+    @property
+    def alvos_distintos(self):
+        return len(self.alvos_falha)
+
+
+class JanelasLogin:
+    """
+    Janelas deslizantes por IP e por usuário, alimentadas evento a evento.
+
+    As chaves ficam em ordem de último evento; chaves sem eventos na maior
+    janela saem do começo dessa ordem, então a memória acompanha só os IPs e
+    usuários ativos. O relógio é o maior timestamp já visto (eventos um pouco
+    atrasados entram na janela atual).
+
+    Args:
+        janelas (tuple[float]): Durações das janelas em segundos
+    """
+
+    def __init__(self, janelas=JANELAS_PADRAO):
+        self.janelas = tuple(sorted(janelas))
+        self.por_ip = OrderedDict()
+        self.por_usuario = OrderedDict()
+        self.agora = float('-inf')
+
+    def _janelas_da_chave(self, tabela, chave):
+        janelas = tabela.get(chave)
+        if janelas is None:
+            janelas = tabela[chave] = [Janela(duracao) for duracao in self.janelas]
+        else:
+            tabela.move_to_end(chave)
+        return janelas
+
+    def registrar(self, momento, ip, usuario, sucesso):
+        """
+        Inclui uma tentativa de login e atualiza as janelas do IP e do usuário.
+
+        Returns:
+            tuple[list[Janela], list[Janela]]: Janelas do IP e do usuário
+        """
+        self.agora = max(self.agora, momento)
+        falha = not sucesso
+        janelas_ip = self._janelas_da_chave(self.por_ip, ip)
+        janelas_usuario = self._janelas_da_chave(self.por_usuario, usuario)
+        for janela in janelas_ip:
+            janela.adicionar(momento, falha, usuario)
+            janela.expirar(self.agora)
+        for janela in janelas_usuario:
+            janela.adicionar(momento, falha, ip)
+            janela.expirar(self.agora)
+        self._remover_inativas()
+        return janelas_ip, janelas_usuario
+
+    def _remover_inativas(self):
+        limite = self.agora - self.janelas[-1]
+        for tabela in (self.por_ip, self.por_usuario):
+            while tabela:
+                maior = next(iter(tabela.values()))[-1]
+                if maior.eventos and maior.eventos[-1][0] > limite:
+                    break
+                tabela.popitem(last=False)
+
+
+@dataclass(frozen=True)
+class Regra:
+    """
+    Limite sobre uma métrica de janela.
+
+    Attributes:
+        nome (str): Identificação do alerta
+        chave (str): 'ip' ou 'usuario'
+        janela (float): Duração da janela avaliada, em segundos
+        metrica (str): Atributo da Janela (tentativas, falhas, taxa_falha,
+            por_minuto, alvos_distintos)
+        limite (float): Valor a partir do qual a regra dispara
+        minimo_falhas (int): Falhas mínimas na janela para a regra valer
+    """
+    nome: str
+    chave: str
+    janela: float
+    metrica: str
+    limite: float
+    minimo_falhas: int = 0
+
+
+# Calibradas no gerador: o tráfego normal tem ~1 tentativa por IP a cada
+# hora e 90% de sucesso; ataques rápidos fazem ~2 tentativas/s e os lentos
+# uma a cada 5-20 s, sempre contra várias contas privilegiadas
+REGRAS_PADRAO = (
+    Regra('rajada', 'ip', 60, 'tentativas', 20),
+    Regra('falhas_repetidas', 'ip', 300, 'taxa_falha', 0.8, minimo_falhas=10),
+    Regra('enumeracao_usuarios', 'ip', 3600, 'alvos_distintos', 4, minimo_falhas=5),
+    Regra('ataque_distribuido', 'usuario', 300, 'alvos_distintos', 5, minimo_falhas=5),
+)
+
+# Falhas do IP na maior janela para o modelo ser consultado
+MINIMO_FALHAS_MODELO = 3
+
+
+def features_ip(janelas_ip):
+    """
+    Vetor de features de um IP para o modelo: tentativas por minuto, taxa de
+    falha e usuários distintos com falha, em cada janela.
+    """
+    valores = []
+    for janela in janelas_ip:
+        valores += [janela.por_minuto, janela.taxa_falha, janela.alvos_distintos]
+    return np.array(valores, dtype=np.float64)
+
+
+def nomes_features_ip(janelas):
+    nomes = []
+    for duracao in janelas:
+        nomes += [f'por_minuto_{duracao:g}s', f'taxa_falha_{duracao:g}s', f'usuarios_falha_{duracao:g}s']
+    return nomes
+
+
+class DetectorTempoReal:
+    """
+    Avalia as regras (e, opcionalmente, o score do modelo) a cada tentativa
+    de login, logo depois de atualizar as janelas do IP e do usuário.
+
+    Um alerta de uma regra para uma chave se repete no máximo uma vez por
+    duração da janela da regra, enquanto a condição continuar.
+
+    O modelo só é consultado em falhas de IPs com pelo menos
+    `minimo_falhas_modelo` falhas na maior janela: uma falha isolada (senha
+    digitada errado) é rara, mas não é ataque.
+
+    Args:
+        janelas (tuple[float]): Durações das janelas em segundos
+        regras (tuple[Regra]): Regras avaliadas
+        modelo (dict): Pacote de `treinar_modelo_janelas` (opcional)
+        minimo_falhas_modelo (int): Falhas do IP na maior janela para consultar o modelo
+    """
+
+    def __init__(self, janelas=JANELAS_PADRAO, regras=REGRAS_PADRAO, modelo=None,
+                 minimo_falhas_modelo=MINIMO_FALHAS_MODELO):
+        self.estado = JanelasLogin(janelas)
+        self.regras = [regra for regra in regras if regra.janela in self.estado.janelas]
+        self.indice = {duracao: i for i, duracao in enumerate(self.estado.janelas)}
+        self.modelo = modelo
+        self.minimo_falhas_modelo = minimo_falhas_modelo
+        if modelo is not None:
+            # Normalização feita aqui: o StandardScaler.transform custa mais
+            # que a floresta compacta para uma linha só
+            self.media = modelo['scaler'].mean_
+            self.escala = modelo['scaler'].scale_
+        self.ultimo_alerta = {}
+
+    def _pode_alertar(self, nome, chave, momento, intervalo):
+        ultimo = self.ultimo_alerta.get((nome, chave))
+        if ultimo is not None and momento - ultimo < intervalo:
+            return False
+        self.ultimo_alerta[(nome, chave)] = momento
+        return True
+
+    def processar(self, momento, ip, usuario, sucesso):
+        """
+        Registra a tentativa e devolve os alertas disparados por ela.
+
+        Returns:
+            list[dict]: Alertas (regra, chave, valor, limite, janela)
+        """
+        janelas_ip, janelas_usuario = self.estado.registrar(momento, ip, usuario, sucesso)
+        por_chave = {'ip': (ip, janelas_ip), 'usuario': (usuario, janelas_usuario)}
+
+        alertas = []
+        for regra in self.regras:
+            chave, janelas = por_chave[regra.chave]
+            janela = janelas[self.indice[regra.janela]]
+            if janela.falhas < regra.minimo_falhas:
+                continue
+            valor = getattr(janela, regra.metrica)
+            if valor >= regra.limite and self._pode_alertar(regra.nome, chave, momento, regra.janela):
+                alertas.append({'regra': regra.nome, 'chave': regra.chave, 'valor_chave': chave,
+                                'metrica': regra.metrica, 'valor': valor, 'limite': regra.limite,
+                                'janela': regra.janela})
+
+        if self.modelo is not None and not sucesso and janelas_ip[-1].falhas >= self.minimo_falhas_modelo:
+            x = (features_ip(janelas_ip) - self.media) / self.escala
+            score = float(self.modelo['floresta'].score_samples(x)[0])
+            intervalo = self.estado.janelas[len(self.estado.janelas) // 2]
+            if score < self.modelo['limiar'] and self._pode_alertar('modelo', ip, momento, intervalo):
+                alertas.append({'regra': 'modelo', 'chave': 'ip', 'valor_chave': ip,
+                                'metrica': 'score', 'valor': score, 'limite': self.modelo['limiar'],
+                                'janela': intervalo})
+        return alertas
+
+
+def treinar_modelo_janelas(eventos, janelas=JANELAS_PADRAO, contaminacao=0.02, semente=42):
+    """
+    Treina um Isolation Forest nas features de janela por IP, reproduzindo
+    os eventos (timestamp, ip, usuario, sucesso) na ordem, como no streaming.
+
+    Os eventos devem ser de um período de referência, com tráfego normal:
+    num dataset dominado por ataques, o comportamento do ataque vira o
+    "normal" do modelo.
+
+    Returns:
+        dict: Pacote com janelas, features, scaler, modelo, floresta compacta e limiar
+    """
+    estado = JanelasLogin(janelas)
+    # Segundos desde 1970 com unidade explícita: o datetime64 pode vir em ns ou
+    # µs (pandas 3), e o streaming usa pd.Timestamp(...).timestamp()
+    momentos = ((eventos['timestamp'] - pd.Timestamp(0)) / pd.Timedelta(seconds=1)).to_numpy()
+    X = np.empty((len(eventos), 3 * len(estado.janelas)))
+    for i, (momento, ip, usuario, sucesso) in enumerate(zip(momentos, eventos['ip'], eventos['usuario'],
+                                                            eventos['sucesso'])):
+        janelas_ip, _ = estado.registrar(momento, ip, usuario, sucesso)
+        X[i] = features_ip(janelas_ip)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    modelo = IsolationForest(contamination=contaminacao, random_state=semente, n_estimators=100)
+    modelo.fit(X_scaled)
+    return {
+        'janelas': list(estado.janelas),
+        'features': nomes_features_ip(estado.janelas),
+        'scaler': scaler,
+        'modelo': modelo,
+        'floresta': compactar_floresta(modelo),
+        'limiar': float(modelo.offset_),
+        'registros_treino': len(eventos),
+    }
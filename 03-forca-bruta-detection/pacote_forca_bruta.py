@@ -0,0 +1,116 @@
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from comum.floresta_compacta import LOTE_MAXIMO_COMPACTO, pontuar_floresta
+from comum.pacote_modelo import carregar_pacote, salvar_pacote
+
+CAMINHO_PACOTE = 'modelos/pacote_forca_bruta.joblib'
+
+ESQUEMA_PACOTE = 'forca_bruta'
+# IsolationForest do sklearn, em arquivo à parte: só lido para lotes grandes
+ESQUEMA_FLORESTA_SKLEARN = 'forca_bruta_sklearn'
+# Muda quando o conteúdo do pacote muda (pacotes antigos são recusados)
+VERSAO_PACOTE = 2
+
+
+def montar_pacote(scaler, floresta, codificador, features, contaminacao, registros_treino):
+    """
+    Tudo o que a pontuação precisa, na ordem em que o modelo espera as features.
+
+    Só arrays NumPy (normalização e floresta compacta) e os codificadores: o
+    IsolationForest e o StandardScaler do sklearn não entram, porque suas
+    árvores são copiadas ao serem lidas. Os arrays são mapeados com mmap na
+    leitura, sem cópia.
+    """
+    return {
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'features': list(features),
+        # Normalização do StandardScaler do treino
+        'media': np.ascontiguousarray(scaler.mean_, dtype=np.float64),
+        'escala': np.ascontiguousarray(scaler.scale_, dtype=np.float64),
+        'floresta': floresta,
+        'codificador': codificador,
+        'limiar': floresta.offset,
+        'contaminacao': contaminacao,
+        'registros_treino': registros_treino,
+    }
+
+
+def caminho_floresta_sklearn(caminho=CAMINHO_PACOTE):
+    """
+    Arquivo do IsolationForest do sklearn ao lado do pacote
+    (pacote_forca_bruta.joblib -> pacote_forca_bruta.sklearn.joblib).
+    """
+    raiz, extensao = os.path.splitext(caminho)
+    return f"{raiz}.sklearn{extensao}"
+
+
+def salvar_pacote_forca_bruta(pacote, caminho=CAMINHO_PACOTE, modelo=None):
+    """
+    Salva o pacote e, com `modelo`, o IsolationForest do sklearn ao lado dele
+    (usado só para pontuar lotes acima de LOTE_MAXIMO_COMPACTO).
+    """
+    if modelo is not None:
+        salvar_pacote({'modelo': modelo}, caminho_floresta_sklearn(caminho),
+                      ESQUEMA_FLORESTA_SKLEARN, VERSAO_PACOTE)
+    return salvar_pacote(pacote, caminho, ESQUEMA_PACOTE, VERSAO_PACOTE)
+
+
+def carregar_pacote_forca_bruta(caminho=CAMINHO_PACOTE, mmap=True, verificar=False):
+    """
+    Lê o pacote conferindo esquema, versão e tamanho; o checksum com
+    `verificar` ou se o arquivo mudou de mtime (ver comum.pacote_modelo).
+
+    Raises:
+        ValueError: Se o pacote for de outra versão ou estiver corrompido
+    """
+    return carregar_pacote(caminho, ESQUEMA_PACOTE, VERSAO_PACOTE, mmap=mmap, verificar=verificar)
+
+
+def carregar_floresta_sklearn(caminho=CAMINHO_PACOTE):
+    """
+    IsolationForest do sklearn salvo ao lado do pacote, ou None se não houver
+    (a pontuação usa então só a forma compacta). Importa o sklearn: ler só
+    quando houver lotes grandes para pontuar.
+    """
+    caminho = caminho_floresta_sklearn(caminho)
+    if not os.path.exists(caminho):
+        return None
+    return carregar_pacote(caminho, ESQUEMA_FLORESTA_SKLEARN, VERSAO_PACOTE, mmap=False)['modelo']
+
+
+def pontuar_eventos(pacote, eventos, modelo=None):
+    """
+    Predição e score de eventos com os codificadores e a ordem de features do
+    treino (sem reajuste: valores novos recebem o código -1).
+
+    Lotes de até LOTE_MAXIMO_COMPACTO eventos são pontuados pela floresta
+    compacta; acima disso, pelo sklearn quando `modelo` é passado (mesmo
+    critério de comum.floresta_compacta.pontuar_floresta).
+
+    Args:
+        pacote (dict): Pacote de `montar_pacote`
+        eventos (pd.DataFrame): Eventos com timestamp, ip, usuario, localizacao,
+            tentativas_intervalo, origem_confiavel e sucesso
+        modelo (IsolationForest): De `carregar_floresta_sklearn` (opcional)
+
+    Returns:
+        tuple: (predições -1/1, scores)
+    """
+    momentos = pd.to_datetime(eventos['timestamp'])
+    colunas = pacote['codificador'].transformar(eventos)
+    colunas['hora'] = momentos.dt.hour
+    colunas['dia_semana'] = momentos.dt.dayofweek
+    for feature in pacote['features']:
+        if feature not in colunas.columns:
+            colunas[feature] = eventos[feature]
+    X = colunas[pacote['features']].to_numpy(dtype=np.float64)
+    X = (X - pacote['media']) / pacote['escala']
+    if modelo is not None and len(X) > LOTE_MAXIMO_COMPACTO:
+        return pontuar_floresta(modelo, X, pacote['floresta'])
+    return pacote['floresta'].pontuar(X)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+# Faixas de tentativas/intervalo usadas para comparar o ritmo dos ataques
+LIMITES_TAXA = [0, 5, 20, 50, np.inf]
+FAIXAS_TAXA = ['baixa', 'moderada', 'alta', 'rajada']
+
+# Contas padrão/privilegiadas, alvo típico de dicionários de força bruta
+CONTAS_PADRAO = {'root', 'admin', 'administrator', 'user', 'guest', 'test', 'ubuntu', 'oracle', 'postgres'}
+
+# Faixas de usuários distintos tentados por IP (1 = força bruta dirigida; muitos = spraying)
+LIMITES_USUARIOS = [1, 2, 10, np.inf]
+FAIXAS_USUARIOS = ['um usuário', '2 a 9 usuários', '10 ou mais usuários']
+
+# IPs listados por grupo no prompt (o restante entra só na contagem)
+MAX_IPS_POR_GRUPO = 10
+
+# Usuários mais visados listados por grupo no prompt
+MAX_USUARIOS_POR_GRUPO = 5
+
+
+def resumir_alertas(indice):
+    """
+    Um alerta por IP com eventos anômalos, com o perfil usado no agrupamento.
+
+    Args:
+        indice (IndiceIPs): Índice por IP dos eventos anômalos
+
+    Returns:
+        pd.DataFrame: Indexado por IP, do IP com mais eventos anômalos para o com menos
+    """
+    anomalos = indice.resumo[indice.resumo['anomalias'] > 0]
+    resumo = pd.DataFrame({
+        'eventos': anomalos['anomalias'],
+        'localizacao': anomalos['localizacao_ataque'],
+        'media_tentativas': anomalos['media_tentativas_anomalas'],
+        'origem_confiavel': anomalos['origem_confiavel_anomala'],
+        'sucessos': anomalos['sucessos_anomalos'],
+    })
+
+    pares = indice.pares_usuarios()
+    por_ip = pares.groupby('ip', sort=False)['usuario']
+    resumo['usuarios_alvo'] = por_ip.agg(', '.join)
+    distintos = por_ip.size().reindex(resumo.index)
+    padrao = pares['usuario'].isin(CONTAS_PADRAO).groupby(pares['ip'], sort=False).sum().reindex(resumo.index)
+
+    # Perfil grosso dos usuários alvo (classe das contas e quantidade), e não o
+    # conjunto exato: IPs que diferem em uma conta caem no mesmo grupo
+    resumo['classe_usuarios'] = np.select(
+        [padrao == distintos, padrao == 0], ['contas padrão', 'contas nominais'], default='mistas',
+    )
+    resumo['faixa_usuarios'] = pd.cut(distintos, LIMITES_USUARIOS, right=False,
+                                      labels=FAIXAS_USUARIOS).astype(str)
+    resumo['classe_localizacao'] = np.select(
+        [resumo['origem_confiavel'] == 1, resumo['origem_confiavel'] == 0],
+        ['confiável', 'suspeita'], default='mista',
+    )
+    resumo['faixa_taxa'] = pd.cut(resumo['media_tentativas'], LIMITES_TAXA,
+                                  right=False, labels=FAIXAS_TAXA).astype(str)
+    return resumo.sort_values('eventos', ascending=False)
+
+
+def agrupar_alertas(resumo):
+    """
+    Agrupa alertas parecidos: mesma classe e faixa de usuários alvo, mesma
+    classe de localização e mesma faixa de taxa de tentativas.
+
+    Returns:
+        pd.DataFrame: `resumo` com a coluna 'grupo' (1 = grupo do IP com mais eventos)
+    """
+    resumo = resumo.copy()
+    resumo['grupo'] = resumo.groupby(['classe_usuarios', 'faixa_usuarios', 'classe_localizacao', 'faixa_taxa'],
+                                     sort=False).ngroup() + 1
+    return resumo
+
+
+def usuarios_mais_visados(membros):
+    """
+    Usuários tentados pelo maior número de IPs do grupo.
+    """
+    usuarios = membros['usuarios_alvo'].str.split(', ').explode().value_counts()
+    return ', '.join(f"{usuario} ({ips} IPs)" for usuario, ips in usuarios.head(MAX_USUARIOS_POR_GRUPO).items())
+
+
+def descrever_grupo(membros):
+    """
+    Texto enviado ao LLM com o perfil comum do grupo e seus IPs.
+    """
+    primeiro = membros.iloc[0]
+    localizacoes = membros['localizacao'].value_counts()
+    texto = f"""PERFIL DO GRUPO:
+   • IPs no grupo: {len(membros)}
+   • Eventos anômalos: {membros['eventos'].sum()}
+   • Usuários alvo: {primeiro['classe_usuarios']}, {primeiro['faixa_usuarios']} por IP
+   • Mais visados: {usuarios_mais_visados(membros)}
+   • Origem: {primeiro['classe_localizacao']} ({', '.join(f'{l}: {n}' for l, n in localizacoes.items())})
+   • Taxa de tentativas: {primeiro['faixa_taxa']} (média {membros['media_tentativas'].min():.1f} a {membros['media_tentativas'].max():.1f} por intervalo)
+   • Logins com sucesso: {int(membros['sucessos'].sum())}
+
+IPS:
+"""
+    for ip, linha in membros.head(MAX_IPS_POR_GRUPO).iterrows():
+        texto += f"   • {ip} | {linha['eventos']} eventos | {linha['localizacao']}\n"
+    if len(membros) > MAX_IPS_POR_GRUPO:
+        texto += f"   • ... e mais {len(membros) - MAX_IPS_POR_GRUPO} IPs com o mesmo perfil\n"
+    return texto
+
+
+def triar_alertas(indice, explicar, paralelismo=4, forcar_atualizacao=False):
+    """
+    Agrupa os alertas, gera uma explicação por grupo e a replica para cada
+    alerta do grupo.
+
+    Args:
+        indice (IndiceIPs): Índice por IP dos eventos anômalos
+        explicar (Callable): Recebe a lista de descrições de grupos e devolve
+            uma explicação por grupo (ex.: explicar_grupos_com_llm)
+        paralelismo (int): Chamadas simultâneas ao LLM
+        forcar_atualizacao (bool): Ignora o cache de análises
+
+    Returns:
+        tuple[pd.DataFrame, dict]: Alertas com 'grupo' e 'explicacao', e as
+        explicações por grupo
+    """
+    alertas = agrupar_alertas(resumir_alertas(indice))
+    grupos = [membros for _, membros in alertas.groupby('grupo')]
+    respostas = explicar([descrever_grupo(membros) for membros in grupos],
+                         paralelismo=paralelismo, forcar_atualizacao=forcar_atualizacao)
+    explicacoes = dict(zip(sorted(alertas['grupo'].unique()), respostas))
+    alertas['explicacao'] = alertas['grupo'].map(explicacoes)
+    return alertas, explicacoes
+
+
+def salvar_triagem(alertas, explicacoes, caminho_txt, caminho_csv):
+    """
+    Grava a triagem em texto (um bloco por grupo) e em CSV (uma linha por alerta).
+    """
+    with open(caminho_txt, 'w', encoding='utf-8') as f:
+        f.write("🧩 TRIAGEM DE ALERTAS POR GRUPO\n")
+        f.write(f"Alertas: {len(alertas)} | Grupos: {len(explicacoes)}\n")
+        f.write("=" * 70 + "\n")
+        for grupo, membros in alertas.groupby('grupo'):
+            primeiro = membros.iloc[0]
+            f.write(f"\nGRUPO {grupo} — {len(membros)} IP(s) | origem {primeiro['classe_localizacao']} | "
+                    f"taxa {primeiro['faixa_taxa']}\n")
+            f.write(f"Usuários alvo: {primeiro['classe_usuarios']}, {primeiro['faixa_usuarios']} por IP | "
+                    f"mais visados: {usuarios_mais_visados(membros)}\n")
+            f.write(f"IPs: {', '.join(membros.index)}\n")
+            f.write("-" * 70 + "\n")
+            f.write(explicacoes[grupo].strip() + "\n")
+            f.write("=" * 70 + "\n")
+
+    colunas = ['grupo', 'eventos', 'localizacao', 'classe_localizacao', 'faixa_taxa',
+               'media_tentativas', 'classe_usuarios', 'faixa_usuarios', 'usuarios_alvo', 'explicacao']
+    alertas[colunas].round({'media_tentativas': 2}).to_csv(caminho_csv, index_label='ip')
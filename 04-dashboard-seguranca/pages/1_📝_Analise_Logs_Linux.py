@@ -5,8 +5,16 @@ import plotly.express as px
 from datetime import datetime
 import warnings
 import os
+import sys
 warnings.filterwarnings('ignore')
 
+# Reutiliza o parser em streaming do Projeto 01
+RAIZ_PORTFOLIO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, RAIZ_PORTFOLIO)
+sys.path.insert(0, os.path.join(RAIZ_PORTFOLIO, "01-analise-logs-linux"))
+from parser_logs import carregar_dataframe
+from comum.sketches import DistintosPorPeriodo
+
 # ========== CONFIGURAÇÃO DA PÁGINA ==========
 st.set_page_config(
     page_title="Análise de Logs Linux",
@@ -43,12 +51,21 @@ def carregar_dados():
     """Carrega o dataset de logs com caminho dinâmico."""
     try:
         raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        caminho_log = os.path.join(raiz, "dados", "auth.log")
         caminho_csv = os.path.join(raiz, "dados", "relatorio_completo.csv")
 
-        df = pd.read_csv(caminho_csv)
-
-        if 'data' in df.columns and 'hora' in df.columns:
-            # Converter data no formato "Jan 15" e hora "08:23:45"
+        # Log bruto tem prioridade: é lido direto pelo parser, sem CSV intermediário
+        if os.path.exists(caminho_log):
+            df = carregar_dataframe(caminho_log)
+        else:
+            df = pd.read_csv(caminho_csv)
+
+        if 'timestamp' in df.columns:
+            # Timestamp int64 (com ano inferido) já calculado pelo parser
+            ts = pd.to_numeric(df['timestamp'], errors='coerce')
+            df['timestamp'] = pd.to_datetime(ts.where(ts >= 0), unit='s')
+        elif 'data' in df.columns and 'hora' in df.columns:
+            # CSV antigo, sem timestamp: converter data "Jan 15" e hora "08:23:45"
             try:
                 df['timestamp'] = pd.to_datetime(
                     df['data'] + ' ' + df['hora'],
@@ -66,6 +83,17 @@ def carregar_dados():
         st.error(f"Erro ao carregar dados: {str(e)}")
         return None
 
+@st.cache_resource
+def carregar_sketches(_df_valido):
+    """
+    Sketches de IPs/usuários distintos por dia, montados uma vez por sessão de
+    cache: as métricas do período unem os sketches diários em vez de percorrer
+    os eventos a cada execução da página.
+    """
+    distintos = DistintosPorPeriodo(['ip', 'usuario'])
+    distintos.atualizar(_df_valido, _df_valido['timestamp'].dt.strftime('%Y-%m-%d'))
+    return distintos
+
 # Carregar dados
 df = carregar_dados()
 
@@ -77,6 +105,7 @@ if df is not None:
     if len(df_valido) == 0:
         st.error("❌ Nenhuma data válida encontrada no dataset.")
         st.stop()
+    distintos = carregar_sketches(df_valido)
 
     # ========== SIDEBAR - FILTROS ==========
     st.sidebar.title("🔧 Filtros")
@@ -136,8 +165,9 @@ if df is not None:
     col1, col2, col3, col4 = st.columns(4)
 
     total_eventos = len(df_filtrado)
-    ips_unicos_filtrado = df_filtrado['ip'].nunique()
-    usuarios_unicos_filtrado = df_filtrado['usuario'].nunique()
+    # Distintos no período (todos os IPs/usuários), pela união dos sketches diários
+    ips_unicos_periodo = distintos.estimar('ip', data_inicio.isoformat(), data_fim.isoformat())
+    usuarios_unicos_periodo = distintos.estimar('usuario', data_inicio.isoformat(), data_fim.isoformat())
     status_sucesso = (df_filtrado['status'] == 'SUCESSO').sum() if 'status' in df_filtrado.columns else 0
 
     with col1:
@@ -150,15 +180,15 @@ if df is not None:
     with col2:
         st.metric(
             label="🌐 IPs Únicos",
-            value=f"{ips_unicos_filtrado}",
-            delta="origem dos logs"
+            value=f"{ips_unicos_periodo}",
+            delta=f"{len(ip_selecionado)} selecionados"
         )
 
     with col3:
         st.metric(
             label="👤 Usuários Únicos",
-            value=f"{usuarios_unicos_filtrado}",
-            delta="contas ativas"
+            value=f"{usuarios_unicos_periodo}",
+            delta=f"{len(usuario_selecionado)} selecionados"
         )
 
     with col4:
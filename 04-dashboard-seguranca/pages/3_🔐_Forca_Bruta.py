@@ -2,12 +2,21 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-import joblib
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
+import os
+import sys
 warnings.filterwarnings('ignore')
 
+# Sketches de distintos compartilhados pelos projetos do portfólio
+RAIZ_PORTFOLIO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, RAIZ_PORTFOLIO)
+from comum.sketches import DistintosPorPeriodo, carregar_distintos
+sys.path.insert(0, os.path.join(RAIZ_PORTFOLIO, "03-forca-bruta-detection"))
+from comum.floresta_compacta import LOTE_MAXIMO_COMPACTO
+from pacote_forca_bruta import carregar_floresta_sklearn, carregar_pacote_forca_bruta, pontuar_eventos
+
 # ========== CONFIGURAÇÃO DA PÁGINA ==========
 st.set_page_config(
     page_title="Dashboard de Segurança",
@@ -24,37 +33,68 @@ def carregar_dados():
     df['timestamp'] = pd.to_datetime(df['timestamp'])
     return df
 
-@st.cache_data
+@st.cache_resource
+def carregar_sketches(_df):
+    """
+    Sketches de IPs/usuários distintos por dia salvos ao lado do dataset.
+    cache_resource devolve o próprio objeto (sem cópia), e o prefixo "_" evita
+    que o Streamlit calcule o hash do DataFrame a cada execução da página.
+    """
+    distintos = carregar_distintos('dados/logins_gerados.csv')
+    if distintos is None:
+        # Dataset sem sketches (ou alterado depois deles): monta uma vez por sessão de cache
+        distintos = DistintosPorPeriodo(['ip', 'usuario', 'localizacao'])
+        distintos.atualizar(_df, _df['timestamp'].dt.strftime('%Y-%m-%d'))
+    return distintos
+
+@st.cache_resource
+def sketches_ataques(_df):
+    """Sketches por dia dos IPs com eventos anômalos, montados uma vez por sessão de cache"""
+    ataques = _df[_df['eh_ataque']]
+    distintos = DistintosPorPeriodo(['ip'])
+    distintos.atualizar(ataques, ataques['timestamp'].dt.strftime('%Y-%m-%d'))
+    return distintos
+
+@st.cache_resource
 def carregar_modelo():
-    """Carrega o modelo treinado"""
-    modelo = joblib.load('dados/modelo_deteccao.pkl')
-    scaler = joblib.load('dados/scaler.pkl')
-    return modelo, scaler
+    """
+    Carrega o pacote do modelo (floresta compacta, média/escala da
+    normalização, codificadores e ordem das features). cache_resource guarda
+    o próprio objeto, sem copiá-lo a cada execução da página; os arrays do
+    pacote ficam mapeados (mmap) e são compartilhados entre os processos que
+    abrem o mesmo arquivo.
+    """
+    return carregar_pacote_forca_bruta('dados/pacote_forca_bruta.joblib')
+
+@st.cache_resource
+def carregar_modelo_sklearn():
+    """
+    IsolationForest do sklearn salvo ao lado do pacote (opcional): pontua o
+    dataset inteiro mais rápido que a forma compacta. Só é lido (com o
+    sklearn) quando o dataset passa de LOTE_MAXIMO_COMPACTO eventos.
+    """
+    return carregar_floresta_sklearn('dados/pacote_forca_bruta.joblib')
 
 # Carregar dados
 df = carregar_dados()
-modelo, scaler = carregar_modelo()
+distintos = carregar_sketches(df)
+if not os.path.exists('dados/pacote_forca_bruta.joblib'):
+    st.error("❌ Pacote do modelo não encontrado. Execute detector_forca_bruta.py para gerá-lo.")
+    st.stop()
+pacote = carregar_modelo()
 
 # ========== PROCESSAMENTO DE DADOS ==========
 df['hora'] = df['timestamp'].dt.hour
 df['dia_semana'] = df['timestamp'].dt.dayofweek
-df['ip_encoded'] = pd.factorize(df['ip'])[0]
-df['usuario_encoded'] = pd.factorize(df['usuario'])[0]
-df['localizacao_encoded'] = pd.factorize(df['localizacao'])[0]
-
-features = ['tentativas_intervalo', 'origem_confiavel', 'sucesso', 
-            'hora', 'dia_semana', 'ip_encoded', 'usuario_encoded', 
-            'localizacao_encoded']
-
-X = df[features].copy()
-X_scaled = scaler.transform(X)
 
-# Fazer predições
-predicoes = modelo.predict(X_scaled)
-scores = modelo.score_samples(X_scaled)
+# Fazer predições com os códigos e a ordem de features do treino (IPs,
+# usuários e localizações novos = -1); predição e score na mesma passada
+modelo_sklearn = carregar_modelo_sklearn() if len(df) > LOTE_MAXIMO_COMPACTO else None
+predicoes, scores = pontuar_eventos(pacote, df, modelo_sklearn)
 df['anomalia'] = predicoes
 df['anomalia_score'] = scores
 df['eh_ataque'] = df['anomalia'] == -1
+distintos_ataques = sketches_ataques(df)
 
 # ========== ESTILO CSS CUSTOMIZADO ==========
 st.markdown("""
@@ -121,7 +161,8 @@ col1, col2, col3, col4 = st.columns(4)
 total_eventos = len(df_filtrado)
 total_ataques = (df_filtrado['eh_ataque']).sum()
 taxa_ataque = (total_ataques / total_eventos * 100) if total_eventos > 0 else 0
-ips_unicos = df_filtrado['ip'].nunique()
+# União dos sketches diários do período, sem percorrer os eventos
+ips_unicos = distintos.estimar('ip', data_inicio.isoformat(), data_fim.isoformat())
 
 with col1:
     st.metric(
@@ -146,7 +187,7 @@ with col3:
     )
 
 with col4:
-    ips_suspeitos = df_filtrado[df_filtrado['eh_ataque']]['ip'].nunique()
+    ips_suspeitos = distintos_ataques.estimar('ip', data_inicio.isoformat(), data_fim.isoformat())
     st.metric(
         label="⚠️ IPs Suspeitos",
         value=f"{ips_suspeitos}",
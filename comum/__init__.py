@@ -0,0 +1,2 @@
+# comum/__init__.py
+# Pacote com estruturas reutilizadas pelos projetos do portfólio.
@@ -0,0 +1,209 @@
+# comum/analise_em_partes.py
+# Análise de relatórios grandes pelo LLM em partes (map-reduce concorrente).
+
+import asyncio
+import math
+import re
+import time
+from typing import Callable, List, Optional
+
+from comum.cache_llm import gerar_com_cache
+
+# Estimativa grosseira usada para o orçamento: ~4 caracteres por token
+CARACTERES_POR_TOKEN = 4
+
+PARALELISMO_PADRAO = 4
+
+# Linha só de separadores (====, ════, ----, ╔═══╗...)
+PADRAO_SEPARADOR = re.compile(r"^\s*[=═─\-#*╔╗╚╝]{10,}\s*$")
+
+# Etapa "map": cada parte vira uma lista curta de achados
+PROMPT_PARTE = """
+Você é um analista de segurança. O texto abaixo é uma parte de um relatório
+maior, que está sendo analisado por partes. Extraia desta parte, em tópicos curtos:
+
+- Fatos e números relevantes (contagens, IPs, usuários, horários)
+- Sinais de ataque ou de comportamento anômalo
+- Pontos que merecem atenção na análise final
+
+Não faça recomendações; elas serão feitas na consolidação.
+
+Trecho:
+{texto_relatorio}
+"""
+
+
+def estimar_tokens(texto: str) -> int:
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def dividir_secoes(texto: str) -> List[str]:
+    """
+    Divide o relatório nas seções delimitadas por cabeçalhos no formato
+    separador / título / separador.
+
+    Returns:
+        list[str]: Seções na ordem original (o texto antes do primeiro cabeçalho é uma seção)
+    """
+    linhas = texto.splitlines()
+    inicios = [0]
+    for i in range(1, len(linhas) - 2):
+        if PADRAO_SEPARADOR.match(linhas[i]) and PADRAO_SEPARADOR.match(linhas[i + 2]) \
+                and not PADRAO_SEPARADOR.match(linhas[i + 1]):
+            inicios.append(i)
+    inicios.append(len(linhas))
+    secoes = ["\n".join(linhas[a:b]) for a, b in zip(inicios, inicios[1:])]
+    return [secao for secao in secoes if secao.strip()]
+
+
+def _quebrar_secao(secao: str, limite: int) -> List[str]:
+    """
+    Quebra por linhas uma seção maior que `limite` caracteres, repetindo o
+    cabeçalho em cada pedaço para o modelo saber de onde o trecho veio.
+    """
+    linhas = secao.splitlines()
+    cabecalho = linhas[:3] if len(linhas) > 3 and PADRAO_SEPARADOR.match(linhas[0]) else []
+    prefixo = "\n".join(cabecalho + ["(continuação)"]) + "\n" if cabecalho else ""
+    corpo = linhas[len(cabecalho):]
+    espaco = max(limite - len(prefixo), 1)
+
+    pedacos, atual, tamanho = [], [], 0
+    for linha in corpo:
+        # Linhas maiores que o espaço disponível são cortadas em pedaços fixos
+        partes = [linha[i:i + espaco] for i in range(0, len(linha), espaco)] or [""]
+        for parte in partes:
+            if atual and tamanho + len(parte) + 1 > espaco:
+                pedacos.append("\n".join(atual))
+                atual, tamanho = [], 0
+            atual.append(parte)
+            tamanho += len(parte) + 1
+    if atual:
+        pedacos.append("\n".join(atual))
+
+    if not pedacos:
+        return [secao]
+    return ["\n".join(cabecalho) + "\n" + pedacos[0] if cabecalho else pedacos[0]] + \
+           [prefixo + pedaco for pedaco in pedacos[1:]]
+
+
+def dividir_relatorio(texto: str, orcamento_tokens: int) -> List[str]:
+    """
+    Agrupa as seções do relatório em partes de até `orcamento_tokens` tokens
+    (estimados), sem separar uma seção entre partes quando ela cabe inteira.
+
+    Args:
+        texto (str): Relatório completo
+        orcamento_tokens (int): Tamanho máximo de cada parte
+
+    Returns:
+        list[str]: Partes, na ordem do relatório
+    """
+    limite = max(orcamento_tokens, 1) * CARACTERES_POR_TOKEN
+    partes, atual = [], ""
+    for secao in dividir_secoes(texto):
+        for pedaco in ([secao] if len(secao) <= limite else _quebrar_secao(secao, limite)):
+            if atual and len(atual) + len(pedaco) + 2 > limite:
+                partes.append(atual)
+                atual = ""
+            atual = f"{atual}\n\n{pedaco}" if atual else pedaco
+    if atual:
+        partes.append(atual)
+    return partes
+
+
+async def _gerar_concorrente(template: str, textos: List[str], paralelismo: int, forcar_atualizacao: bool,
+                            aviso: str, rotulo: str) -> List[Optional[str]]:
+    """
+    Envia os textos ao LLM ao mesmo tempo, no máximo `paralelismo` em
+    andamento. As chamadas são bloqueantes (cliente HTTP compartilhado),
+    então cada uma roda em uma thread.
+    """
+    semaforo = asyncio.Semaphore(max(paralelismo, 1))
+    total = len(textos)
+
+    async def gerar(indice: int, texto: str) -> Optional[str]:
+        async with semaforo:
+            inicio = time.perf_counter()
+            resposta = await asyncio.to_thread(gerar_com_cache, template, texto, None, forcar_atualizacao, aviso)
+            situacao = "ok" if resposta else "falhou"
+            print(f"   {rotulo} {indice}/{total}: {situacao} em {time.perf_counter() - inicio:.1f}s")
+            return resposta
+
+    return await asyncio.gather(*(gerar(i, texto) for i, texto in enumerate(textos, 1)))
+
+
+def gerar_em_paralelo(template: str, textos: List[str], paralelismo: int = PARALELISMO_PADRAO,
+                      forcar_atualizacao: bool = False, aviso: str = "Aviso do modelo:",
+                      rotulo: str = "parte") -> List[Optional[str]]:
+    """
+    Gera uma resposta do LLM para cada texto, com até `paralelismo` chamadas
+    simultâneas (cada uma passa pelo cache de análises).
+
+    Args:
+        template (str): Prompt com o campo {texto_relatorio}
+        textos (list[str]): Textos enviados, um por chamada
+        paralelismo (int): Máximo de chamadas ao mesmo tempo
+        forcar_atualizacao (bool): Ignora o cache e gera de novo
+        aviso (str): Prefixo da mensagem exibida quando o LLM falha
+        rotulo (str): Nome de cada item nas mensagens de progresso
+
+    Returns:
+        list[str | None]: Respostas na ordem dos textos (None quando a chamada falhou)
+    """
+    if not textos:
+        return []
+    return asyncio.run(_gerar_concorrente(template, textos, paralelismo, forcar_atualizacao, aviso, rotulo))
+
+
+def analisar_em_partes(template: str, texto_relatorio: str, orcamento_tokens: int = 0,
+                       paralelismo: int = PARALELISMO_PADRAO,
+                       ao_receber: Optional[Callable[[str], None]] = None,
+                       forcar_atualizacao: bool = False, aviso: str = "Aviso do modelo:",
+                       falha: str = "Não foi possível gerar análise.") -> str:
+    """
+    Analisa o relatório com o LLM em map-reduce quando ele passa do orçamento.
+
+    O relatório é dividido em partes de até `orcamento_tokens`; as partes são
+    resumidas em paralelo (map) e os resumos vão para uma chamada final com o
+    `template` do relatório (reduce). O tempo total fica próximo ao de uma
+    parte mais a consolidação, em vez do relatório inteiro em um só prompt.
+    Cada chamada passa pelo cache de análises.
+
+    Args:
+        template (str): Prompt da análise final, com o campo {texto_relatorio}
+        texto_relatorio (str): Relatório a ser analisado
+        orcamento_tokens (int): Tokens (estimados) por parte; 0 = prompt único
+        paralelismo (int): Máximo de partes enviadas ao mesmo tempo
+        ao_receber (Callable): Recebe os trechos da resposta final
+        forcar_atualizacao (bool): Ignora o cache e gera de novo
+        aviso (str): Prefixo da mensagem exibida quando o LLM falha
+        falha (str): Texto devolvido quando não há resposta
+
+    Returns:
+        str: Análise gerada (ou `falha`)
+    """
+    partes = dividir_relatorio(texto_relatorio, orcamento_tokens) if orcamento_tokens > 0 else []
+    if len(partes) <= 1:
+        resposta = gerar_com_cache(template, texto_relatorio, ao_receber, forcar_atualizacao, aviso)
+        return resposta if resposta else falha
+
+    print(f"   Relatório com ~{estimar_tokens(texto_relatorio)} tokens dividido em {len(partes)} partes "
+          f"(até {orcamento_tokens} tokens cada, {paralelismo} em paralelo)")
+    inicio = time.perf_counter()
+    total = len(partes)
+    resumos = gerar_em_paralelo(PROMPT_PARTE, [f"[Parte {i} de {total}]\n{parte}" for i, parte in enumerate(partes, 1)],
+                                paralelismo, forcar_atualizacao, aviso)
+    print(f"   Partes analisadas em {time.perf_counter() - inicio:.1f}s")
+
+    if not any(resumos):
+        return falha
+
+    # Etapa "reduce": o prompt original recebe os resumos no lugar do relatório
+    consolidado = "\n\n".join(
+        f"--- Parte {i} de {total} ---\n{resumo if resumo else '(parte não analisada)'}"
+        for i, resumo in enumerate(resumos, 1)
+    )
+    texto_reduzido = (f"O relatório foi analisado em {total} partes; "
+                      f"abaixo estão os achados de cada parte.\n\n{consolidado}")
+    resposta = gerar_com_cache(template, texto_reduzido, ao_receber, forcar_atualizacao, aviso)
+    return resposta if resposta else falha
@@ -0,0 +1,190 @@
+# comum/cache_llm.py
+# Cache em disco das análises geradas pelo LLM, endereçado pelo conteúdo.
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Callable, Optional
+
+from comum.llm import ErroLLM, cliente_padrao
+
+DIRETORIO_PADRAO = os.path.join("resultados", ".cache_ia")
+TAMANHO_MAXIMO_PADRAO = 50 * 1024 * 1024
+
+# Linhas que mudam a cada execução sem mudar o conteúdo do relatório
+PADRAO_VOLATIL = re.compile(
+    r"^.*(?:DATA DA ANÁLISE|DATA DO RELATÓRIO|Gerado em|Timestamp):.*$", re.MULTILINE
+)
+
+
+def normalizar_relatorio(texto: str) -> str:
+    """
+    Remove do relatório as linhas com data/hora de geração.
+    """
+    return PADRAO_VOLATIL.sub("", texto)
+
+
+def chave_cache(template: str, modelo: str, texto: str) -> str:
+    """
+    SHA-256 de (template do prompt, modelo, relatório normalizado).
+    """
+    conteudo = "\0".join([template, modelo, normalizar_relatorio(texto)])
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class CacheLLM:
+    """
+    Respostas do LLM salvas em disco, uma por arquivo `<chave>.json`.
+
+    A ordem de uso é o mtime dos arquivos (atualizado a cada acerto); quando
+    o total passa de `tamanho_maximo` bytes, os menos usados recentemente
+    são removidos (LRU).
+
+    Args:
+        diretorio (str): Pasta do cache
+        tamanho_maximo (int): Limite em bytes para o conjunto de respostas
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave + ".json")
+
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Resposta salva para a chave, ou None (conta acerto/falha).
+        """
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "r", encoding="utf-8") as f:
+                resposta = json.load(f)["resposta"]
+        except (OSError, ValueError, KeyError):
+            self.falhas += 1
+            return None
+        try:
+            os.utime(caminho)
+        except FileNotFoundError:
+            # Removida por outro gravador logo após a leitura: a resposta já foi lida
+            pass
+        self.acertos += 1
+        return resposta
+
+    def salvar(self, chave: str, resposta: str, modelo: str) -> None:
+        """
+        Grava a resposta (de forma atômica) e aplica o limite de tamanho.
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = self._caminho(chave)
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"modelo": modelo, "criado_em": datetime.now().isoformat(timespec="seconds"),
+                       "resposta": resposta}, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+        self.remover_excedente()
+
+    def remover_excedente(self) -> int:
+        """
+        Remove as respostas menos usadas até o cache caber no limite.
+
+        Returns:
+            int: Quantidade de respostas removidas
+        """
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".json"):
+                continue
+            try:
+                info = os.stat(os.path.join(self.diretorio, nome))
+            except FileNotFoundError:
+                # Removida por outra thread/processo entre o listdir e o stat
+                continue
+            entradas.append((info.st_mtime_ns, info.st_size, nome))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        removidas = 0
+        for _, tamanho, nome in sorted(entradas):
+            if total <= self.tamanho_maximo:
+                break
+            total -= tamanho
+            try:
+                os.remove(os.path.join(self.diretorio, nome))
+            except FileNotFoundError:
+                # Outro gravador já a removeu: não ocupa mais espaço
+                continue
+            removidas += 1
+        return removidas
+
+    def resumo(self) -> str:
+        return f"{self.acertos} acerto(s), {self.falhas} falha(s)"
+
+
+_cache_padrao: Optional[CacheLLM] = None
+
+
+def cache_padrao() -> CacheLLM:
+    """
+    Cache compartilhado pela sessão (os contadores somam todas as análises).
+    """
+    global _cache_padrao
+    if _cache_padrao is None:
+        _cache_padrao = CacheLLM()
+    return _cache_padrao
+
+
+def analisar_com_cache(template: str, texto_relatorio: str, ao_receber: Optional[Callable[[str], None]] = None,
+                       forcar_atualizacao: bool = False, aviso: str = "Aviso do modelo:",
+                       falha: str = "Não foi possível gerar análise.") -> str:
+    """
+    Gera a análise do relatório com o LLM, reaproveitando a resposta em cache
+    quando template, modelo e relatório (sem as linhas de data) não mudaram.
+
+    Args:
+        template (str): Prompt com o campo {texto_relatorio}
+        texto_relatorio (str): Relatório a ser analisado
+        ao_receber (Callable): Recebe os trechos da resposta (a resposta inteira, se veio do cache)
+        forcar_atualizacao (bool): Ignora o cache e gera de novo
+        aviso (str): Prefixo da mensagem exibida quando o LLM falha
+        falha (str): Texto devolvido quando não há resposta
+
+    Returns:
+        str: Análise gerada (ou `falha`)
+    """
+    resposta = gerar_com_cache(template, texto_relatorio, ao_receber, forcar_atualizacao, aviso)
+    return resposta if resposta else falha
+
+
+def gerar_com_cache(template: str, texto_relatorio: str, ao_receber: Optional[Callable[[str], None]] = None,
+                    forcar_atualizacao: bool = False, aviso: str = "Aviso do modelo:") -> Optional[str]:
+    """
+    Núcleo de `analisar_com_cache`: devolve None quando o LLM falha.
+
+    Pode ser chamada de várias threads ao mesmo tempo (cliente e cache são
+    compartilhados; cada resposta vai para um arquivo próprio).
+    """
+    cliente = cliente_padrao()
+    cache = cache_padrao()
+    chave = chave_cache(template, cliente.modelo, texto_relatorio)
+
+    if not forcar_atualizacao:
+        resposta = cache.obter(chave)
+        if resposta is not None:
+            if ao_receber is not None:
+                ao_receber(resposta)
+            return resposta
+
+    try:
+        resposta = cliente.gerar(template.format(texto_relatorio=texto_relatorio), ao_receber=ao_receber)
+    except ErroLLM as erro:
+        print(aviso, erro)
+        return None
+
+    # Falhas não vão para o cache: a próxima execução tenta de novo
+    if not resposta:
+        return None
+    cache.salvar(chave, resposta, cliente.modelo)
+    return resposta
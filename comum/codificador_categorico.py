@@ -0,0 +1,62 @@
+# comum/codificador_categorico.py
+# Códigos inteiros estáveis para colunas categóricas, salvos junto com o modelo.
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Código dos valores que não existiam no ajuste (e dos ausentes)
+DESCONHECIDO = -1
+
+
+class CodificadorCategorico:
+    """
+    Códigos inteiros por coluna, na ordem de primeira ocorrência no ajuste
+    (os mesmos de pd.factorize nos dados de treino). Cada coluna guarda um
+    pd.Index das categorias: a consulta é uma tabela hash e `transformar`
+    codifica a coluna inteira de uma vez (get_indexer).
+
+    Depois de ajustado, o codificador é salvo com o modelo e reaplicado a
+    lotes novos sem reajuste: o mesmo IP recebe o mesmo código em qualquer
+    lote e em qualquer ordem de linhas; valores novos ou ausentes recebem
+    DESCONHECIDO (-1), fora da faixa vista no treino.
+
+    Args:
+        colunas (Iterable[str]): Colunas categóricas
+    """
+
+    def __init__(self, colunas: Iterable[str]):
+        self.colunas = list(colunas)
+        self.categorias: Dict[str, pd.Index] = {coluna: pd.Index([], dtype=object) for coluna in self.colunas}
+
+    def ajustar_parcial(self, df: pd.DataFrame) -> "CodificadorCategorico":
+        """
+        Acrescenta as categorias novas de `df` (blocos consecutivos dão os
+        mesmos códigos do arquivo inteiro).
+        """
+        for coluna in self.colunas:
+            unicos = pd.unique(df[coluna].dropna())
+            novos = unicos[self.categorias[coluna].get_indexer(unicos) == DESCONHECIDO]
+            if len(novos):
+                self.categorias[coluna] = self.categorias[coluna].append(pd.Index(novos, dtype=object))
+        return self
+
+    def ajustar(self, df: pd.DataFrame) -> "CodificadorCategorico":
+        self.categorias = {coluna: pd.Index([], dtype=object) for coluna in self.colunas}
+        return self.ajustar_parcial(df)
+
+    def transformar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Códigos de cada coluna, como `<coluna>_encoded`.
+
+        Returns:
+            pd.DataFrame: Uma coluna int64 por coluna categórica, com o índice de `df`
+        """
+        return pd.DataFrame({
+            f'{coluna}_encoded': self.categorias[coluna].get_indexer(df[coluna]).astype(np.int64)
+            for coluna in self.colunas
+        }, index=df.index)
+
+    def resumo(self) -> str:
+        return ", ".join(f"{coluna}: {len(self.categorias[coluna])}" for coluna in self.colunas)
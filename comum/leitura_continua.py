@@ -0,0 +1,50 @@
+# comum/leitura_continua.py
+# Leitura de linhas de um arquivo que continua crescendo (como tail -f) ou da entrada padrão.
+
+import os
+import sys
+import time
+from typing import Iterator
+
+# Espera entre leituras quando o arquivo seguido não tem linhas novas
+INTERVALO_SEGUIR = 0.1
+
+
+def linhas_continuas(origem: str, seguir: bool = False, cabecalho: bool = True,
+                     intervalo: float = INTERVALO_SEGUIR) -> Iterator[str]:
+    """
+    Linhas do arquivo (ou da entrada padrão, com origem '-').
+
+    Com `seguir`, a leitura começa no fim do arquivo e continua esperando
+    linhas novas (como tail -f); com `cabecalho`, a primeira linha do arquivo
+    é entregue antes (ex.: cabeçalho do CSV). Linhas ainda sendo escritas só
+    saem quando chega o '\\n'.
+
+    Args:
+        origem (str): Caminho do arquivo ou '-'
+        seguir (bool): Continua lendo as linhas novas
+        cabecalho (bool): Entrega a primeira linha ao seguir
+        intervalo (float): Segundos entre tentativas quando não há linhas novas
+    """
+    if origem == '-':
+        yield from sys.stdin
+        return
+
+    with open(origem, 'r', encoding='utf-8') as arquivo:
+        if not seguir:
+            yield from arquivo
+            return
+
+        if cabecalho:
+            yield arquivo.readline()
+        arquivo.seek(0, os.SEEK_END)
+        parcial = ''
+        while True:
+            linha = arquivo.readline()
+            if not linha:
+                time.sleep(intervalo)
+                continue
+            parcial += linha
+            if parcial.endswith('\n'):
+                yield parcial
+                parcial = ''
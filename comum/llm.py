@@ -0,0 +1,196 @@
+# comum/llm.py
+# Cliente HTTP para um servidor local compatível com a API do Ollama.
+
+import http.client
+import json
+import os
+import queue
+import socket
+import time
+from typing import Callable, Iterator, Optional
+from urllib.parse import urlsplit
+
+HOST_PADRAO = "http://localhost:11434"
+MODELO_PADRAO = "mistral"
+
+# Tempo que o servidor mantém o modelo carregado entre chamadas
+MANTER_CARREGADO = "30m"
+
+
+class ErroLLM(Exception):
+    """
+    Falha ao obter resposta do servidor de LLM.
+
+    `repetir` indica falhas temporárias (ex.: HTTP 5xx) que valem nova tentativa.
+    """
+
+    def __init__(self, mensagem: str, repetir: bool = False):
+        super().__init__(mensagem)
+        self.repetir = repetir
+
+
+class ClienteLLM:
+    """
+    Cliente do endpoint /api/generate do Ollama (ou de um servidor compatível).
+
+    - Conexões HTTP keep-alive ficam em um pool e são reaproveitadas entre
+      chamadas (e entre threads), sem novo handshake a cada relatório.
+    - O modelo é mantido carregado no servidor (`keep_alive`), então o custo
+      de carregá-lo é pago uma vez por sessão, não uma vez por relatório.
+    - A resposta chega em streaming: cada trecho é entregue ao chamador assim
+      que o servidor o envia.
+    - Erros de conexão, timeouts e respostas 5xx são repetidos com espera
+      crescente, desde que nenhum trecho da resposta tenha sido entregue.
+
+    Args:
+        host (str): URL do servidor (padrão: variável OLLAMA_HOST ou http://localhost:11434)
+        modelo (str): Modelo usado (padrão: variável OLLAMA_MODEL ou mistral)
+        timeout (float): Segundos sem receber dados antes de desistir da tentativa
+        tentativas (int): Número máximo de tentativas por chamada
+        conexoes (int): Tamanho máximo do pool de conexões
+    """
+
+    def __init__(self, host: Optional[str] = None, modelo: Optional[str] = None,
+                 timeout: float = 300.0, tentativas: int = 3, conexoes: int = 4):
+        host = host or os.environ.get("OLLAMA_HOST", HOST_PADRAO)
+        if "://" not in host:
+            host = "http://" + host
+        url = urlsplit(host)
+        self.esquema = url.scheme
+        self.endereco = url.hostname or "localhost"
+        self.porta = url.port or (443 if url.scheme == "https" else 11434)
+        self.modelo = modelo or os.environ.get("OLLAMA_MODEL", MODELO_PADRAO)
+        self.timeout = timeout
+        self.tentativas = max(1, tentativas)
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=conexoes)
+
+    # ---------- pool de conexões ----------
+
+    def _nova_conexao(self) -> http.client.HTTPConnection:
+        classe = http.client.HTTPSConnection if self.esquema == "https" else http.client.HTTPConnection
+        return classe(self.endereco, self.porta, timeout=self.timeout)
+
+    def _obter_conexao(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._nova_conexao()
+
+    def _devolver_conexao(self, conexao: http.client.HTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(conexao)
+        except queue.Full:
+            conexao.close()
+
+    def fechar(self) -> None:
+        """
+        Fecha as conexões ociosas do pool.
+        """
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # ---------- geração ----------
+
+    def _requisitar(self, prompt: str, opcoes: Optional[dict]) -> Iterator[str]:
+        """
+        Uma tentativa: envia o prompt e entrega os trechos da resposta.
+        """
+        corpo = {"model": self.modelo, "prompt": prompt, "stream": True, "keep_alive": MANTER_CARREGADO}
+        if opcoes:
+            corpo["options"] = opcoes
+        conexao = self._obter_conexao()
+        reutilizavel = False
+        try:
+            conexao.request("POST", "/api/generate", body=json.dumps(corpo).encode("utf-8"),
+                            headers={"Content-Type": "application/json", "Connection": "keep-alive"})
+            resposta = conexao.getresponse()
+            if resposta.status != 200:
+                detalhe = resposta.read().decode("utf-8", errors="replace")[:200]
+                reutilizavel = not resposta.will_close
+                raise ErroLLM(f"HTTP {resposta.status}: {detalhe}", repetir=resposta.status >= 500)
+
+            # Resposta em NDJSON: um objeto por linha, até "done": true
+            for linha in resposta:
+                if not linha.strip():
+                    continue
+                dados = json.loads(linha)
+                if dados.get("error"):
+                    raise ErroLLM(dados["error"])
+                if dados.get("response"):
+                    yield dados["response"]
+                if dados.get("done"):
+                    break
+            # Consome o restante (terminador do chunked) para poder reutilizar a conexão
+            resposta.read()
+            reutilizavel = not resposta.will_close
+        finally:
+            if reutilizavel:
+                self._devolver_conexao(conexao)
+            else:
+                conexao.close()
+
+    def gerar_stream(self, prompt: str, opcoes: Optional[dict] = None) -> Iterator[str]:
+        """
+        Gera a resposta para `prompt`, entregando os trechos conforme chegam.
+
+        Raises:
+            ErroLLM: Se todas as tentativas falharem
+        """
+        ultimo_erro: Optional[BaseException] = None
+        for tentativa in range(self.tentativas):
+            entregou = False
+            try:
+                for trecho in self._requisitar(prompt, opcoes):
+                    entregou = True
+                    yield trecho
+                return
+            except ErroLLM as erro:
+                if entregou or not erro.repetir:
+                    raise
+                ultimo_erro = erro
+            except (OSError, socket.timeout, http.client.HTTPException, ValueError) as erro:
+                # Com parte da resposta já entregue, repetir duplicaria o texto
+                if entregou:
+                    raise ErroLLM(f"Conexão interrompida durante a resposta: {erro}") from erro
+                ultimo_erro = erro
+            if tentativa + 1 < self.tentativas:
+                time.sleep(min(0.5 * 2 ** tentativa, 8.0))
+        raise ErroLLM(f"Servidor LLM indisponível em {self.esquema}://{self.endereco}:{self.porta} "
+                      f"após {self.tentativas} tentativa(s): {ultimo_erro}")
+
+    def gerar(self, prompt: str, ao_receber: Optional[Callable[[str], None]] = None,
+              opcoes: Optional[dict] = None) -> str:
+        """
+        Gera a resposta completa para `prompt`.
+
+        Args:
+            prompt (str): Texto enviado ao modelo
+            ao_receber (Callable): Chamado com cada trecho assim que ele chega
+            opcoes (dict): Opções do modelo (temperature, num_ctx...)
+
+        Returns:
+            str: Resposta completa
+        """
+        partes = []
+        for trecho in self.gerar_stream(prompt, opcoes):
+            partes.append(trecho)
+            if ao_receber is not None:
+                ao_receber(trecho)
+        return "".join(partes)
+
+
+_cliente_padrao: Optional[ClienteLLM] = None
+
+
+def cliente_padrao() -> ClienteLLM:
+    """
+    Cliente compartilhado pela sessão (mesmo pool de conexões para todos os relatórios).
+    """
+    global _cliente_padrao
+    if _cliente_padrao is None:
+        _cliente_padrao = ClienteLLM()
+    return _cliente_padrao
+
@@ -0,0 +1,112 @@
+# comum/pacote_modelo.py
+# Pacote de modelo em um arquivo só, com manifesto (esquema, versão, tamanho, checksum) e leitura via mmap.
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import joblib
+
+# Leitura do arquivo para o checksum, em partes
+TAMANHO_LEITURA = 1 << 20
+
+
+def caminho_manifesto(caminho: str) -> str:
+    """
+    Manifesto salvo ao lado do pacote (modelos/x.joblib -> modelos/x.joblib.json).
+    """
+    return caminho + ".json"
+
+
+def checksum_arquivo(caminho: str) -> str:
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(TAMANHO_LEITURA), b""):
+            resumo.update(parte)
+    return resumo.hexdigest()
+
+
+def salvar_pacote(pacote: dict, caminho: str, esquema: str, versao: int) -> str:
+    """
+    Grava o pacote sem compressão (os arrays NumPy ficam no arquivo em forma
+    bruta e podem ser mapeados com mmap_mode) e o manifesto com o esquema, a
+    versão, o tamanho, o mtime e o SHA-256 do arquivo. As duas gravações são
+    atômicas (temporário + rename), o manifesto por último.
+
+    Returns:
+        str: Caminho do pacote
+    """
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = caminho + ".tmp"
+    joblib.dump(pacote, temporario, compress=0)
+    os.replace(temporario, caminho)
+
+    info = os.stat(caminho)
+    manifesto = {
+        "esquema": esquema,
+        "versao": versao,
+        "sha256": checksum_arquivo(caminho),
+        "bytes": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+        "criado_em": datetime.now().isoformat(timespec="seconds"),
+    }
+    temporario = caminho_manifesto(caminho) + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+    os.replace(temporario, caminho_manifesto(caminho))
+    return caminho
+
+
+def ler_manifesto(caminho: str) -> Optional[dict]:
+    """
+    Manifesto do pacote, ou None se não existir ou estiver ilegível.
+    """
+    try:
+        with open(caminho_manifesto(caminho), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def carregar_pacote(caminho: str, esquema: str, versao: int, mmap: bool = True,
+                    verificar: bool = False) -> dict:
+    """
+    Lê um pacote salvo por `salvar_pacote`.
+
+    O manifesto é conferido antes de o pickle ser aberto: esquema, versão e
+    tamanho sempre; o SHA-256 só com `verificar` ou quando o mtime do arquivo
+    difere do manifesto (pacote copiado ou regravado), então a leitura normal
+    não relê o arquivo inteiro. Com `mmap`, os
+    arrays NumPy do pacote são mapeados somente leitura: a leitura não copia
+    os dados para a memória do processo, e processos que abrem o mesmo
+    arquivo compartilham as páginas (cache do sistema). Objetos que copiam
+    os arrays ao serem reconstruídos (como as árvores do sklearn) continuam
+    ocupando memória própria.
+
+    Args:
+        caminho (str): Arquivo do pacote
+        esquema (str): Esquema esperado (ex.: 'forca_bruta')
+        versao (int): Versão esperada do esquema
+        mmap (bool): Mapeia os arrays em vez de copiá-los
+        verificar (bool): Confere o SHA-256 mesmo com o mtime igual ao do manifesto
+
+    Raises:
+        ValueError: Se o manifesto não existir, for de outro esquema/versão ou
+            se o tamanho ou o checksum não baterem
+    """
+    manifesto = ler_manifesto(caminho)
+    if manifesto is None:
+        raise ValueError(f"{caminho} não tem manifesto ({caminho_manifesto(caminho)})")
+    if manifesto.get("esquema") != esquema or manifesto.get("versao") != versao:
+        raise ValueError(f"{caminho} é um pacote '{manifesto.get('esquema')}' v{manifesto.get('versao')}; "
+                         f"esperado '{esquema}' v{versao}")
+    info = os.stat(caminho)
+    if info.st_size != manifesto.get("bytes"):
+        raise ValueError(f"{caminho} tem {info.st_size} bytes; o manifesto registra {manifesto.get('bytes')} "
+                         f"(arquivo alterado ou incompleto)")
+    alterado = info.st_mtime_ns != manifesto.get("mtime_ns")
+    if (verificar or alterado) and checksum_arquivo(caminho) != manifesto.get("sha256"):
+        raise ValueError(f"Checksum de {caminho} não confere com o manifesto (arquivo alterado ou incompleto)")
+    return joblib.load(caminho, mmap_mode="r" if mmap else None)
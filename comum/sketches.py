@@ -0,0 +1,386 @@
+# comum/sketches.py
+# Estruturas de memória limitada para estatísticas em streaming.
+
+import base64
+import heapq
+import json
+import os
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SpaceSaving:
+    """
+    Top-k aproximado (heavy hitters) com memória fixa — algoritmo Space-Saving.
+
+    Mantém no máximo `capacidade` contadores. Quando um item novo chega e a
+    estrutura está cheia, ele herda o contador do item de menor contagem,
+    que é descartado. Garantias (N = total de eventos observados):
+
+    - a contagem estimada nunca é menor que a real;
+    - o excesso de cada item é no máximo `erro(item)` <= N / capacidade;
+    - todo item com frequência real > N / capacidade está presente.
+
+    A interface imita `collections.Counter` (`update`, `most_common`), para
+    ser usada no lugar dele sem mudar o código que consome os rankings.
+    """
+
+    def __init__(self, capacidade: int = 1000):
+        if capacidade < 1:
+            raise ValueError("capacidade deve ser >= 1")
+        self.capacidade = capacidade
+        self.total = 0
+        self.contagens: Dict[Hashable, int] = {}
+        self.erros: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._sequencia = 0
+
+    def __len__(self) -> int:
+        return len(self.contagens)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.contagens
+
+    def __getitem__(self, item: Hashable) -> int:
+        return self.contagens.get(item, 0)
+
+    def _empilhar(self, item: Hashable) -> None:
+        self._sequencia += 1
+        heapq.heappush(self._heap, (self.contagens[item], self._sequencia, item))
+        # O heap é "preguiçoso" (entradas antigas ficam até serem descartadas);
+        # é reconstruído quando cresce demais para manter a memória em O(k)
+        if len(self._heap) > 4 * self.capacidade + 16:
+            self._heap = [(c, i, item) for i, (item, c) in enumerate(self.contagens.items())]
+            heapq.heapify(self._heap)
+
+    def _menor(self) -> Hashable:
+        while True:
+            contagem, _, item = self._heap[0]
+            if self.contagens.get(item) == contagem:
+                return item
+            heapq.heappop(self._heap)
+
+    def adicionar(self, item: Hashable, peso: int = 1) -> None:
+        """
+        Registra `peso` ocorrências de `item`.
+        """
+        self.total += peso
+        if item in self.contagens:
+            self.contagens[item] += peso
+        elif len(self.contagens) < self.capacidade:
+            self.contagens[item] = peso
+            self.erros[item] = 0
+        else:
+            menor = self._menor()
+            minimo = self.contagens.pop(menor)
+            del self.erros[menor]
+            self.contagens[item] = minimo + peso
+            self.erros[item] = minimo
+        self._empilhar(item)
+
+    def update(self, itens: "Mapping[Hashable, int] | pd.Series | Iterable[Hashable]") -> None:
+        """
+        Soma um mapeamento {item: peso}, uma pd.Series de contagens (ex.:
+        `value_counts()` de um bloco, uma atualização por item distinto) ou
+        uma sequência de itens (peso 1 cada).
+        """
+        if isinstance(itens, (Mapping, pd.Series)):
+            pares = itens.items()
+        else:
+            pares = ((item, 1) for item in itens)
+        for item, peso in pares:
+            self.adicionar(item, int(peso))
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """
+        Itens com maior contagem estimada, como em `Counter.most_common`.
+        """
+        ordenados = sorted(self.contagens.items(), key=lambda par: par[1], reverse=True)
+        return ordenados if n is None else ordenados[:n]
+
+    def erro(self, item: Hashable) -> int:
+        """
+        Excesso máximo da contagem estimada de `item`.
+        """
+        return self.erros.get(item, 0)
+
+    @property
+    def erro_maximo(self) -> int:
+        """
+        Limite superior do erro de qualquer contagem (N / capacidade).
+        """
+        return self.total // self.capacidade
+
+    def merge(self, outro: "SpaceSaving") -> "SpaceSaving":
+        """
+        Combina outro resumo neste (resumos de workers ou execuções diferentes).
+
+        Um item ausente em um dos resumos pode ter ocorrido até `mínimo` vezes
+        nele; esse valor é somado à contagem e ao erro, preservando as garantias.
+        """
+        cheio = len(self.contagens) >= self.capacidade
+        cheio_outro = len(outro.contagens) >= outro.capacidade
+        minimo = min(self.contagens.values()) if cheio and self.contagens else 0
+        minimo_outro = min(outro.contagens.values()) if cheio_outro and outro.contagens else 0
+
+        combinados = {}
+        for item in set(self.contagens) | set(outro.contagens):
+            contagem = self.contagens.get(item, minimo) + outro.contagens.get(item, minimo_outro)
+            erro = self.erros.get(item, minimo) + outro.erros.get(item, minimo_outro)
+            combinados[item] = (contagem, erro)
+
+        maiores = sorted(combinados.items(), key=lambda par: par[1][0], reverse=True)[:self.capacidade]
+        self.contagens = {item: contagem for item, (contagem, _) in maiores}
+        self.erros = {item: erro for item, (_, erro) in maiores}
+        self.total += outro.total
+        self._heap = [(c, i, item) for i, (item, c) in enumerate(self.contagens.items())]
+        heapq.heapify(self._heap)
+        return self
+
+    def para_dict(self) -> dict:
+        return {
+            "tipo": "space_saving",
+            "capacidade": self.capacidade,
+            "total": self.total,
+            "itens": [[item, self.contagens[item], self.erros[item]] for item in self.contagens],
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "SpaceSaving":
+        resumo = cls(dados["capacidade"])
+        resumo.total = dados["total"]
+        for item, contagem, erro in dados["itens"]:
+            resumo.contagens[item] = contagem
+            resumo.erros[item] = erro
+        resumo._heap = [(c, i, item) for i, (item, c) in enumerate(resumo.contagens.items())]
+        heapq.heapify(resumo._heap)
+        return resumo
+
+
+# ========== CONTAGEM DE DISTINTOS (HYPERLOGLOG) ==========
+
+def _hash64(valores) -> np.ndarray:
+    """
+    Hash de 64 bits, determinístico entre processos e execuções (ao contrário
+    de `hash()`, que muda com PYTHONHASHSEED), calculado de forma vetorizada.
+    """
+    return pd.util.hash_array(np.asarray(valores, dtype=object).astype(str))
+
+
+def _comprimento_bits(valores: np.ndarray) -> np.ndarray:
+    """
+    Equivalente vetorizado de `int.bit_length` para uint64 (sem passar por float).
+    """
+    valores = valores.copy()
+    comprimento = np.zeros(len(valores), dtype=np.int64)
+    for deslocamento in (32, 16, 8, 4, 2, 1):
+        maiores = (valores >> np.uint64(deslocamento)) != 0
+        comprimento += maiores * deslocamento
+        valores[maiores] >>= np.uint64(deslocamento)
+    return comprimento + (valores != 0)
+
+
+class HyperLogLog:
+    """
+    Contagem aproximada de valores distintos com memória fixa — HyperLogLog.
+
+    Usa 2**precisao registradores de 1 byte (4 KB com o padrão 12); o erro
+    relativo típico é 1.04 / sqrt(2**precisao), cerca de 1,6%.
+
+    Dois sketches com a mesma precisão são combinados pelo máximo de cada
+    registrador: o resultado é exatamente o sketch do conjunto unido, então
+    sketches de workers, arquivos ou execuções diferentes podem ser somados
+    sem recontar eventos.
+    """
+
+    def __init__(self, precisao: int = 12):
+        if not 4 <= precisao <= 18:
+            raise ValueError("precisao deve estar entre 4 e 18")
+        self.precisao = precisao
+        self.registradores = np.zeros(1 << precisao, dtype=np.uint8)
+
+    def update(self, valores: Iterable[Hashable]) -> "HyperLogLog":
+        """
+        Registra uma sequência de valores (Series, lista, array...).
+        """
+        hashes = _hash64(list(valores) if not isinstance(valores, (pd.Series, np.ndarray)) else valores)
+        if len(hashes) == 0:
+            return self
+        bits_resto = 64 - self.precisao
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+        # Posição do primeiro bit 1 nos bits restantes (1 = bit mais alto)
+        posicoes = (bits_resto - _comprimento_bits(resto) + 1).astype(np.uint8)
+        np.maximum.at(self.registradores, indices, posicoes)
+        return self
+
+    def adicionar(self, valor: Hashable) -> None:
+        """
+        Registra um único valor.
+        """
+        self.update([valor])
+
+    def estimar(self) -> int:
+        """
+        Estimativa da quantidade de valores distintos registrados.
+        """
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(np.ldexp(1.0, -self.registradores.astype(np.int64)))
+        vazios = int(np.count_nonzero(self.registradores == 0))
+        # Correção para cardinalidades pequenas (linear counting)
+        if estimativa <= 2.5 * m and vazios:
+            estimativa = m * np.log(m / vazios)
+        return int(round(estimativa))
+
+    def __len__(self) -> int:
+        return self.estimar()
+
+    def merge(self, outro: "HyperLogLog") -> "HyperLogLog":
+        """
+        Une outro sketch a este (mesma precisão).
+        """
+        if outro.precisao != self.precisao:
+            raise ValueError("Só é possível combinar sketches com a mesma precisão")
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+        return self
+
+    def copia(self) -> "HyperLogLog":
+        novo = HyperLogLog(self.precisao)
+        novo.registradores[:] = self.registradores
+        return novo
+
+    def para_dict(self) -> dict:
+        return {
+            "tipo": "hyperloglog",
+            "precisao": self.precisao,
+            "registradores": base64.b64encode(self.registradores.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "HyperLogLog":
+        sketch = cls(dados["precisao"])
+        sketch.registradores[:] = np.frombuffer(base64.b64decode(dados["registradores"]), dtype=np.uint8)
+        return sketch
+
+
+class DistintosPorPeriodo:
+    """
+    Sketches HyperLogLog de várias colunas, um por período (ex.: por dia).
+
+    Perguntas como "IPs únicos entre os dias X e Y" são respondidas unindo
+    os sketches dos períodos do intervalo, sem reler os eventos. As chaves
+    dos períodos devem ordenar cronologicamente como texto (ex.: "2024-01-15")
+    para que os filtros `inicio` / `fim` funcionem.
+    """
+
+    def __init__(self, colunas: Sequence[str], precisao: int = 12):
+        self.colunas = list(colunas)
+        self.precisao = precisao
+        self.periodos: Dict[str, Dict[str, HyperLogLog]] = {}
+
+    def _sketches(self, periodo: str) -> Dict[str, HyperLogLog]:
+        if periodo not in self.periodos:
+            self.periodos[periodo] = {coluna: HyperLogLog(self.precisao) for coluna in self.colunas}
+        return self.periodos[periodo]
+
+    def atualizar(self, df: pd.DataFrame, periodos: pd.Series) -> "DistintosPorPeriodo":
+        """
+        Registra um lote de eventos.
+
+        Args:
+            df (pd.DataFrame): Eventos com as colunas monitoradas
+            periodos (pd.Series): Chave do período de cada evento (mesmo índice de `df`)
+        """
+        for periodo, grupo in df.groupby(periodos, sort=False):
+            sketches = self._sketches(str(periodo))
+            for coluna in self.colunas:
+                sketches[coluna].update(grupo[coluna].to_numpy())
+        return self
+
+    def merge(self, outro: "DistintosPorPeriodo") -> "DistintosPorPeriodo":
+        """
+        Soma os sketches de outro objeto (worker paralelo ou execução anterior).
+        """
+        for periodo, sketches in outro.periodos.items():
+            proprios = self._sketches(periodo)
+            for coluna in self.colunas:
+                if coluna in sketches:
+                    proprios[coluna].merge(sketches[coluna])
+        return self
+
+    def estimar(self, coluna: str, inicio: Optional[str] = None, fim: Optional[str] = None) -> int:
+        """
+        Valores distintos de `coluna` nos períodos entre `inicio` e `fim` (inclusive).
+        """
+        total = HyperLogLog(self.precisao)
+        for periodo, sketches in self.periodos.items():
+            if (inicio is None or periodo >= inicio) and (fim is None or periodo <= fim):
+                total.merge(sketches[coluna])
+        return total.estimar()
+
+    def para_dict(self) -> dict:
+        return {
+            "tipo": "distintos_por_periodo",
+            "colunas": self.colunas,
+            "precisao": self.precisao,
+            "periodos": {
+                periodo: {coluna: sketch.para_dict()["registradores"] for coluna, sketch in sketches.items()}
+                for periodo, sketches in self.periodos.items()
+            },
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "DistintosPorPeriodo":
+        distintos = cls(dados["colunas"], dados["precisao"])
+        for periodo, sketches in dados["periodos"].items():
+            distintos.periodos[periodo] = {
+                coluna: HyperLogLog.de_dict({"precisao": distintos.precisao, "registradores": registradores})
+                for coluna, registradores in sketches.items()
+            }
+        return distintos
+
+
+def caminho_sketches(caminho_dataset: str) -> str:
+    """
+    Arquivo de sketches salvo ao lado do dataset (dados/x.csv -> dados/x.distintos.json).
+    """
+    return os.path.splitext(caminho_dataset)[0] + ".distintos.json"
+
+
+def salvar_distintos(distintos: DistintosPorPeriodo, caminho_dataset: str) -> str:
+    """
+    Salva os sketches ao lado do dataset, com a assinatura (tamanho, mtime) dele.
+
+    Returns:
+        str: Caminho do arquivo de sketches
+    """
+    info = os.stat(caminho_dataset)
+    caminho = caminho_sketches(caminho_dataset)
+    dados = {"origem": [info.st_size, info.st_mtime_ns], "distintos": distintos.para_dict()}
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(dados, f)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar_distintos(caminho_dataset: str) -> Optional[DistintosPorPeriodo]:
+    """
+    Lê os sketches salvos ao lado do dataset; retorna None se não existirem
+    ou se o dataset mudou depois que foram gerados.
+    """
+    caminho = caminho_sketches(caminho_dataset)
+    if not os.path.exists(caminho) or not os.path.exists(caminho_dataset):
+        return None
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return None
+    info = os.stat(caminho_dataset)
+    if dados.get("origem") != [info.st_size, info.st_mtime_ns]:
+        return None
+    return DistintosPorPeriodo.de_dict(dados["distintos"])
@@ -0,0 +1,135 @@
+# comum/treino_out_of_core.py
+# Treino do Isolation Forest sem carregar o dataset inteiro em memória.
+
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+TAMANHO_BLOCO_PADRAO = 100_000
+TAMANHO_AMOSTRA_PADRAO = 100_000
+RODADAS_PADRAO = 4
+
+
+def ler_em_blocos(caminho: str, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                  colunas: Optional[list] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê um CSV ou Parquet em blocos de até `tamanho_bloco` linhas.
+
+    Yields:
+        pd.DataFrame: Um bloco por vez
+    """
+    if caminho.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco, usecols=colunas)
+
+
+class AmostraReservatorio:
+    """
+    Amostra uniforme de tamanho fixo de um fluxo de linhas (algoritmo R),
+    atualizada bloco a bloco com operações vetorizadas.
+
+    Args:
+        capacidade (int): Tamanho máximo da amostra
+        semente (int): Semente do sorteio
+    """
+
+    def __init__(self, capacidade: int, semente: Optional[int] = None):
+        self.capacidade = capacidade
+        self.vistos = 0
+        self.dados: Optional[np.ndarray] = None
+        self._rng = np.random.default_rng(semente)
+
+    def atualizar(self, X: np.ndarray) -> None:
+        X = np.asarray(X)
+        if self.dados is None:
+            self.dados = np.empty((self.capacidade,) + X.shape[1:], dtype=X.dtype)
+
+        # Enquanto a amostra não enche, as linhas entram direto
+        livres = max(0, min(self.capacidade - self.vistos, len(X)))
+        self.dados[self.vistos:self.vistos + livres] = X[:livres]
+
+        # Depois, a linha de posição t (1-based) substitui uma vaga com probabilidade capacidade/t
+        restantes = X[livres:]
+        if len(restantes):
+            posicoes = np.arange(self.vistos + livres, self.vistos + len(X)) + 1
+            sorteios = self._rng.integers(0, posicoes)
+            aceitas = sorteios < self.capacidade
+            self.dados[sorteios[aceitas]] = restantes[aceitas]
+        self.vistos += len(X)
+
+    def amostra(self) -> np.ndarray:
+        if self.dados is None:
+            return np.empty((0,))
+        return self.dados[:min(self.vistos, self.capacidade)]
+
+
+def treinar_out_of_core(blocos: Callable[[], Iterator[np.ndarray]],
+                        tamanho_amostra: int = TAMANHO_AMOSTRA_PADRAO, rodadas: int = RODADAS_PADRAO,
+                        n_estimadores: int = 100, contaminacao: float = 0.05, semente: int = 42,
+                        max_samples="auto") -> Tuple[StandardScaler, IsolationForest, dict]:
+    """
+    Ajusta StandardScaler + IsolationForest lendo os dados uma vez, em blocos.
+
+    - O scaler é ajustado com partial_fit em todos os registros (média e
+      variância exatas).
+    - `rodadas` amostras de reservatório independentes (juntas com até
+      `tamanho_amostra` linhas) guardam amostras uniformes do arquivo todo.
+    - A floresta cresce com warm_start: cada rodada acrescenta árvores
+      treinadas em uma das amostras, e o limiar (offset_) vem da última.
+
+    A memória depende do tamanho do bloco e da amostra, não do dataset.
+
+    Args:
+        blocos (Callable): Função sem argumentos que devolve um iterador de
+            matrizes de features (um bloco por vez)
+        tamanho_amostra (int): Total de linhas guardadas para o ajuste
+        rodadas (int): Amostras independentes / rodadas de warm_start
+        n_estimadores (int): Total de árvores
+        contaminacao (float): Fração esperada de anomalias
+        semente (int): random_state do modelo e das amostras
+        max_samples: max_samples de cada árvore (como no IsolationForest)
+
+    Returns:
+        tuple: (scaler, modelo, resumo com registros lidos e linhas amostradas)
+    """
+    rodadas = max(1, min(rodadas, n_estimadores))
+    scaler = StandardScaler()
+    reservatorios = [AmostraReservatorio(max(tamanho_amostra // rodadas, 1), semente=semente + i)
+                     for i in range(rodadas)]
+
+    registros = 0
+    for X in blocos():
+        if not len(X):
+            continue
+        scaler.partial_fit(X)
+        for reservatorio in reservatorios:
+            reservatorio.atualizar(X)
+        registros += len(X)
+    if registros == 0:
+        raise ValueError("Nenhum registro para treinar")
+
+    modelo = IsolationForest(
+        n_estimators=0,
+        warm_start=True,
+        contamination=contaminacao,
+        random_state=semente,
+        max_samples=max_samples,
+    )
+    for reservatorio, arvores in zip(reservatorios, np.array_split(np.arange(n_estimadores), rodadas)):
+        modelo.n_estimators += len(arvores)
+        modelo.fit(scaler.transform(reservatorio.amostra()))
+
+    resumo = {
+        "registros": registros,
+        "amostrados": sum(len(reservatorio.amostra()) for reservatorio in reservatorios),
+        "rodadas": rodadas,
+    }
+    return scaler, modelo, resumo
+